@@ -0,0 +1,49 @@
+"""
+Measures bulk component sync throughput.
+
+Builds a model of sensors and encodes it into the COPY payload that save_components() streams to Postgres, reporting rows per second for the encoding alone.  If DB_HOST is set in the environment and the schema in docker/postgres/init.sql is loaded, it also runs a full sync, an incremental sync in which 1% of the sensors changed, and a load, and reports rows per second for each.
+
+Usage: python benchmarks/bulk_sync.py [components]
+"""
+
+import os
+import sys
+import time
+
+from otsafe.components.sensors import Sensor
+from otsafe.inventory.components import component_row
+from otsafe.inventory.sync import CopySource, load_components, save_components, SyncReport
+
+
+def main(count: int = 250_000) -> None:
+    began = time.perf_counter()
+    sensors = [
+        Sensor(f"PT-{i}", value=i % 100, unit="psi", ip=f"10.0.{i // 250 % 256}.{i % 250 + 1}", port=502, register=i % 10_000)
+        for i in range(count)
+    ]
+    print(f"built {count} sensors in {time.perf_counter() - began:.2f}s")
+
+    began = time.perf_counter()
+    source = CopySource(component_row(sensor) for sensor in sensors)
+    size = 0
+    while chunk := source.read(8192):
+        size += len(chunk)
+    seconds = time.perf_counter() - began
+    print(f"encoded {source.rows} rows ({size / 1e6:.1f} MB) in {seconds:.2f}s: {source.rows / seconds:,.0f} rows/s")
+
+    if not os.getenv("DB_HOST"):
+        print("DB_HOST not set, skipping the database sync")
+        return
+
+    print(f"full sync:        {save_components(sensors, full=True)}")
+    for sensor in sensors[::100]:
+        sensor.value += 1
+    print(f"incremental sync: {save_components(sensors)}")
+    report = SyncReport()
+    for _ in load_components(report=report):
+        pass
+    print(f"load:             {report}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,92 @@
+"""
+Compares polling every safety function on a fixed scan with checking them only when their sensor changes.
+
+Each run simulates an hour in which a random handful of sensors change value every second, and reports the CPU time spent checking and the average time from a value going out of range to the trip being detected.  Also times a plain value assignment with and without subscribers.
+
+Usage: python benchmarks/change_driven.py [functions]
+"""
+
+import sys
+import time
+import timeit
+
+import numpy as np
+
+from otsafe.components.actuators import Actuator
+from otsafe.components.safety_systems import SIS
+from otsafe.components.scheduler import SISScheduler
+from otsafe.components.sensors import Sensor
+from otsafe.utils.clock import Simulation
+
+HOUR = 3600
+CHANGES_PER_SECOND = 5
+SCAN_INTERVAL = 1
+
+
+def build(count: int) -> list:
+    functions = []
+    for i in range(count):
+        function = SIS(sensor=Sensor(name=f"PT-{i}", value=50), actuator=Actuator(name=f"XV-{i}"))
+        function.set_min(10)
+        function.set_max(90)
+        functions.append(function)
+    return functions
+
+
+def schedule_changes(sim: Simulation, functions: list, changed_at: dict) -> None:
+    rng = np.random.default_rng(0)
+    for second in range(HOUR):
+        for offset, index in zip(rng.uniform(0, 1, CHANGES_PER_SECOND), rng.integers(0, len(functions), CHANGES_PER_SECOND)):
+            function = functions[index]
+            value = 95 if rng.uniform() < 0.01 else 50
+
+            def change(function=function, value=value):
+                if value == 95:
+                    changed_at.setdefault(function, sim.monotonic())
+                function.sensor.value = value
+
+            sim.schedule_at(second + offset, change)
+
+
+def run(count: int, change_driven: bool) -> tuple[float, float]:
+    functions = build(count)
+    changed_at, latencies = {}, []
+
+    def on_trip(function, message):
+        if function in changed_at:
+            latencies.append(sim.monotonic() - changed_at.pop(function))
+            function.sensor.value = 50
+
+    with Simulation() as sim:
+        schedule_changes(sim, functions, changed_at)
+        if change_driven:
+            for function in functions:
+                function.watch(on_trip=on_trip, intervene=False)
+        else:
+            scheduler = SISScheduler(on_trip=on_trip)
+            for function in functions:
+                scheduler.add(function, interval=SCAN_INTERVAL, intervene=False)
+            sim.every(SCAN_INTERVAL, scheduler.run_pending)
+
+        began = time.process_time()
+        sim.run_for(HOUR)
+        cpu = time.process_time() - began
+
+    return cpu, (sum(latencies) / len(latencies) if latencies else 0.0)
+
+
+def main(count: int = 1000) -> None:
+    print(f"{count} safety functions, {CHANGES_PER_SECOND} changes/s, 1 simulated hour")
+    for label, change_driven in (("polling", False), ("change-driven", True)):
+        cpu, latency = run(count, change_driven)
+        print(f"{label:<14} cpu {cpu:7.2f} s   avg detection latency {latency * 1000:8.1f} ms")
+
+    idle, watched = Sensor(name="idle", value=0), Sensor(name="watched", value=0)
+    watched.subscribe(lambda sensor, value: None)
+    for label, sensor in (("no subscribers", idle), ("one subscriber", watched)):
+        seconds = timeit.timeit("sensor.value = 1", globals={"sensor": sensor}, number=1_000_000) / 1_000_000
+        print(f"assignment, {label:<15} {seconds * 1e9:6.0f} ns")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,67 @@
+"""
+Compares memory and construction time of the regular and compact component classes.
+
+Usage: python benchmarks/compact_components.py [count]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from otsafe.components.actuators import Actuator
+from otsafe.components.burners import Burner
+from otsafe.components.compact import (
+    CompactActuator,
+    CompactBurner,
+    CompactPump,
+    CompactSensor,
+    CompactValve,
+    CompactVessel,
+)
+from otsafe.components.pumps import Pump
+from otsafe.components.sensors import Sensor
+from otsafe.components.valves import Valve
+from otsafe.components.vessels import Vessel
+
+PAIRS = [
+    (Sensor, CompactSensor, {"value": 100, "unit": " psi"}),
+    (Valve, CompactValve, {"state": True, "open_percentage": 0.5}),
+    (Pump, CompactPump, {"state": True, "rpm": 1800}),
+    (Actuator, CompactActuator, {"open": True}),
+    (Burner, CompactBurner, {"flame": True, "temperature": 650}),
+    (Vessel, CompactVessel, {"volume": 1000}),
+]
+
+
+def measure(cls, count: int, kwargs: dict) -> tuple[float, float]:
+    """
+    Builds `count` components.  Returns (seconds, bytes per component).
+    """
+
+    names = [f"TAG-{i}" for i in range(count)]
+
+    began = time.perf_counter()
+    components = [cls(name, **kwargs) for name in names]
+    elapsed = time.perf_counter() - began
+    del components
+
+    # Measured separately, tracemalloc slows construction down considerably
+    tracemalloc.start()
+    components = [cls(name, **kwargs) for name in names]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del components
+
+    return elapsed, size / count
+
+
+def main(count: int = 100_000) -> None:
+    print(f"{'class':<12}{'regular s':>12}{'compact s':>12}{'regular B':>12}{'compact B':>12}")
+    for regular, compact, kwargs in PAIRS:
+        r_time, r_size = measure(regular, count, kwargs)
+        c_time, c_size = measure(compact, count, kwargs)
+        print(f"{regular.__name__:<12}{r_time:>12.3f}{c_time:>12.3f}{r_size:>12.0f}{c_size:>12.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,58 @@
+"""
+Reports how capture analysis scales with the number of worker processes.
+
+Writes a set of synthetic rotated captures with many Modbus/TCP connections, then analyses them with 1 to N workers and reports throughput, speedup and parallel efficiency.
+
+Usage: python benchmarks/parallel_analysis.py [files] [packets per file] [max workers]
+"""
+
+import os
+import struct
+import sys
+import tempfile
+
+from otsafe.components.sensors import Sensor
+from otsafe.utils.analysis import CAPTURE_WORKERS, CaptureAnalyzer
+from otsafe.utils.pcap import tcp_frame, write_pcap
+
+CLIENTS = 64
+REGISTERS = 100
+
+
+def out_of_range(timestamp, component, attribute, value):
+    return f"{component.id} out of range at {value}" if value > 60000 else None
+
+
+def build(file_path: str, packets: int, offset: float) -> None:
+    frames = []
+    for i in range(packets // 2):
+        client, register = i % CLIENTS, i % REGISTERS
+        transaction = i & 0xFFFF
+        request = struct.pack(">HHHBBHH", transaction, 0, 6, 1, 3, register, 1)
+        response = struct.pack(">HHHBBBH", transaction, 0, 5, 1, 3, 2, i & 0xFFFF)
+        frames.append(tcp_frame(f"10.0.1.{client}", "10.0.0.3", 40000 + client, 502, request))
+        frames.append(tcp_frame("10.0.0.3", f"10.0.1.{client}", 502, 40000 + client, response))
+    write_pcap(file_path, ((offset + i * 0.0001, frame) for i, frame in enumerate(frames)))
+
+
+def main(files: int = 8, packets: int = 200_000, max_workers: int = CAPTURE_WORKERS) -> None:
+    sensors = [Sensor(name=f"PT-{i}", ip="10.0.0.3", register=i) for i in range(REGISTERS)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for index in range(files):
+            paths.append(os.path.join(directory, f"capture-{index}.pcap"))
+            build(paths[-1], packets, index * 3600)
+
+        print(f"{files} files x {packets} packets, {CLIENTS} connections each")
+        analyzer = CaptureAnalyzer(sensors, [out_of_range])
+        for row in analyzer.scaling(paths, max_workers):
+            print(
+                f"{row['workers']:>2} workers  {row['seconds']:7.2f} s  {row['packets_per_second']:12,.0f} packets/s"
+                f"  speedup {row['speedup']:5.2f}  efficiency {row['efficiency']:5.0%}"
+            )
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
@@ -0,0 +1,76 @@
+"""
+Compares the throughput of PcapReader with pyshark on a synthetic Modbus/TCP capture.
+
+Writes a capture in which every other packet is Modbus, reads it with PcapReader, and with pyshark when tshark is installed, and reports packets per second for each.  Also times PcapReader feeding a ModbusDecoder that applies every read to a bound Sensor.
+
+Usage: python benchmarks/pcap_reader.py [packets]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from otsafe.components.sensors import Sensor
+from otsafe.utils.decoder import ModbusDecoder
+from otsafe.utils.pcap import PcapReader, tcp_frame, write_pcap
+
+
+def build(file_path: str, count: int) -> None:
+    request = tcp_frame("10.0.0.57", "10.0.0.3", 2387, 502, bytes.fromhex("000100000006010300000002"))
+    response = tcp_frame("10.0.0.3", "10.0.0.57", 502, 2387, bytes.fromhex("00010000000701030400090018"))
+    other = tcp_frame("10.0.0.57", "10.0.0.9", 2388, 443, b"\x17\x03\x03" + b"\x00" * 64)
+    frames = (other, request, other, response)
+    write_pcap(file_path, ((i * 0.001, frames[i % 4]) for i in range(count)))
+
+
+def time_reader(file_path: str) -> tuple[int, float]:
+    began = time.perf_counter()
+    with PcapReader(file_path) as reader:
+        matched = sum(1 for _ in reader)
+    return matched, time.perf_counter() - began
+
+
+def time_decoder(file_path: str) -> tuple[int, float]:
+    decoder = ModbusDecoder()
+    for register in range(2):
+        decoder.bind(Sensor(name=f"PT-{register}", ip="10.0.0.3", register=register))
+
+    began = time.perf_counter()
+    with PcapReader(file_path) as reader:
+        updated = decoder.run(reader)
+    return updated, time.perf_counter() - began
+
+
+def time_pyshark(file_path: str) -> tuple[int, float]:
+    import pyshark
+
+    began = time.perf_counter()
+    capture = pyshark.FileCapture(file_path, display_filter="tcp.port == 502", keep_packets=False)
+    matched = sum(1 for _ in capture)
+    capture.close()
+    return matched, time.perf_counter() - began
+
+
+def main(count: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "bench.pcap")
+        build(file_path, count)
+        print(f"{count} packets, {os.path.getsize(file_path) / 1e6:.1f} MB")
+
+        matched, seconds = time_reader(file_path)
+        print(f"PcapReader  {matched} matched in {seconds:6.2f} s   {count / seconds:12,.0f} packets/s")
+
+        updated, seconds = time_decoder(file_path)
+        print(f"+ decoder   {updated} updates in {seconds:6.2f} s   {count / seconds:12,.0f} packets/s")
+
+        if shutil.which("tshark") is None:
+            print("pyshark     skipped, tshark is not installed")
+            return
+        matched, seconds = time_pyshark(file_path)
+        print(f"pyshark     {matched} matched in {seconds:6.2f} s   {count / seconds:12,.0f} packets/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
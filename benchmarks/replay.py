@@ -0,0 +1,59 @@
+"""
+Measures replay throughput and detection latency.
+
+Writes a synthetic capture in which a client polls 100 registers, each watched by a safety function, with an out-of-range value every few hundred reads.  Replays it as fast as possible and reports events per second and the detection latency.
+
+Usage: python benchmarks/replay.py [reads]
+"""
+
+import os
+import struct
+import sys
+import tempfile
+
+from otsafe.components.actuators import Actuator
+from otsafe.components.safety_systems import SIS
+from otsafe.components.sensors import Sensor
+from otsafe.utils.pcap import tcp_frame, write_pcap
+from otsafe.utils.replay import ReplayEngine
+
+REGISTERS = 100
+
+
+def build(file_path: str, reads: int) -> None:
+    def frames():
+        for i in range(reads):
+            transaction, register = i & 0xFFFF, i % REGISTERS
+            value = 95 if i % 397 == 0 else 50
+            request = struct.pack(">HHHBBHH", transaction, 0, 6, 1, 3, register, 1)
+            response = struct.pack(">HHHBBBH", transaction, 0, 5, 1, 3, 2, value)
+            yield i * 0.01, tcp_frame("10.0.0.57", "10.0.0.3", 40000, 502, request)
+            yield i * 0.01 + 0.001, tcp_frame("10.0.0.3", "10.0.0.57", 502, 40000, response)
+
+    write_pcap(file_path, frames())
+
+
+def main(reads: int = 200_000) -> None:
+    sensors = [Sensor(name=f"PT-{i}", value=50, ip="10.0.0.3", register=i) for i in range(REGISTERS)]
+    functions = []
+    for sensor in sensors:
+        function = SIS(sensor=sensor, actuator=Actuator(name=f"XV-{sensor.id}"))
+        function.set_min(10)
+        function.set_max(90)
+        functions.append(function)
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "replay.pcap")
+        build(file_path, reads)
+        report = ReplayEngine(sensors, functions, speed=None).replay_file(file_path)
+
+    print(f"{report.packets} packets, {report.events} events, {len(report.detections)} detections in {report.seconds:.2f} s")
+    print(f"{report.events_per_second:,.0f} events/s   {report.packets_per_second:,.0f} packets/s")
+    print(
+        f"detection latency avg {report.latency.avg * 1e6:.1f} us   p99 {report.latency.percentile(99) * 1e6:.1f} us"
+        f"   max {report.latency.max * 1e6:.1f} us"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
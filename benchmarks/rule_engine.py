@@ -0,0 +1,112 @@
+"""
+Measures how many detection rules are evaluated per second.
+
+Generates a rule set over sensor attributes, then evaluates a stream of sensor value changes against it twice: with the compiled RuleEngine, and with a plain interpreter that walks each rule's dicts on every change, as a baseline.
+
+Then grows a rule set in which each rule watches one sensor and one of four attributes, and reports the cost per value change with the engine's attribute-indexed dispatch and with every rule tested on every change.
+
+Usage: python benchmarks/rule_engine.py [rules] [changes]
+"""
+
+import operator
+import sys
+import time
+
+import numpy as np
+
+from otsafe.components.sensors import Sensor
+from otsafe.detections.rules import RuleEngine, compile_rule
+
+OPERATORS = {"gt": operator.gt, "lt": operator.lt, "ge": operator.ge, "le": operator.le, "eq": operator.eq, "ne": operator.ne}
+
+
+def build_rules(count: int) -> list[dict]:
+    rng = np.random.default_rng(0)
+    rules = []
+    for i in range(count):
+        high, low = int(rng.integers(150, 250)), int(rng.integers(0, 50))
+        rules.append({
+            "id": f"rule-{i}",
+            "match": {"type": "Sensor"},
+            "when": {"any": [{"value": {"gt": high}}, {"all": [{"value": {"lt": low}}, {"unit": {"eq": "psi"}}]}]},
+        })
+    return rules
+
+
+def interpret(node, component) -> bool:
+    # Walks the rule definition on every evaluation
+    if "all" in node:
+        return all(interpret(child, component) for child in node["all"])
+    if "any" in node:
+        return any(interpret(child, component) for child in node["any"])
+    for attribute, test in node.items():
+        value = getattr(component, attribute)
+        for name, operand in test.items():
+            if not OPERATORS[name](value, operand):
+                return False
+    return True
+
+
+def main(rule_count: int = 200, changes: int = 20_000) -> None:
+    sources = build_rules(rule_count)
+    sensors = [Sensor(name=f"PT-{i}", value=50, unit="psi") for i in range(100)]
+    values = np.random.default_rng(1).normal(100, 25, changes).round().astype(int).tolist()
+
+    engine = RuleEngine(compile_rule(source) for source in sources)
+    began = time.perf_counter()
+    matched = 0
+    for i, value in enumerate(values):
+        sensor = sensors[i % len(sensors)]
+        sensor.value = value
+        matched += len(engine.evaluate(sensor, "value"))
+    compiled = time.perf_counter() - began
+
+    began = time.perf_counter()
+    interpreted_matches = 0
+    for i, value in enumerate(values):
+        sensor = sensors[i % len(sensors)]
+        sensor.value = value
+        interpreted_matches += sum(interpret(source["when"], sensor) for source in sources)
+    interpreted = time.perf_counter() - began
+
+    evaluations = rule_count * changes
+    print(f"{rule_count} rules x {changes} changes, {matched} matches ({interpreted_matches} interpreted)")
+    print(f"compiled     {compiled:6.2f} s   {evaluations / compiled:12,.0f} rules/s")
+    print(f"interpreted  {interpreted:6.2f} s   {evaluations / interpreted:12,.0f} rules/s")
+
+
+def dispatch_scaling(changes: int = 20_000) -> None:
+    attributes = ("value", "unit", "status", "quality")
+
+    print("rules    indexed us/change   every rule us/change")
+    for rule_count in (10, 100, 1000, 5000):
+        # One sensor per four rules, so the rules relevant to a change stay constant as the set grows
+        sensors = [Sensor(name=f"PT-{i}", value=50, unit="psi") for i in range(max(1, rule_count // 4))]
+        engine = RuleEngine(
+            compile_rule({
+                "id": f"rule-{i}",
+                "match": {"id": f"PT-{i % len(sensors)}"},
+                "when": {attributes[i % len(attributes)]: {"gt": 1000}},
+            })
+            for i in range(rule_count)
+        )
+
+        began = time.perf_counter()
+        for i in range(changes):
+            engine.evaluate(sensors[i % len(sensors)], "value")
+        indexed = (time.perf_counter() - began) / changes
+
+        every = min(changes, 200_000 // rule_count)
+        began = time.perf_counter()
+        for i in range(every):
+            for rule in engine.rules:
+                rule.evaluate(sensors[i % len(sensors)], engine.components)
+        unindexed = (time.perf_counter() - began) / every
+
+        print(f"{rule_count:>5}    {indexed * 1e6:17.2f}   {unindexed * 1e6:20.2f}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
+    dispatch_scaling()
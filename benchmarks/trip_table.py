@@ -0,0 +1,59 @@
+"""
+Times a full trip-limit check of many safety functions, looping over each SIS in Python against one vectorized TripTable pass.
+
+Usage: python benchmarks/trip_table.py [count]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from otsafe.components.actuators import Actuator
+from otsafe.components.arrays import SensorArray
+from otsafe.components.safety_systems import SIS
+from otsafe.components.trips import TripTable
+
+
+def best_of(repeat: int, function) -> float:
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - began)
+    return min(timings)
+
+
+def main(count: int = 100_000) -> None:
+    rng = np.random.default_rng(0)
+    array = SensorArray(capacity=count)
+    table = TripTable(capacity=count)
+    functions = []
+
+    for i in range(count):
+        array.add(f"PT-{i}", 50)
+        function = SIS(sensor=array[i], actuator=Actuator(name=f"XV-{i}"))
+        function.set_min(10)
+        function.set_max(90)
+        table.register(function)
+        functions.append(function)
+
+    array.update(rng.uniform(0, 100, count))
+
+    def python_loop():
+        return [f for f in functions if f.sensor.value <= f.min or f.sensor.value >= f.max]
+
+    table.evaluate()
+    loop = best_of(3, python_loop)
+    vectorized = best_of(20, table.evaluate)
+    evaluate_only = best_of(20, lambda: table.evaluate(refresh=False))
+
+    assert len(python_loop()) == len(table.evaluate()[0])
+    print(f"{count} safety functions")
+    print(f"python loop:           {loop * 1000:8.2f} ms")
+    print(f"trip table (refresh):  {vectorized * 1000:8.2f} ms")
+    print(f"trip table (evaluate): {evaluate_only * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
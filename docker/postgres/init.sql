@@ -0,0 +1,15 @@
+-- Component model.  Fields every component shares get a column; everything else
+-- (unit, register, state, os, ...) lives in attributes.  See otsafe/inventory/sync.py.
+CREATE TABLE IF NOT EXISTS components (
+    id          text PRIMARY KEY,
+    type        text NOT NULL DEFAULT 'Component',
+    ip          text,
+    port        integer,
+    description text,
+    created_at  timestamp,
+    updated_at  timestamp NOT NULL DEFAULT now(),
+    attributes  jsonb NOT NULL DEFAULT '{}'
+);
+
+CREATE INDEX IF NOT EXISTS components_type_idx ON components (type);
+CREATE INDEX IF NOT EXISTS components_ip_idx ON components (ip);
@@ -1,5 +1,5 @@
-import datetime
 from otsafe.components.generic import Component
+from otsafe.utils.clock import get_clock
 
 
 class Actuator(Component):
@@ -7,7 +7,7 @@ class Actuator(Component):
         super().__init__(name)
         self.name = name
         self.open = open
-        self.last_modified = datetime.datetime.now()
+        self.last_modified = get_clock().now()
         
         # Apply kwargs last so they can override the defaults
         self.__dict__.update(kwargs)
\ No newline at end of file
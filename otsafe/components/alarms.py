@@ -1,5 +1,31 @@
+"""
+Alarms.  Constructing an `Alarm` with `alarm=True` raises an AlarmException, which suits a single check but not a scan loop that has to keep running through an upset.
+
+The AlarmBus publishes AlarmEvents without raising anything.  Events land in a bounded ring buffer (the oldest are overwritten when it is full), and are handed to any subscribers.  To keep an alarm flood from stalling detection:
+
+- Repeats of an active alarm for the same (component, condition) are folded into the existing event within the dedup window, and only bump its count.
+- Shelved alarms are counted but not published, until they are unshelved or the shelving expires.
+- A token bucket limits how many new events are published per second.  Alarms over the limit are counted and dropped.
+
+The buffer size, dedup window and rate limit can be overridden by setting `ALARM_BUFFER`, `ALARM_DEDUP_WINDOW` and `ALARM_RATE_LIMIT` in the .env of the project.
+"""
+
+import os
+from collections import deque
+from typing import Any, Callable
+
+from dotenv import find_dotenv, load_dotenv
+
 from otsafe.components.generic import Component
 from otsafe.exceptions.exceptions import AlarmException
+from otsafe.utils.clock import get_clock
+
+load_dotenv(find_dotenv())
+
+ALARM_BUFFER = int(os.getenv('ALARM_BUFFER', 10_000))
+ALARM_DEDUP_WINDOW = float(os.getenv('ALARM_DEDUP_WINDOW', 60))
+ALARM_RATE_LIMIT = float(os.getenv('ALARM_RATE_LIMIT', 1000))
+
 
 class Alarm(Component):
     def __init__(
@@ -9,7 +35,7 @@ class Alarm(Component):
             message: str = None,
             **kwargs
     ):
-        
+
         super().__init__(name)
         self.alarm = alarm
         self.message = message
@@ -18,4 +44,178 @@ class Alarm(Component):
         self.__dict__.update(kwargs)
 
         if alarm:
-            raise AlarmException(self.message)
\ No newline at end of file
+            raise AlarmException(self.message)
+
+
+class AlarmEvent:
+    """
+    A published alarm.  `count` is the number of times it was raised while active, and `last_seen` the monotonic time of the latest.
+    """
+
+    __slots__ = ("source", "condition", "message", "timestamp", "first_seen", "last_seen", "count")
+
+    def __init__(self, source: str, condition: str, message: str, timestamp, seen: float):
+        self.source = source
+        self.condition = condition
+        self.message = message
+        self.timestamp = timestamp
+        self.first_seen = seen
+        self.last_seen = seen
+        self.count = 1
+
+    def __repr__(self):
+        return f"AlarmEvent({self.source}, {self.condition}, {self.message!r}, count={self.count})"
+
+
+class AlarmBus:
+
+    def __init__(
+            self,
+            capacity: int = ALARM_BUFFER,
+            dedup_window: float = ALARM_DEDUP_WINDOW,
+            rate_limit: float = ALARM_RATE_LIMIT,
+            burst: float = None
+    ):
+        self.events: deque = deque(maxlen=capacity)
+        self.dedup_window = dedup_window
+        self.rate_limit = rate_limit
+        self.burst = rate_limit if burst is None else burst
+
+        self.published = 0
+        self.deduplicated = 0
+        self.shelved = 0
+        self.rate_limited = 0
+        self.overwritten = 0
+
+        self._active: dict[tuple, AlarmEvent] = {}
+        self._shelves: dict[tuple, float] = {}
+        self._subscribers: tuple = ()
+        self._tokens = self.burst
+        self._refilled = None
+
+    def publish(self, source: Any, condition: str, message: str = None) -> AlarmEvent | None:
+        """
+        Publishes an alarm for a component and condition (for example "high" or "low").  Returns the AlarmEvent, or None if the alarm was shelved or rate limited.  A deduplicated alarm returns the existing event.
+        """
+
+        clock = get_clock()
+        now = clock.monotonic()
+        key = (str(source), condition)
+
+        # Shelving wins over dedup, so repeats of an alarm that was active when it was shelved are suppressed too
+        if self._is_shelved(key, now):
+            self.shelved += 1
+            return None
+
+        active = self._active.get(key)
+        if active is not None and now - active.last_seen <= self.dedup_window:
+            active.count += 1
+            active.last_seen = now
+            self.deduplicated += 1
+            return active
+
+        if not self._take_token(now):
+            self.rate_limited += 1
+            return None
+
+        event = AlarmEvent(key[0], condition, message, clock.now(), now)
+        if len(self.events) == self.events.maxlen:
+            self.overwritten += 1
+        self.events.append(event)
+        self._active[key] = event
+        self.published += 1
+
+        for callback in self._subscribers:
+            callback(event)
+
+        return event
+
+    def clear(self, source: Any, condition: str = None) -> None:
+        """
+        Marks alarms for a component as no longer active, so the next one is published rather than deduplicated.  If condition is None, every condition for the component is cleared.
+        """
+
+        for key in self._matching(self._active, source, condition):
+            del self._active[key]
+
+    def shelve(self, source: Any, condition: str, duration: float = None) -> None:
+        """
+        Suppresses an alarm for duration seconds, or until it is unshelved.
+        """
+
+        until = float("inf") if duration is None else get_clock().monotonic() + duration
+        self._shelves[(str(source), condition)] = until
+
+    def unshelve(self, source: Any, condition: str = None) -> None:
+        """
+        Stops suppressing alarms for a component.  If condition is None, every condition for the component is unshelved.
+        """
+
+        for key in self._matching(self._shelves, source, condition):
+            del self._shelves[key]
+
+    def subscribe(self, callback: Callable) -> None:
+        """
+        Calls callback(event) for every published AlarmEvent.
+        """
+
+        self._subscribers += (callback,)
+
+    def unsubscribe(self, callback: Callable) -> None:
+        self._subscribers = tuple(s for s in self._subscribers if s != callback)
+
+    def drain(self) -> list[AlarmEvent]:
+        """
+        Removes and returns every event in the buffer.
+        """
+
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published,
+            "deduplicated": self.deduplicated,
+            "shelved": self.shelved,
+            "rate_limited": self.rate_limited,
+            "overwritten": self.overwritten,
+            "buffered": len(self.events),
+        }
+
+    def _is_shelved(self, key: tuple, now: float) -> bool:
+        until = self._shelves.get(key)
+        if until is None:
+            return False
+        if now >= until:
+            del self._shelves[key]
+            return False
+        return True
+
+    def _take_token(self, now: float) -> bool:
+        if self._refilled is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate_limit)
+        self._refilled = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    @staticmethod
+    def _matching(table: dict, source: Any, condition: str = None) -> list:
+        source = str(source)
+        return [key for key in table if key[0] == source and (condition is None or key[1] == condition)]
+
+
+_bus = None
+
+
+def get_alarm_bus() -> AlarmBus:
+    """
+    Returns the process-wide alarm bus.
+    """
+
+    global _bus
+    if _bus is None:
+        _bus = AlarmBus()
+    return _bus
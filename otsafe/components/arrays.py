@@ -0,0 +1,271 @@
+"""
+This class is designed to hold many sensors at once.  Values, units, timestamps and noise percentages are kept in contiguous NumPy arrays, so a whole fleet of sensors can be read, updated and checked against thresholds in a single vectorized call instead of one method call per sensor.
+
+Indexing a SensorArray returns a SensorView, which is a Sensor whose value, unit and timestamp live in the array.  Existing code that expects a Sensor can be handed a view, and changes made through it are visible to the array and vice versa.
+
+Values are stored as floats, so `read()` and `read_strings()` print whole numbers without the ".0", the way `Sensor.read()` prints a sensor holding an int.  Views can't follow a Ramp, since the array's vectorized reads (and TripTable) take values straight from the array: `ramp()` raises NotImplementedError, and `change_value_over_time()` sets the value when the time is up.
+
+Subscriptions made on a view are kept by the array, so a safety function watching a view is called when that sensor's value changes, whether through any view of it or through `update()`.
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from otsafe.components.generic import Component
+from otsafe.components.sensors import Sensor
+from otsafe.utils.clock import get_clock
+
+
+class SensorArray:
+
+    def __init__(self, capacity: int = 64):
+        self.names: list[str] = []
+        self.units: list[str] = []
+        self._unit_lookup: dict[str, int] = {}
+        self._positions: dict[str, int] = {}
+        self._subscribers: dict[int, tuple] = {}
+        self._size = 0
+
+        self._values = np.full(capacity, np.nan)
+        self._unit_index = np.zeros(capacity, dtype=np.int32)
+        self._timestamps = np.zeros(capacity)
+        self._noise = np.zeros(capacity)
+
+    @classmethod
+    def from_sensors(cls, sensors: list, noise: float = 0.0) -> "SensorArray":
+        """
+        Builds an array from existing Sensor objects.  The values are copied, use the returned views to keep working with them.
+        """
+
+        array = cls(capacity=max(len(sensors), 1))
+        for sensor in sensors:
+            array.add(sensor.id, sensor.value, sensor.unit, getattr(sensor, "noise", noise))
+            array._timestamps[array._size - 1] = sensor.last_updated.timestamp()
+        return array
+
+    def add(self, name: str, value: float = None, unit: str = "", noise: float = 0.0) -> int:
+        """
+        Adds a sensor to the array.  Returns its index.
+        """
+
+        if name in self._positions:
+            raise ValueError(f"Sensor {name} is already in the array")
+        if self._size == len(self._values):
+            self._grow()
+
+        index = self._size
+        self.names.append(name)
+        self._positions[name] = index
+        self._values[index] = np.nan if value is None else value
+        self._unit_index[index] = self._unit(unit)
+        self._timestamps[index] = get_clock().time()
+        self._noise[index] = noise
+        self._size += 1
+
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, key: int | str) -> "SensorView":
+        index = self.index(key) if isinstance(key, str) else key
+        if not -self._size <= index < self._size:
+            raise IndexError("SensorArray index out of range")
+        return SensorView(self, index % self._size)
+
+    def __iter__(self):
+        return (SensorView(self, index) for index in range(self._size))
+
+    def index(self, name: str) -> int:
+        """
+        Returns the index of a sensor by name.
+        """
+
+        return self._positions[name]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values[:self._size]
+
+    @property
+    def unit_index(self) -> np.ndarray:
+        return self._unit_index[:self._size]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[:self._size]
+
+    @property
+    def noise(self) -> np.ndarray:
+        return self._noise[:self._size]
+
+    def read(self) -> np.ndarray:
+        """
+        Returns a copy of every sensor value.
+        """
+
+        return self.values.copy()
+
+    def read_strings(self) -> list[str]:
+        """
+        Returns every value formatted with its unit, like calling `Sensor.read()` on each sensor.
+        """
+
+        units = self.units
+        return [_format(value, units[unit]) for value, unit in zip(self.values.tolist(), self.unit_index.tolist())]
+
+    def noisy_read(self, percentage: float | np.ndarray = None, rng: np.random.Generator = None) -> np.ndarray:
+        """
+        Returns every value varied by up to +/- percentage, in the same way as `Sensor.noisy_read()`.  If percentage is None, each sensor's own noise percentage is used.
+        """
+
+        rng = rng or np.random.default_rng()
+        percentage = self.noise if percentage is None else percentage
+        return self.values * (1 + rng.uniform(-1, 1, self._size) * percentage)
+
+    def update(self, values: np.ndarray, indices: np.ndarray = None, timestamp: float = None) -> None:
+        """
+        Sets many values at once.  If indices is None, values must hold one value per sensor.  Subscribers of the sensors whose value changed are called afterwards.
+        """
+
+        watched = before = None
+        if self._subscribers:
+            watched = np.fromiter(self._subscribers, dtype=np.intp, count=len(self._subscribers))
+            before = self._values[watched]
+
+        timestamp = get_clock().time() if timestamp is None else timestamp
+        if indices is None:
+            self.values[:] = values
+            self.timestamps[:] = timestamp
+        else:
+            self.values[indices] = values
+            self.timestamps[indices] = timestamp
+
+        if watched is not None:
+            after = self._values[watched]
+            changed = (after != before) & ~(np.isnan(after) & np.isnan(before))
+            for index in watched[changed].tolist():
+                view = SensorView(self, index)
+                view.publish(view.value)
+
+    def above(self, limit: float | np.ndarray) -> np.ndarray:
+        """
+        Returns the indices of sensors whose value is greater than or equal to limit.
+        """
+
+        return np.flatnonzero(self.values >= limit)
+
+    def below(self, limit: float | np.ndarray) -> np.ndarray:
+        """
+        Returns the indices of sensors whose value is less than or equal to limit.
+        """
+
+        return np.flatnonzero(self.values <= limit)
+
+    def outside(self, low: float | np.ndarray, high: float | np.ndarray) -> np.ndarray:
+        """
+        Returns the indices of sensors whose value is at or beyond either limit.
+        """
+
+        values = self.values
+        return np.flatnonzero((values <= low) | (values >= high))
+
+    def _unit(self, unit: str) -> int:
+        if unit not in self._unit_lookup:
+            self._unit_lookup[unit] = len(self.units)
+            self.units.append(unit)
+        return self._unit_lookup[unit]
+
+    def _grow(self) -> None:
+        capacity = max(len(self._values) * 2, 1)
+        for name in ("_values", "_unit_index", "_timestamps", "_noise"):
+            old = getattr(self, name)
+            new = np.full(capacity, np.nan) if name == "_values" else np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+
+class SensorView(Sensor):
+    """
+    A Sensor whose value, unit and timestamp are stored in a SensorArray.
+    """
+
+    def __init__(self, array: SensorArray, index: int):
+        self._array = array
+        self._index = index
+        Component.__init__(self, array.names[index])
+
+    @property
+    def value(self) -> float | None:
+        value = self._array._values[self._index].item()
+        return None if value != value else value
+
+    @value.setter
+    def value(self, value: float) -> None:
+        subscribers = self._subscribers
+        previous = self.value if subscribers else None
+        self._array._values[self._index] = np.nan if value is None else value
+        if subscribers and self.value != previous:
+            self.publish(self.value)
+
+    def read(self) -> str:
+        return _format(self.value, self.unit)
+
+    def ramp(self, target: float, duration: float, profile: str = "linear", steps: int = None):
+        raise NotImplementedError("SensorArray values can't follow a ramp, set them with SensorArray.update() instead")
+
+    def change_value_over_time(self, value: int, seconds: int):
+        """
+        Sleeps for as long as `Sensor.change_value_over_time()` would take, then sets the value.  Returns the new value.
+        """
+
+        get_clock().sleep(abs(value - self.value) * seconds)
+        self.value = value
+        self.last_updated = get_clock().now()
+
+        return self.value
+
+    @property
+    def _subscribers(self) -> tuple | None:
+        return self._array._subscribers.get(self._index)
+
+    @_subscribers.setter
+    def _subscribers(self, subscribers: tuple | None) -> None:
+        if subscribers:
+            self._array._subscribers[self._index] = subscribers
+        else:
+            self._array._subscribers.pop(self._index, None)
+
+    @property
+    def unit(self) -> str:
+        return self._array.units[self._array._unit_index[self._index]]
+
+    @unit.setter
+    def unit(self, unit: str) -> None:
+        self._array._unit_index[self._index] = self._array._unit(unit)
+
+    @property
+    def last_updated(self) -> datetime:
+        return datetime.fromtimestamp(self._array._timestamps[self._index])
+
+    @last_updated.setter
+    def last_updated(self, value: datetime) -> None:
+        self._array._timestamps[self._index] = value.timestamp()
+
+    @property
+    def noise(self) -> float:
+        return self._array._noise[self._index].item()
+
+    @noise.setter
+    def noise(self, value: float) -> None:
+        self._array._noise[self._index] = value
+
+
+def _format(value: float | None, unit: str) -> str:
+    # Whole numbers print like the ints a Sensor usually holds
+    if value != value:
+        value = None
+    elif value is not None and value.is_integer():
+        value = int(value)
+    return f"{value}{unit}"
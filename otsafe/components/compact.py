@@ -0,0 +1,203 @@
+"""
+Compact versions of the most numerous components, for plant models with hundreds of thousands of tags.
+
+The regular classes keep every attribute in a per-instance `__dict__` and stamp each object with a `datetime`.  The compact classes store their core fields in `__slots__` and keep timestamps as floats, which makes each object about a third smaller and faster to build.  Each one subclasses the class it stands in for (CompactSensor is a Sensor, and every compact class is a Component), so `isinstance` checks, rule matching by type and `read()`, `noisy_read()`, `read_modbus()` and friends behave exactly the same.
+
+Being subclasses, they still have a `__dict__`, but nothing is put in it, so it stays empty and unallocated.  Extra kwargs that are not core fields are kept in a shared side table instead, so `CompactSensor("PT-1", register=40).register` still works.  Attributes that are neither core fields nor passed as kwargs should be added later with `set_extra()`: assigning them directly works too, but fills in the `__dict__`, which gives back the memory saved and isn't included in `fields()`, so they aren't saved to the inventory either.
+"""
+
+from datetime import datetime
+from types import MemberDescriptorType
+from uuid import uuid4
+from weakref import finalize
+
+from otsafe.components.actuators import Actuator
+from otsafe.components.burners import Burner
+from otsafe.components.generic import Component
+from otsafe.components.pumps import Pump
+from otsafe.components.sensors import Sensor
+from otsafe.components.valves import Valve
+from otsafe.components.vessels import Vessel
+from otsafe.utils.clock import get_clock
+
+# Extra attributes for compact components, keyed by id() of the owning object
+_extras: dict[int, dict] = {}
+
+
+class CompactComponent(Component):
+
+    __slots__ = ("id", "ip", "port", "description", "_created_at")
+
+    def __init__(
+        self,
+        id: str,
+        ip: str = None,
+        port: int = None,
+        description: str = None,
+        **kwargs
+    ):
+
+        self.id = id or str(uuid4())
+        self.ip = ip
+        self.port = port
+        self.description = description
+        self._created_at = get_clock().time()
+
+        # Apply kwargs last so they can override the defaults
+        if kwargs:
+            self.update(kwargs)
+
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self._created_at)
+
+    def update(self, attributes: dict) -> None:
+        """
+        Sets each attribute, storing anything that is not a core field in the side table.
+        """
+
+        cls = type(self)
+        for name, value in attributes.items():
+            # Slots and properties such as `value` and `last_updated`
+            if isinstance(getattr(cls, name, None), (MemberDescriptorType, property)):
+                setattr(self, name, value)
+            else:
+                self.set_extra(name, value)
+
+    def set_extra(self, name: str, value) -> None:
+        """
+        Stores an attribute that is not a core field in the side table.
+        """
+
+        key = id(self)
+        if key not in _extras:
+            _extras[key] = {}
+            finalize(self, _extras.pop, key, None)
+        _extras[key][name] = value
+
+    def extras(self) -> dict:
+        """
+        Returns the attributes held in the side table for this component.
+        """
+
+        return _extras.get(id(self), {})
+
+    def fields(self) -> dict:
+        """
+        Returns the slots that are set and the side table attributes, the way `vars()` would for a regular component.  Unlike `vars()`, it doesn't allocate the unused `__dict__`.
+        """
+
+        fields = {}
+        for cls in reversed(type(self).__mro__):
+            for name in cls.__dict__.get("__slots__", ()):
+                try:
+                    fields[name] = getattr(self, name)
+                except AttributeError:
+                    pass
+        fields.update(self.extras())
+        return fields
+
+    def __getattr__(self, name):
+        # Only reached when the attribute is not a slot or class attribute
+        try:
+            return _extras[id(self)][name]
+        except KeyError:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}") from None
+
+
+class CompactSensor(CompactComponent, Sensor):
+
+    __slots__ = ("_value", "_ramp", "_subscribers", "unit", "_last_updated")
+
+    def __init__(self, name: str, value: int | str = None, unit: str = "", **kwargs):
+        super().__init__(name)
+        self._ramp = None
+        self._subscribers = None
+        self._value = value
+        self.unit = unit
+        self._last_updated = get_clock().time()
+
+        if kwargs:
+            self.update(kwargs)
+
+    @property
+    def last_updated(self) -> datetime:
+        return datetime.fromtimestamp(self._last_updated)
+
+    @last_updated.setter
+    def last_updated(self, value: datetime) -> None:
+        self._last_updated = value.timestamp()
+
+
+class CompactValve(CompactComponent, Valve):
+
+    __slots__ = ("state", "open_percentage")
+
+    def __init__(self, name: str, state: bool = None, open_percentage: float = 0, **kwargs):
+        super().__init__(name)
+        self.state = state
+        self.open_percentage = open_percentage
+
+        if kwargs:
+            self.update(kwargs)
+
+
+class CompactPump(CompactComponent, Pump):
+
+    __slots__ = ("state", "rpm")
+
+    def __init__(self, name, state: bool = False, rpm: int = 0, **kwargs):
+        super().__init__(name)
+        self.state = state
+        self.rpm = rpm
+
+        if kwargs:
+            self.update(kwargs)
+
+
+class CompactActuator(CompactComponent, Actuator):
+
+    __slots__ = ("name", "open", "_last_modified")
+
+    def __init__(self, name, open: bool = False, **kwargs):
+        super().__init__(name)
+        self.name = name
+        self.open = open
+        self._last_modified = get_clock().time()
+
+        if kwargs:
+            self.update(kwargs)
+
+    @property
+    def last_modified(self) -> datetime:
+        return datetime.fromtimestamp(self._last_modified)
+
+    @last_modified.setter
+    def last_modified(self, value: datetime) -> None:
+        self._last_modified = value.timestamp()
+
+
+class CompactBurner(CompactComponent, Burner):
+
+    __slots__ = ("name", "flame", "temperature")
+
+    def __init__(self, name: str, flame: bool = True, temperature: int = 0, **kwargs):
+        super().__init__(name)
+        self.name = name
+        self.flame = flame
+        self.temperature = temperature
+
+        if kwargs:
+            self.update(kwargs)
+
+
+class CompactVessel(CompactComponent, Vessel):
+
+    __slots__ = ("volume",)
+
+    def __init__(self, name: str, volume: int = 0, **kwargs):
+        super().__init__(name)
+        self.volume = volume
+
+        if kwargs:
+            self.update(kwargs)
@@ -1,7 +1,8 @@
-from pymodbus.client import ModbusTcpClient
-from datetime import datetime
 from uuid import uuid4
 
+from otsafe.utils.clock import get_clock
+from otsafe.utils.modbus import get_pool
+
 class Component:
     def __init__(
         self,
@@ -16,7 +17,7 @@ class Component:
         self.ip = ip
         self.port = port
         self.description = description
-        self.created_at = datetime.now()
+        self.created_at = get_clock().now()
         
         # Apply kwargs last so they can override the defaults
         self.__dict__.update(kwargs)
@@ -34,15 +35,7 @@ class Component:
         return hash(self.id)
 
     def read_modbus(self, register, count):
-        client = ModbusTcpClient(self.ip, self.port)
-        client.connect()
-        result = client.read_holding_registers(register, count)
-        client.close()
-        return result
+        return get_pool().execute(self.ip, self.port, "read_holding_registers", register, count=count)
 
     def write_modbus(self, register, value):
-        client = ModbusTcpClient(self.ip, self.port)
-        client.connect()
-        result = client.write_register(register, value)
-        client.close()
-        return result
+        return get_pool().execute(self.ip, self.port, "write_register", register, value)
@@ -0,0 +1,37 @@
+"""
+Value observers.  Components that mix in Observable publish every change of value to their subscribers, so safety functions can re-check as soon as a bound sensor changes instead of waiting for their next poll.
+
+Subscribers are called as `callback(component, value)`.  The subscriber list is an immutable tuple that is only replaced when someone subscribes or unsubscribes, so publishing allocates nothing, and a component with no subscribers pays only for one attribute check per assignment.
+"""
+
+from typing import Callable
+
+
+class Observable:
+
+    __slots__ = ()
+
+    _subscribers: tuple = None
+
+    def subscribe(self, callback: Callable) -> None:
+        """
+        Calls callback(component, value) every time the value changes.
+        """
+
+        self._subscribers = (self._subscribers or ()) + (callback,)
+
+    def unsubscribe(self, callback: Callable) -> None:
+        """
+        Stops calling callback.
+        """
+
+        subscribers = tuple(s for s in self._subscribers or () if s != callback)
+        self._subscribers = subscribers or None
+
+    def publish(self, value) -> None:
+        """
+        Calls every subscriber with the new value.
+        """
+
+        for callback in self._subscribers or ():
+            callback(self, value)
@@ -0,0 +1,153 @@
+"""
+Value ramps as scheduled trajectories.  Rather than stepping a value and sleeping between every step, a Ramp records where it started, where it is going and how long it takes, and works out the current value from the clock whenever it is read.  Nothing runs in the background, so any number of ramps can be in progress at once without a thread each.
+
+Three profiles are available:
+
+- "linear": moves at a constant rate from the start value to the target.
+- "exponential": approaches the target quickly at first and then slows down, like a first-order process, arriving exactly at the end of the ramp.
+- "step": moves in equal steps (by default steps of 1, like `change_value_over_time()`).
+
+A Ramp can be awaited, which sleeps on the event loop until it finishes and returns the target value.  The sleep goes through `get_clock()`, so under a Simulation it advances simulated time instead of waiting.
+"""
+
+import math
+from typing import Callable
+
+from otsafe.components.observers import Observable
+from otsafe.utils.clock import get_clock
+
+PROFILES = ("linear", "exponential", "step")
+
+# Rate of the exponential profile.  At 5 time constants a first-order process is within 1% of its target.
+EXPONENTIAL_RATE = 5
+
+
+class Ramp:
+
+    def __init__(
+        self,
+        start: float,
+        target: float,
+        duration: float,
+        profile: str = "linear",
+        steps: int = None,
+        clock: Callable[[], float] = None,
+    ):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile {profile}, expected one of {PROFILES}")
+
+        self.start = start
+        self.target = target
+        self.duration = duration
+        self.profile = profile
+        self.steps = steps or max(1, round(abs(target - start)))
+        self.clock = clock or get_clock().monotonic
+        self.started = self.clock()
+
+    def fraction(self, now: float = None) -> float:
+        """
+        Returns how far through the ramp we are, between 0 and 1.
+        """
+
+        if self.duration <= 0:
+            return 1.0
+        now = self.clock() if now is None else now
+        return min(max((now - self.started) / self.duration, 0.0), 1.0)
+
+    def value_at(self, now: float) -> float:
+        """
+        Returns the value of the ramp at a given clock time.
+        """
+
+        fraction = self.fraction(now)
+        if fraction >= 1:
+            return self.target
+
+        span = self.target - self.start
+        if self.profile == "linear":
+            return self.start + span * fraction
+        if self.profile == "exponential":
+            return self.start + span * (1 - math.exp(-EXPONENTIAL_RATE * fraction)) / (1 - math.exp(-EXPONENTIAL_RATE))
+        return self.start + span * math.floor(fraction * self.steps) / self.steps
+
+    def value(self) -> float:
+        """
+        Returns the current value of the ramp.
+        """
+
+        return self.value_at(self.clock())
+
+    def remaining(self) -> float:
+        """
+        Returns the number of seconds until the ramp reaches its target.
+        """
+
+        return max(self.started + self.duration - self.clock(), 0.0)
+
+    @property
+    def done(self) -> bool:
+        return self.remaining() == 0
+
+    async def wait(self) -> float:
+        """
+        Sleeps on the event loop until the ramp finishes.  Returns the target value.
+        """
+
+        while not self.done:
+            await get_clock().sleep_async(self.remaining())
+        return self.target
+
+    def __await__(self):
+        return self.wait().__await__()
+
+    def __repr__(self):
+        return f"Ramp({self.start} -> {self.target} over {self.duration}s, {self.profile})"
+
+
+class Rampable(Observable):
+    """
+    Mixin giving a component a `value` that can follow a Ramp.  Setting `value` directly cancels any ramp in progress.
+
+    Assigned values that differ from the current value are published to subscribers.  Ramped values are worked out when read, so they are not pushed as they move, only the value assigned when a blocking ramp such as `change_value_over_time()` finishes.
+    """
+
+    __slots__ = ()
+
+    _ramp = None
+
+    @property
+    def value(self):
+        ramp = self._ramp
+        if ramp is None:
+            return self._value
+
+        now = ramp.clock()
+        if now - ramp.started >= ramp.duration:
+            # Finished, fold the target back into the plain value
+            self._value = ramp.target
+            self._ramp = None
+            return self._value
+        return ramp.value_at(now)
+
+    @value.setter
+    def value(self, value) -> None:
+        if not self._subscribers:
+            self._ramp = None
+            self._value = value
+            return
+
+        previous = self.value
+        self._ramp = None
+        self._value = value
+        # Polls write the same value back every scan, only a change needs re-checking
+        if value != previous:
+            self.publish(value)
+
+    def ramp(self, target: float, duration: float, profile: str = "linear", steps: int = None) -> Ramp:
+        """
+        Starts moving the value towards target over duration seconds, without blocking.  Returns the Ramp, which can be awaited.
+        """
+
+        ramp = Ramp(self.value, target, duration, profile, steps)
+        self._ramp = ramp
+        return ramp
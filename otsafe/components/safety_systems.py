@@ -1,35 +1,116 @@
 import os
-import time
+from typing import Callable
 
 from otsafe.components.generic import Component
 from otsafe.components.sensors import Sensor
 from otsafe.components.actuators import Actuator
-from otsafe.components.alarms import Alarm
+from otsafe.exceptions.exceptions import AlarmException
+from otsafe.utils.clock import get_clock
 
 from dotenv import find_dotenv, load_dotenv
 
 load_dotenv(find_dotenv())
 
-SLEEP = os.getenv('SLEEP', 1)
+SLEEP = float(os.getenv('SLEEP', 1))
 
 
 class SIS(Component):
+
+    # Set by a TripTable when this SIS is registered with it
+    trip_table = None
+
+    # Sensor subscription installed by watch()
+    _watcher = None
+
+    # If set, run() publishes trips to this AlarmBus instead of raising them
+    alarm_bus = None
+
     def __init__(
             self,
             sensor: Sensor,
-            actuator: Actuator
+            actuator: Actuator,
+            name: str = None,
+            **kwargs
     ):
+        super().__init__(name)
         self.sensor = sensor
         self.actuator = actuator
+
+        # Apply kwargs last so they can override the defaults
+        self.__dict__.update(kwargs)
         
     def set_min(self, min: int) -> True:
         self.min = min
+        if self.trip_table is not None:
+            self.trip_table.update_setpoint(self)
         return True
     
     def set_max(self, max: int) -> True:
         self.max = max
+        if self.trip_table is not None:
+            self.trip_table.update_setpoint(self)
         return True
 
+    def check(self, intervene: bool = True) -> str | None:
+        """
+        Performs a single check of the sensor value against the set points.  Returns a message describing the trip, or None if the value is within range.
+
+        If intervene is set to True, the actuator will be opened on a low value and closed on a high value.
+        """
+
+        return self._evaluate(intervene)[1]
+
+    def _evaluate(self, intervene: bool) -> tuple[str | None, str | None]:
+        # Returns the tripped condition ("low" or "high") and its message
+        if self.sensor.value <= self.min:
+            message = f"Detected low value of {self.sensor.value} with set point {self.min}"
+            if intervene:
+                self.actuate(True)
+            return "low", message
+        elif self.sensor.value >= self.max:
+            message = f"Detected high value of {self.sensor.value} with set point {self.max}"
+            if intervene:
+                self.actuate(False)
+            return "high", message
+
+        return None, None
+
+    def actuate(self, open: bool) -> None:
+        """
+        Opens or closes the actuator.
+        """
+
+        self.actuator.open = open
+        self.actuator.last_modified = get_clock().now()
+
+    def watch(self, on_trip: Callable = None, intervene: bool = True) -> None:
+        """
+        Checks the SIS every time the sensor value changes, instead of polling it.  Trips are passed to on_trip(sis, message).
+        """
+
+        self.unwatch()
+
+        def changed(sensor, value):
+            message = self.check(intervene)
+            if message is not None and on_trip is not None:
+                on_trip(self, message)
+
+        self._attach(changed)
+
+    def _attach(self, watcher: Callable) -> None:
+        # Installs a watch callback, so one that was suspended can be put back
+        self._watcher = watcher
+        self.sensor.subscribe(watcher)
+
+    def unwatch(self) -> None:
+        """
+        Stops checking the SIS on sensor changes.
+        """
+
+        if self._watcher is not None:
+            self.sensor.unsubscribe(self._watcher)
+            self._watcher = None
+
     def run(self, check: bool = False, intervene: bool = True) -> None:
         """
         This multifunctional method will run the SIS, either with a single check, or in a continual loop. 
@@ -38,24 +119,20 @@ class SIS(Component):
         
         If intervene is set to True, the actuator will be triggered if a sensor value is out of the defined range. Otherwise, an alarm will be raised. 
 
-        The time between loop cycles can be overridden by setting the `SLEEP` value in the .env of the project. 
+        If an `alarm_bus` is set, trips are published to it and the loop keeps running.  Otherwise an AlarmException is raised.
+
+        The time between loop cycles can be overridden by setting the `SLEEP` value in the .env of the project.  To supervise many SIS instances from one thread, use the SISScheduler instead.
         """
         while True:
 
-            if self.sensor.value <= self.min:
-                message = f"Detected low value of {self.sensor.value} with set point {self.min}"
-                if intervene:
-                    self.actuator.open()
-                raise Alarm(message)
-            elif self.sensor.value >= self.max:
-                message = f"Detected high value of {self.sensor.value} with set point {self.max}"
-                if intervene:
-                    self.actuator.close()
-                raise Alarm(message)
-            
+            condition, message = self._evaluate(intervene)
+            if message is not None:
+                if self.alarm_bus is None:
+                    raise AlarmException(message)
+                self.alarm_bus.publish(self, condition, message)
+
+            if check:
+                return None
             else:
-                if check:
-                    return None
-                else:
-                    time.sleep(SLEEP)
-                    continue
\ No newline at end of file
+                get_clock().sleep(SLEEP)
+                continue
@@ -0,0 +1,147 @@
+"""
+One scheduler for many safety functions.  Instead of every SIS spinning its own `while True` loop (and so needing its own thread), the SISScheduler owns any number of SIS instances and runs each one's `check()` at a fixed rate on the monotonic clock, with its own scan interval.
+
+Scans are scheduled against the time they were due rather than the time the previous scan finished, so the check time does not add up as drift.  For every safety function the scheduler records how late each scan started (jitter), how long the check took, and any overruns, where a scan took longer than its interval or a whole interval was missed.  From these, `ScanStats.worst_latency` gives the longest time a trip could have gone undetected.
+
+Works with both `safety_systems.SIS` and `sis.SIS`, and with the Simulation clock.
+"""
+
+import heapq
+from itertools import count
+from typing import Any, Callable
+
+from otsafe.components.safety_systems import SLEEP
+from otsafe.utils.clock import get_clock
+
+
+class ScanStats:
+    """
+    Scan timing for a single safety function.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.scans = 0
+        self.trips = 0
+        self.overruns = 0
+        self.missed = 0
+        self.last_jitter = 0.0
+        self.max_jitter = 0.0
+        self.total_jitter = 0.0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+
+    @property
+    def avg_jitter(self) -> float:
+        return self.total_jitter / self.scans if self.scans else 0.0
+
+    @property
+    def worst_latency(self) -> float:
+        """
+        The longest time between a value going out of range and the trip being detected.
+        """
+
+        return self.interval + self.max_jitter + self.max_duration
+
+    def within_budget(self, budget: float) -> bool:
+        return self.worst_latency <= budget
+
+    def __repr__(self):
+        return f"ScanStats(scans={self.scans}, trips={self.trips}, overruns={self.overruns}, max_jitter={self.max_jitter}, max_duration={self.max_duration})"
+
+
+class SISScheduler:
+
+    def __init__(self, on_trip: Callable[[Any, str], None] = None):
+        self.on_trip = on_trip
+        self.stats: dict[Any, ScanStats] = {}
+
+        self._queue: list = []
+        self._sequence = count()
+        self._running = False
+
+    def add(self, sis: Any, interval: float = SLEEP, **check_kwargs) -> None:
+        """
+        Adds a safety function, to be checked every interval seconds.  Any check_kwargs (such as `intervene=False`) are passed to its `check()`.
+        """
+
+        if sis in self.stats:
+            self.remove(sis)
+        self.stats[sis] = ScanStats(interval)
+        heapq.heappush(self._queue, (get_clock().monotonic(), next(self._sequence), sis, interval, check_kwargs))
+
+    def remove(self, sis: Any) -> None:
+        """
+        Stops checking a safety function.
+        """
+
+        self.stats.pop(sis, None)
+        self._queue = [entry for entry in self._queue if entry[2] is not sis]
+        heapq.heapify(self._queue)
+
+    def run_pending(self) -> float | None:
+        """
+        Runs every check that is due.  Returns the monotonic time the next check is due, or None if there is nothing to check.
+        """
+
+        clock = get_clock()
+
+        while self._queue and self._queue[0][0] <= clock.monotonic():
+            due, _, sis, interval, check_kwargs = heapq.heappop(self._queue)
+            stats = self.stats[sis]
+
+            started = clock.monotonic()
+            message = sis.check(**check_kwargs)
+            finished = clock.monotonic()
+
+            jitter = started - due
+            stats.scans += 1
+            stats.last_jitter = jitter
+            stats.max_jitter = max(stats.max_jitter, jitter)
+            stats.total_jitter += jitter
+            stats.last_duration = finished - started
+            stats.max_duration = max(stats.max_duration, stats.last_duration)
+
+            # Keep to the fixed rate, skipping any scans that can no longer happen on time
+            next_due = due + interval
+            if finished - started > interval or finished >= next_due:
+                stats.overruns += 1
+                if finished >= next_due:
+                    skipped = int((finished - next_due) // interval) + 1
+                    stats.missed += skipped
+                    next_due += skipped * interval
+            heapq.heappush(self._queue, (next_due, next(self._sequence), sis, interval, check_kwargs))
+
+            if message is not None:
+                stats.trips += 1
+                if self.on_trip is not None:
+                    self.on_trip(sis, message)
+
+        return self._queue[0][0] if self._queue else None
+
+    def run(self, duration: float = None) -> None:
+        """
+        Runs the checks until `stop()` is called, or for duration seconds.
+        """
+
+        clock = get_clock()
+        end = None if duration is None else clock.monotonic() + duration
+        self._running = True
+
+        while self._running:
+            next_due = self.run_pending()
+            if next_due is None:
+                break
+            if end is not None and next_due > end:
+                clock.sleep(max(end - clock.monotonic(), 0))
+                break
+            clock.sleep(max(next_due - clock.monotonic(), 0))
+
+        self._running = False
+
+    def stop(self) -> None:
+        """
+        Stops the scheduler after the current checks finish.
+        """
+
+        self._running = False
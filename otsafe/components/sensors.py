@@ -10,12 +10,14 @@ Calling the change_value_over_time() method allows you to simulate a sensor whos
 
 from datetime import datetime
 from random import random
-from time import sleep
 
 from otsafe.components.generic import Component
+from otsafe.components.ramps import Rampable
+from otsafe.components.noise import NoiseGenerator
+from otsafe.utils.clock import get_clock
 
 
-class Sensor(Component):
+class Sensor(Component, Rampable):
 
     def __init__(
         self,
@@ -28,7 +30,7 @@ class Sensor(Component):
         self.value: int | str = value
         self.unit: str = unit
         self.__dict__.update(kwargs)
-        self.last_updated: datetime = datetime.now()
+        self.last_updated: datetime = get_clock().now()
         
         # Apply kwargs last so they can override the defaults
         self.__dict__.update(kwargs)
@@ -49,22 +51,39 @@ class Sensor(Component):
         )  
         return f"{_value}{self.unit}"
 
+    def noisy_samples(
+        self, percentage: float, n: int, distribution: str = "uniform", seed: int = None, drift: float = 0.0
+    ):
+        """
+        Returns n numeric noisy readings as a NumPy array.  See otsafe.components.noise for the available distributions.
+        """
+
+        return NoiseGenerator(percentage, distribution, seed, drift).samples(self.value, n)
+
+    def noisy_stream(
+        self,
+        percentage: float,
+        chunk_size: int = 10_000,
+        total: int = None,
+        distribution: str = "uniform",
+        seed: int = None,
+        drift: float = 0.0,
+    ):
+        """
+        Yields chunks of numeric noisy readings as NumPy arrays, so long simulations run in constant memory.
+        """
+
+        return NoiseGenerator(percentage, distribution, seed, drift).stream(self.value, chunk_size, total)
+
     def change_value_over_time(self, value: int, seconds: int):
         """
-        Changes the value of the sensor over time.  The value is changed by 1 every second until the desired value is reached.  Returns the new value.
+        Changes the value of the sensor over time.  The value is changed by 1 every `seconds` seconds until the desired value is reached.  Blocks until then, and returns the new value.  Use `ramp()` to change the value without blocking.
         """
-          
-        if value > self.value:
-            while self.value < value:
-                self.value += 1
-                sleep(seconds)
-        elif value < self.value:
-            while self.value > value:
-                self.value -= 1
-                sleep(seconds)
-        else:
-            self.value
-
-        self.last_updated = datetime.now()
-
-        return self.value
\ No newline at end of file
+
+        ramp = self.ramp(value, abs(value - self.value) * seconds, "step")
+        get_clock().sleep(ramp.remaining())
+        self.value = value
+
+        self.last_updated = get_clock().now()
+
+        return self.value
@@ -3,13 +3,24 @@ This class is designed to represent a Safety Instrumented System.  It has a name
 """
 
 from datetime import datetime
-from time import sleep
+from typing import Callable
 
 from otsafe.components.generic import Component
+from otsafe.components.ramps import Rampable
 from otsafe.components.alarms import Alarm
+from otsafe.utils.clock import get_clock
 
 
-class SIS(Component):
+class SIS(Component, Rampable):
+
+    # Set by a TripTable when this SIS is registered with it
+    trip_table = None
+
+    # Value subscription installed by watch()
+    _watcher = None
+
+    # If set, alarms are published to this AlarmBus instead of raised
+    alarm_bus = None
 
     def __init__(
         self,
@@ -23,7 +34,7 @@ class SIS(Component):
         self.value: int | str = value
         self.unit: str = unit
         self.__dict__.update(kwargs)
-        self.last_updated: datetime = datetime.now()
+        self.last_updated: datetime = get_clock().now()
         
         # Apply kwargs last so they can override the defaults
         self.__dict__.update(kwargs)
@@ -35,6 +46,8 @@ class SIS(Component):
         """
 
         self.min_alarm_value = value
+        if self.trip_table is not None:
+            self.trip_table.update_setpoint(self)
         if self.value <= value:
             self.raise_alarm("Min alarm SIS triggered!")
 
@@ -45,35 +58,88 @@ class SIS(Component):
         """
 
         self.max_alarm_value = value
+        if self.trip_table is not None:
+            self.trip_table.update_setpoint(self)
         if self.value >= value:
             self.raise_alarm("Max alarm SIS triggered!")
 
     
     def raise_alarm(self, message) -> None:
         """
-        Raises the alarm.
+        Raises the alarm.  If an `alarm_bus` is set, the alarm is published to it instead, and the AlarmEvent is returned.
         """
 
+        if self.alarm_bus is not None:
+            return self.alarm_bus.publish(self, message, message)
+
         return Alarm(alarm=True, name = self.name, message=message)
 
 
+    def check(self) -> str | None:
+        """
+        Performs a single check of the value against the alarm values, without raising anything.  Returns the alarm message, or None if the value is within range.
+        """
+
+        min_alarm_value = getattr(self, "min_alarm_value", None)
+        max_alarm_value = getattr(self, "max_alarm_value", None)
+
+        if min_alarm_value is not None and self.value <= min_alarm_value:
+            return "Min alarm SIS triggered!"
+        elif max_alarm_value is not None and self.value >= max_alarm_value:
+            return "Max alarm SIS triggered!"
+
+        return None
+
+
+    def watch(self, on_trip: Callable = None, intervene: bool = False) -> None:
+        """
+        Checks the SIS every time its value changes, instead of polling it.  Alarms are passed to on_trip(sis, message) rather than raised.
+
+        This SIS has no actuator to drive, so intervene has no effect.  It is accepted so that both SIS classes can be watched the same way.
+        """
+
+        self.unwatch()
+
+        def changed(sis, value):
+            message = self.check()
+            if message is not None and on_trip is not None:
+                on_trip(self, message)
+
+        self._attach(changed)
+
+
+    def _attach(self, watcher: Callable) -> None:
+        # Installs a watch callback, so one that was suspended can be put back
+        self._watcher = watcher
+        self.subscribe(watcher)
+
+
+    def unwatch(self) -> None:
+        """
+        Stops checking the SIS on value changes.
+        """
+
+        if self._watcher is not None:
+            self.unsubscribe(self._watcher)
+            self._watcher = None
+
+
     def run(self, interval: int = 1, check: bool = False) -> None:
         """
         Runs the SIS.  This is the main loop of the SIS.
         """
 
         if check:
-            if self.value <= self.min_alarm_value:
-                self.raise_alarm("Min alarm SIS triggered!")
-            elif self.value >= self.max_alarm_value:
-                self.raise_alarm("Max alarm SIS triggered!")
+            message = self.check()
+            if message is not None:
+                return self.raise_alarm(message)
             else:
                 return("SIS operating nominally.")
 
         while True:
             self.set_min_alarm(self.min_alarm_value)
             self.set_max_alarm(self.max_alarm_value)
-            sleep(interval)
+            get_clock().sleep(interval)
 
 
     def read(self) -> str:
@@ -82,20 +148,13 @@ class SIS(Component):
 
     def change_value_over_time(self, value: int, seconds: int):
         """
-        Changes the value of the sensor over time.  The value is changed by 1 every second until the desired value is reached.  Returns the new value.
+        Changes the value of the sensor over time.  The value is changed by 1 every `seconds` seconds until the desired value is reached.  Blocks until then, and returns the new value.  Use `ramp()` to change the value without blocking.
         """
-          
-        if value > self.value:
-            while self.value < value:
-                self.value += 1
-                sleep(seconds)
-        elif value < self.value:
-            while self.value > value:
-                self.value -= 1
-                sleep(seconds)
-        else:
-            self.value
 
-        self.last_updated = datetime.now()
+        ramp = self.ramp(value, abs(value - self.value) * seconds, "step")
+        get_clock().sleep(ramp.remaining())
+        self.value = value
+
+        self.last_updated = get_clock().now()
 
-        return self.value
\ No newline at end of file
+        return self.value
@@ -0,0 +1,538 @@
+"""
+YAML detection rules.  Rules are parsed once and compiled into Python functions, so evaluating one against a component state change is a single call rather than a walk over nested dicts.
+
+A rule file holds a list of rules, either at the top level or under `rules:`:
+
+    rules:
+      - id: high-pressure
+        description: Vessel pressure above its design limit
+        severity: high
+        result: unsafe                  # unsafe (UnsafeCondition) or impossible (ImpossibleCondition)
+        match:
+          type: Sensor                  # class name, matched against the component's base classes too
+          id: PT-1*                     # a glob or a list of globs
+        when:
+          value: {gt: 150}
+        message: "{id} at {value}{unit}, above 150"
+
+`when` is a condition.  A condition maps attribute names to tests (several keys must all hold), or combines conditions with `all`, `any` and `not`.  A test is a plain value (equality) or a mapping of operators: eq, ne, gt, ge, lt, le, in, not_in, between, outside, matches (a regular expression) and is_null.  An operand can be a constant, `{attr: name}` for another attribute of the same component, or `{ref: COMPONENT.attribute}` for an attribute of another registered component:
+
+      - id: flame-without-heat
+        result: impossible
+        match: {type: Burner}
+        when:
+          all:
+            - flame: true
+            - temperature: {lt: {ref: TT-101.value}}
+
+Matching rules produce UnsafeCondition or ImpossibleCondition results carrying the rule, the component and the formatted message.  A rule whose attributes are missing, or not comparable, does not match.
+"""
+
+import fnmatch
+import keyword
+import os
+import re
+from typing import Any, Callable, Iterable
+
+import yaml
+
+from otsafe.exceptions.exceptions import ImpossibleCondition, UnsafeCondition
+
+RESULTS = {
+    "unsafe": UnsafeCondition,
+    "impossible": ImpossibleCondition,
+}
+
+COMPARISONS = {
+    "eq": "==",
+    "ne": "!=",
+    "gt": ">",
+    "ge": ">=",
+    "gte": ">=",
+    "lt": "<",
+    "le": "<=",
+    "lte": "<=",
+    "in": "in",
+    "not_in": "not in",
+}
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+class Rule:
+    """
+    A compiled detection rule.  `predicate(component, components)` returns True when the rule matches, with components mapping ids to the registered components for `ref` operands.  `applies(component class, component id)` tells whether the rule's match selects a component.
+
+    `attributes` holds the names of the component attributes the rule tests, and `references` the (component id, attribute) pairs of its `ref` operands.  `component_ids` holds the ids the rule is limited to when its match lists exact ids, and is None otherwise.
+    """
+
+    def __init__(
+        self,
+        id: str,
+        predicate: Callable,
+        applies: Callable,
+        result: type = UnsafeCondition,
+        message: str = None,
+        severity: str = None,
+        description: str = None,
+        attributes: frozenset = frozenset(),
+        references: frozenset = frozenset(),
+        component_ids: frozenset = None,
+        source: dict = None
+    ):
+        self.id = id
+        self.predicate = predicate
+        self.applies = applies
+        self.result = result
+        self.message = message or f"Rule {id} matched {{id}}"
+        self.severity = severity
+        self.description = description
+        self.attributes = attributes
+        self.references = references
+        self.component_ids = component_ids
+        self.source = source
+
+    def evaluate(self, component: Any, components: dict = None) -> Exception | None:
+        """
+        Returns an UnsafeCondition or ImpossibleCondition if the rule matches the component, otherwise None.
+        """
+
+        if not self.applies(type(component), component.id):
+            return None
+        try:
+            if not self.predicate(component, components):
+                return None
+        except (AttributeError, KeyError, TypeError):
+            return None
+        return self.alert(component)
+
+    def alert(self, component: Any) -> Exception:
+        """
+        Builds the result for a component that matched.
+        """
+
+        try:
+            message = self.message.format_map(_Attributes(component))
+        except (AttributeError, KeyError, ValueError, IndexError):
+            message = self.message
+        result = self.result(message)
+        result.rule = self
+        result.component = component
+        result.severity = self.severity
+        return result
+
+    def __repr__(self):
+        return f"Rule({self.id}, {self.result.__name__})"
+
+
+def compile_rule(source: dict) -> Rule:
+    """
+    Compiles a rule definition (one entry of a rule file) into a Rule.
+    """
+
+    if not isinstance(source, dict) or "id" not in source or "when" not in source:
+        raise ValueError(f"A rule needs an id and a when condition: {source!r}")
+
+    rule_id = str(source["id"])
+    result = RESULTS.get(source.get("result", "unsafe"))
+    if result is None:
+        raise ValueError(f"Rule {rule_id}: result must be one of {', '.join(RESULTS)}")
+
+    compiler = _Compiler(rule_id)
+    expression = compiler.condition(source["when"])
+    namespace = dict(compiler.constants)
+    code = f"def predicate(c, components):\n    return {expression}\n"
+    exec(compile(code, f"<rule {rule_id}>", "exec"), namespace)
+
+    return Rule(
+        rule_id,
+        namespace["predicate"],
+        _compile_match(rule_id, source.get("match") or {}),
+        result,
+        source.get("message"),
+        source.get("severity"),
+        source.get("description"),
+        frozenset(compiler.attributes),
+        frozenset(compiler.references),
+        _exact_ids(source.get("match") or {}),
+        source,
+    )
+
+
+def load_rules(path: str) -> list[Rule]:
+    """
+    Loads and compiles the rules in a YAML file, or in every .yaml and .yml file of a directory.
+    """
+
+    rules = []
+    for file_path in yaml_files(path):
+        with open(file_path) as rule_file:
+            rules += parse_rules(rule_file.read())
+    return rules
+
+
+def yaml_files(path: str) -> list[str]:
+    """
+    Returns path if it is a file, or the .yaml and .yml files in it, sorted, if it is a directory.
+    """
+
+    if not os.path.isdir(path):
+        return [path]
+    return [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith((".yaml", ".yml"))]
+
+
+def parse_rules(text: str) -> list[Rule]:
+    """
+    Compiles the rules in a YAML document.
+    """
+
+    document = yaml.safe_load(text)
+    if document is None:
+        return []
+    if isinstance(document, dict):
+        document = document.get("rules") or []
+    return [compile_rule(source) for source in document]
+
+
+class RuleEngine:
+    """
+    Evaluates compiled rules against component state changes.
+
+    Rules are indexed by the attributes they test (and the component ids they are limited to) and by the components they reference, so a change only reaches the rules that depend on it.  The rules for each (component class, component id, changed attribute) are worked out on first use and cached, and adding or removing a rule updates the index and the cache in place.  A change to an attribute referenced by a `ref` operand re-evaluates the referencing rules against every registered component they apply to.
+
+    Components referenced by `ref` operands must be registered.  The engine can also be used as a detection for CaptureAnalyzer and ReplayEngine, returning the messages of the rules that matched.
+    """
+
+    def __init__(self, rules: Iterable[Rule] = (), components: Iterable = ()):
+        self.rules: list[Rule] = []
+        self.components: dict[str, Any] = {}
+        self.evaluations = 0
+        self.matches = 0
+
+        self._by_attribute: dict[tuple, list[Rule]] = {}
+        self._by_reference: dict[str, list[Rule]] = {}
+        self._dispatch: dict[tuple, tuple] = {}
+        self._targets: dict[int, tuple] = {}
+        self._order: dict[int, int] = {}
+        self._added = 0
+        self._watched: dict[int, tuple] = {}
+
+        for component in components:
+            self.register(component)
+        for rule in rules:
+            self.add(rule)
+
+    @classmethod
+    def from_yaml(cls, path: str, components: Iterable = ()) -> "RuleEngine":
+        return cls(load_rules(path), components)
+
+    def add(self, rule: Rule) -> None:
+        self.rules.append(rule)
+        self._order[id(rule)] = self._added
+        self._added += 1
+        for key in _attribute_keys(rule):
+            self._by_attribute.setdefault(key, []).append(rule)
+        for component_id in {component_id for component_id, _ in rule.references}:
+            self._by_reference.setdefault(component_id, []).append(rule)
+
+        for key, rules in self._dispatch.items():
+            cls, component_id, attribute = key
+            if (attribute is None or attribute in rule.attributes) and rule.applies(cls, component_id):
+                self._dispatch[key] = rules + (rule,)
+
+    def remove(self, rule: Rule | str) -> None:
+        """
+        Removes a rule, or the rule with the given id.
+        """
+
+        if isinstance(rule, str):
+            rule = self.rule(rule)
+        self.rules.remove(rule)
+        for index, keys in ((self._by_attribute, _attribute_keys(rule)), (self._by_reference, {c for c, _ in rule.references})):
+            for key in keys:
+                index[key].remove(rule)
+                if not index[key]:
+                    del index[key]
+
+        for key, rules in self._dispatch.items():
+            if rule in rules:
+                self._dispatch[key] = tuple(r for r in rules if r is not rule)
+        self._targets.pop(id(rule), None)
+        self._order.pop(id(rule), None)
+
+    def rule(self, rule_id: str) -> Rule:
+        for rule in self.rules:
+            if rule.id == rule_id:
+                return rule
+        raise KeyError(rule_id)
+
+    def register(self, component: Any) -> None:
+        """
+        Makes a component available to `ref` operands, and to the rules re-evaluated when a referenced attribute changes.
+        """
+
+        self.components[component.id] = component
+        self._targets.clear()
+
+    def dispatch(self, component: Any, attribute: str = None) -> tuple:
+        """
+        Returns the rules that apply to a component and test attribute, or every rule that applies to it if attribute is None.
+        """
+
+        key = (type(component), component.id, attribute)
+        rules = self._dispatch.get(key)
+        if rules is None:
+            if attribute is None:
+                candidates = self.rules
+            else:
+                # Rules limited to this id, and rules that could match any id, in the order they were added
+                candidates = self._by_attribute.get((attribute, component.id), []) + self._by_attribute.get((attribute, None), [])
+                candidates.sort(key=lambda rule: self._order[id(rule)])
+            rules = self._dispatch[key] = tuple(rule for rule in candidates if rule.applies(key[0], key[1]))
+        return rules
+
+    def evaluate(self, component: Any, attribute: str = None) -> list[Exception]:
+        """
+        Evaluates the rules that depend on a component's changed attribute, or every rule that applies to it if attribute is None.  Returns the UnsafeCondition and ImpossibleCondition results of the rules that matched.
+        """
+
+        rules = self.dispatch(component, attribute)
+        results = self._run(rules, component)
+        self.evaluations += len(rules)
+
+        referencing = self._by_reference.get(component.id)
+        if referencing:
+            for rule in referencing:
+                if attribute is not None and (component.id, attribute) not in rule.references:
+                    continue
+                for target in self._rule_targets(rule):
+                    if target is component and rule in rules:
+                        continue
+                    self.evaluations += 1
+                    results += self._run((rule,), target)
+
+        self.matches += len(results)
+        return results
+
+    def process(self, changes: Iterable) -> Iterable[Exception]:
+        """
+        Evaluates a stream of changed components, or (component, attribute, value) tuples, and yields the results.
+        """
+
+        for change in changes:
+            if isinstance(change, tuple):
+                yield from self.evaluate(change[0], change[1])
+            else:
+                yield from self.evaluate(change)
+
+    def check(self, component: Any, attribute: str = None) -> None:
+        """
+        Raises the first result for a component, if any rule matches.
+        """
+
+        results = self.evaluate(component, attribute)
+        if results:
+            raise results[0]
+
+    def watch(self, component: Any, on_result: Callable) -> None:
+        """
+        Evaluates the rules every time the component's value changes, passing each result to on_result(result).
+        """
+
+        self.unwatch(component)
+
+        def changed(component, value):
+            for result in self.evaluate(component, "value"):
+                on_result(result)
+
+        self._watched[id(component)] = (component, changed)
+        component.subscribe(changed)
+
+    def unwatch(self, component: Any) -> None:
+        watched = self._watched.pop(id(component), None)
+        if watched is not None:
+            component.unsubscribe(watched[1])
+
+    def __call__(self, timestamp: float, component: Any, attribute: str, value: Any) -> str | None:
+        results = self.evaluate(component, attribute)
+        return "; ".join(result.message for result in results) if results else None
+
+    def __getstate__(self) -> dict:
+        # Compiled predicates cannot be pickled, so worker processes recompile from the sources
+        return {"rules": [rule.source for rule in self.rules], "components": self.components}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__((compile_rule(source) for source in state["rules"]), state["components"].values())
+
+    def _run(self, rules: tuple, component: Any) -> list[Exception]:
+        results = []
+        components = self.components
+        for rule in rules:
+            try:
+                matched = rule.predicate(component, components)
+            except (AttributeError, KeyError, TypeError):
+                continue
+            if matched:
+                results.append(rule.alert(component))
+        return results
+
+    def _rule_targets(self, rule: Rule) -> tuple:
+        targets = self._targets.get(id(rule))
+        if targets is None:
+            targets = self._targets[id(rule)] = tuple(
+                component for component in self.components.values() if rule.applies(type(component), component.id)
+            )
+        return targets
+
+
+def _attribute_keys(rule: Rule) -> list[tuple]:
+    # (attribute, component id) index keys of a rule, with None for rules that can match any id
+    ids = rule.component_ids or (None,)
+    return [(attribute, component_id) for attribute in rule.attributes for component_id in ids]
+
+
+class _Compiler:
+    # Turns a `when` condition into a Python expression over `c` (the component) and `components`
+
+    def __init__(self, rule_id: str):
+        self.rule_id = rule_id
+        self.constants: dict[str, Any] = {}
+        self.attributes: set[str] = set()
+        self.references: set[tuple] = set()
+
+    def condition(self, node: Any) -> str:
+        if isinstance(node, list):
+            return self.combine("and", node)
+        if not isinstance(node, dict) or not node:
+            raise self.error(f"expected a condition, got {node!r}")
+
+        parts = []
+        for key, value in node.items():
+            if key == "all":
+                parts.append(self.combine("and", value))
+            elif key == "any":
+                parts.append(self.combine("or", value))
+            elif key == "not":
+                parts.append(f"(not {self.condition(value)})")
+            else:
+                parts.append(self.test(self.attribute(key), value))
+        return parts[0] if len(parts) == 1 else "(" + " and ".join(parts) + ")"
+
+    def combine(self, joiner: str, nodes: Any) -> str:
+        if not isinstance(nodes, list) or not nodes:
+            raise self.error(f"all/any need a list of conditions, got {nodes!r}")
+        return "(" + f" {joiner} ".join(self.condition(node) for node in nodes) + ")"
+
+    def test(self, subject: str, test: Any) -> str:
+        if not isinstance(test, dict) or self.is_operand(test):
+            return f"({subject} == {self.operand(test)})"
+
+        parts = []
+        for operator, operand in test.items():
+            if operator in COMPARISONS:
+                parts.append(f"({subject} {COMPARISONS[operator]} {self.operand(operand)})")
+            elif operator in ("between", "outside"):
+                if not isinstance(operand, list) or len(operand) != 2:
+                    raise self.error(f"{operator} needs [low, high], got {operand!r}")
+                low, high = self.operand(operand[0]), self.operand(operand[1])
+                between = f"({low} <= {subject} <= {high})"
+                parts.append(between if operator == "between" else f"(not {between})")
+            elif operator == "matches":
+                try:
+                    pattern = self.constant(re.compile(str(operand)))
+                except re.error as e:
+                    raise self.error(f"invalid regular expression {operand!r}: {e}")
+                parts.append(f"({pattern}.search(str({subject})) is not None)")
+            elif operator == "is_null":
+                parts.append(f"({subject} is {'' if operand else 'not '}None)")
+            else:
+                raise self.error(f"unknown operator {operator!r}")
+        return parts[0] if len(parts) == 1 else "(" + " and ".join(parts) + ")"
+
+    def operand(self, operand: Any) -> str:
+        if isinstance(operand, dict) and "attr" in operand:
+            return self.attribute(operand["attr"])
+        if isinstance(operand, dict) and "ref" in operand:
+            component, _, attribute = str(operand["ref"]).rpartition(".")
+            if not component:
+                raise self.error(f"ref must be COMPONENT.attribute, got {operand['ref']!r}")
+            self.references.add((component, attribute))
+            return f"components[{self.constant(component)}].{self.name(attribute)}"
+        if isinstance(operand, list):
+            operand = tuple(operand)
+        return self.constant(operand)
+
+    @staticmethod
+    def is_operand(test: dict) -> bool:
+        return len(test) == 1 and ("attr" in test or "ref" in test)
+
+    def attribute(self, name: Any) -> str:
+        self.attributes.add(str(name))
+        return f"c.{self.name(name)}"
+
+    def name(self, name: Any) -> str:
+        # Attribute names are inlined into the generated code, so only plain identifiers are allowed
+        name = str(name)
+        if not _IDENTIFIER.fullmatch(name) or keyword.iskeyword(name) or name.startswith("__"):
+            raise self.error(f"invalid attribute name {name!r}")
+        return name
+
+    def constant(self, value: Any) -> str:
+        # Constants are passed in the namespace, never inlined as source
+        key = f"_k{len(self.constants)}"
+        self.constants[key] = value
+        return key
+
+    def error(self, problem: str) -> ValueError:
+        return ValueError(f"Rule {self.rule_id}: {problem}")
+
+
+class _Attributes(dict):
+    # Looks up message placeholders on the component
+    def __init__(self, component: Any):
+        super().__init__()
+        self.component = component
+
+    def __missing__(self, key: str) -> Any:
+        return getattr(self.component, key)
+
+
+def _exact_ids(match: dict) -> frozenset | None:
+    # The ids a match is limited to, if it lists ids without glob characters
+    ids = match.get("id")
+    if ids is None:
+        return None
+    ids = [str(i) for i in ([ids] if isinstance(ids, str) else ids)]
+    if any(char in i for i in ids for char in "*?["):
+        return None
+    return frozenset(ids)
+
+
+def _compile_match(rule_id: str, match: dict) -> Callable:
+    # Returns a function telling whether a rule applies to a component class and id, by class name and id glob
+    unknown = set(match) - {"type", "id"}
+    if unknown:
+        raise ValueError(f"Rule {rule_id}: unknown match keys {', '.join(sorted(unknown))}")
+
+    types = match.get("type")
+    types = None if types is None else frozenset([types] if isinstance(types, str) else types)
+    ids = match.get("id")
+    ids = None if ids is None else re.compile(
+        "|".join(fnmatch.translate(str(pattern)) for pattern in ([ids] if isinstance(ids, str) else ids))
+    )
+
+    if types is None and ids is None:
+        return lambda cls, component_id: True
+
+    type_matches: dict[type, bool] = {}
+
+    def applies(cls: type, component_id: str) -> bool:
+        if types is not None:
+            matches = type_matches.get(cls)
+            if matches is None:
+                matches = type_matches[cls] = bool(types.intersection(base.__name__ for base in cls.__mro__))
+            if not matches:
+                return False
+        return ids is None or ids.match(str(component_id)) is not None
+
+    return applies
@@ -0,0 +1,518 @@
+"""
+Stateful, time-windowed detections.  A rule in otsafe.detections.rules judges one component state at a time; these judge how states evolve, and how they relate across components:
+
+- RateOfChange: a value moving faster than a limit, smoothed over a time window.
+- DurationAbove: a value above (or below) a threshold for at least a duration.
+- WhileUnchanged: one condition true for a duration while another value has not moved, for example a burner with a flame while the outlet temperature stays flat.
+- Deviation: redundant sensors disagreeing by more than a limit, optionally for a duration.
+
+Each detection keeps a fixed handful of numbers per component it follows and updates them incrementally, so memory is bounded by the components named in the detection and no history is ever re-scanned.  A detection fires once when its condition is met and re-arms when the condition clears.
+
+Values are fed in with `WindowEngine.update()`, by watching components that publish their `value` with `WindowEngine.watch()`, or by using the engine as a detection of a ModbusDecoder-driven ReplayEngine or CaptureAnalyzer, which also covers other attributes such as a Burner's `flame`.  Updates with non-numeric values are skipped by the detections that do arithmetic on them.
+
+Time comes from the timestamp of each update (for example the capture time of a packet) or, when there is none, from `get_clock().monotonic()`.  Duration-based detections can also be checked between updates with `WindowEngine.tick()`.
+
+Detections can be declared in YAML under `windows:`, next to `rules:`.  Components and attributes are written as COMPONENT.attribute, and a test is a plain value (equality) or a mapping of eq, ne, gt, ge, lt and le:
+
+    windows:
+      - id: flame-without-heat
+        kind: while_unchanged
+        result: impossible
+        condition: B-1.flame
+        test: true
+        unchanged: TT-101.value
+        tolerance: 1
+        duration: 60
+"""
+
+import math
+import operator
+from typing import Any, Callable, Iterable
+
+import yaml
+
+from otsafe.detections.rules import RESULTS, yaml_files
+from otsafe.exceptions.exceptions import UnsafeCondition
+from otsafe.utils.clock import get_clock
+
+OPERATORS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "ge": operator.ge,
+    "lt": operator.lt,
+    "le": operator.le,
+}
+
+
+class WindowDetection:
+    """
+    Base class for stateful detections.  `inputs` holds the (component id, attribute) pairs the detection follows.
+    """
+
+    default_message = "{id} triggered on {component}"
+
+    def __init__(self, id: str, message: str = None, result: type = UnsafeCondition, severity: str = None):
+        self.id = id
+        self.message = message or self.default_message
+        self.result = result
+        self.severity = severity
+        self.inputs: frozenset = frozenset()
+
+    def update(self, timestamp: float, component: Any, attribute: str, value: Any) -> Exception | None:
+        """
+        Folds a new value into the state.  Returns a result if the detection fires.
+        """
+
+        raise NotImplementedError
+
+    def tick(self, timestamp: float) -> list[Exception]:
+        """
+        Checks duration-based conditions without a new value.  Returns any results.
+        """
+
+        return []
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+    def alert(self, component: Any, timestamp: float, **fields) -> Exception:
+        try:
+            message = self.message.format(id=self.id, component=component, **fields)
+        except (KeyError, ValueError, IndexError):
+            message = self.message
+        result = self.result(message)
+        result.rule = self
+        result.component = component
+        result.severity = self.severity
+        result.timestamp = timestamp
+        return result
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.id})"
+
+
+class RateOfChange(WindowDetection):
+    """
+    Fires when a value changes faster than limit units per second.  The rate is an exponentially weighted average with a time constant of window seconds, so single noisy samples do not trip it.
+    """
+
+    default_message = "{component} changing at {rate:.3g}/s, limit {limit}"
+
+    def __init__(self, id: str, components: Iterable[str], limit: float, window: float = 0, attribute: str = "value", **kwargs):
+        super().__init__(id, **kwargs)
+        self.limit = limit
+        self.window = window
+        self.inputs = frozenset((component, attribute) for component in _ids(components))
+        # component id -> [time, value, rate, fired]
+        self._state: dict[str, list] = {}
+
+    def update(self, timestamp, component, attribute, value):
+        value = _number(value)
+        if value is None:
+            return None
+
+        state = self._state.get(component.id)
+        if state is None:
+            self._state[component.id] = [timestamp, value, 0.0, False]
+            return None
+
+        elapsed = timestamp - state[0]
+        if elapsed <= 0:
+            return None
+        instant = (value - state[1]) / elapsed
+        weight = 1.0 if not self.window else 1 - math.exp(-elapsed / self.window)
+        rate = state[2] + weight * (instant - state[2])
+        state[0], state[1], state[2] = timestamp, value, rate
+
+        if abs(rate) <= self.limit:
+            state[3] = False
+            return None
+        if state[3]:
+            return None
+        state[3] = True
+        return self.alert(component, timestamp, rate=rate, limit=self.limit, value=value)
+
+    def reset(self):
+        self._state.clear()
+
+
+class DurationAbove(WindowDetection):
+    """
+    Fires when a value stays above threshold (or below it, if below is True) for duration seconds.
+    """
+
+    default_message = "{component} beyond {threshold} for {elapsed:.0f}s"
+
+    def __init__(
+        self,
+        id: str,
+        components: Iterable[str],
+        threshold: float,
+        duration: float,
+        attribute: str = "value",
+        below: bool = False,
+        **kwargs
+    ):
+        super().__init__(id, **kwargs)
+        self.threshold = threshold
+        self.duration = duration
+        self.below = below
+        self.inputs = frozenset((component, attribute) for component in _ids(components))
+        # component id -> [component, since, fired]
+        self._state: dict[str, list] = {}
+
+    def update(self, timestamp, component, attribute, value):
+        try:
+            beyond = value < self.threshold if self.below else value > self.threshold
+        except TypeError:
+            beyond = False
+
+        state = self._state.setdefault(component.id, [component, None, False])
+        if not beyond:
+            state[1], state[2] = None, False
+            return None
+        if state[1] is None:
+            state[1] = timestamp
+        return self._check(state, timestamp)
+
+    def tick(self, timestamp):
+        results = (self._check(state, timestamp) for state in self._state.values() if state[1] is not None)
+        return [result for result in results if result is not None]
+
+    def reset(self):
+        self._state.clear()
+
+    def _check(self, state: list, timestamp: float) -> Exception | None:
+        elapsed = timestamp - state[1]
+        if state[2] or elapsed < self.duration:
+            return None
+        state[2] = True
+        return self.alert(state[0], timestamp, threshold=self.threshold, elapsed=elapsed)
+
+
+class WhileUnchanged(WindowDetection):
+    """
+    Fires when the condition attribute passes test for duration seconds while the unchanged attribute stays within tolerance of where it was when the condition became true.  Movement beyond the tolerance restarts the window.
+
+    condition and unchanged are written as COMPONENT.attribute.  test is a value to compare for equality, or a mapping of operators (see OPERATORS).
+    """
+
+    default_message = "{condition} for {elapsed:.0f}s with no change in {unchanged}"
+
+    def __init__(
+        self,
+        id: str,
+        condition: str,
+        unchanged: str,
+        duration: float,
+        test: Any = True,
+        tolerance: float = 0.0,
+        **kwargs
+    ):
+        super().__init__(id, **kwargs)
+        self.condition = _reference(condition)
+        self.unchanged = _reference(unchanged)
+        self.duration = duration
+        self.tests = _tests(test)
+        self.tolerance = tolerance
+        self.inputs = frozenset((self.condition, self.unchanged))
+
+        self._component = None
+        self._since = None
+        self._reference_value = None
+        self._latest = None
+        self._fired = False
+
+    def update(self, timestamp, component, attribute, value):
+        key = (component.id, attribute)
+        if key == self.unchanged:
+            self._latest = value
+            if self._since is not None:
+                if self._reference_value is None:
+                    self._reference_value = value
+                elif _moved(value, self._reference_value, self.tolerance):
+                    self._since, self._reference_value, self._fired = timestamp, value, False
+
+        if key == self.condition:
+            if not _passes(self.tests, value):
+                self._since, self._reference_value, self._fired = None, None, False
+                return None
+            self._component = component
+            if self._since is None:
+                self._since, self._reference_value = timestamp, self._latest
+
+        return self.tick(timestamp)[0] if self._since is not None and self._due(timestamp) else None
+
+    def tick(self, timestamp):
+        if self._since is None or not self._due(timestamp):
+            return []
+        self._fired = True
+        return [self.alert(
+            self._component, timestamp,
+            condition=".".join(self.condition), unchanged=".".join(self.unchanged),
+            elapsed=timestamp - self._since, value=self._latest,
+        )]
+
+    def reset(self):
+        self._component = self._since = self._reference_value = self._latest = None
+        self._fired = False
+
+    def _due(self, timestamp: float) -> bool:
+        return not self._fired and timestamp - self._since >= self.duration
+
+
+class Deviation(WindowDetection):
+    """
+    Fires when two redundant measurements, written as COMPONENT.attribute, differ by more than limit for at least duration seconds.  If relative is True, limit is a fraction of the larger magnitude.
+    """
+
+    default_message = "{a} and {b} deviate by {difference:.3g}, limit {limit}"
+
+    def __init__(self, id: str, a: str, b: str, limit: float, relative: bool = False, duration: float = 0, **kwargs):
+        super().__init__(id, **kwargs)
+        self.a = _reference(a)
+        self.b = _reference(b)
+        self.limit = limit
+        self.relative = relative
+        self.duration = duration
+        self.inputs = frozenset((self.a, self.b))
+
+        self._values = {self.a: None, self.b: None}
+        self._component = None
+        self._since = None
+        self._difference = None
+        self._fired = False
+
+    def update(self, timestamp, component, attribute, value):
+        value = _number(value)
+        if value is None:
+            return None
+
+        self._values[(component.id, attribute)] = value
+        self._component = component
+        a, b = self._values[self.a], self._values[self.b]
+        if a is None or b is None:
+            return None
+
+        difference = abs(a - b)
+        if self.relative:
+            scale = max(abs(a), abs(b))
+            difference = difference / scale if scale else 0.0
+        if difference <= self.limit:
+            self._since, self._fired = None, False
+            return None
+
+        self._difference = difference
+        if self._since is None:
+            self._since = timestamp
+        results = self.tick(timestamp)
+        return results[0] if results else None
+
+    def tick(self, timestamp):
+        if self._since is None or self._fired or timestamp - self._since < self.duration:
+            return []
+        self._fired = True
+        return [self.alert(
+            self._component, timestamp,
+            a=".".join(self.a), b=".".join(self.b), difference=self._difference, limit=self.limit,
+        )]
+
+    def reset(self):
+        self._values = {self.a: None, self.b: None}
+        self._component = self._since = self._difference = None
+        self._fired = False
+
+
+KINDS = {
+    "rate_of_change": RateOfChange,
+    "duration_above": DurationAbove,
+    "while_unchanged": WhileUnchanged,
+    "deviation": Deviation,
+}
+
+
+class WindowEngine:
+    """
+    Routes component updates to the stateful detections that follow them, indexed by (component id, attribute).  Can be used as a detection for CaptureAnalyzer and ReplayEngine.
+    """
+
+    def __init__(self, detections: Iterable[WindowDetection] = ()):
+        self.detections: list[WindowDetection] = []
+        self._index: dict[tuple, list[WindowDetection]] = {}
+        self._watched: dict[int, tuple] = {}
+        for detection in detections:
+            self.add(detection)
+
+    @classmethod
+    def from_yaml(cls, path: str) -> "WindowEngine":
+        return cls(load_windows(path))
+
+    def add(self, detection: WindowDetection) -> None:
+        self.detections.append(detection)
+        for key in detection.inputs:
+            self._index.setdefault(key, []).append(detection)
+
+    def remove(self, detection: WindowDetection | str) -> None:
+        if isinstance(detection, str):
+            detection_id = detection
+            detection = next((d for d in self.detections if d.id == detection_id), None)
+            if detection is None:
+                raise KeyError(detection_id)
+        self.detections.remove(detection)
+        for key in detection.inputs:
+            self._index[key].remove(detection)
+            if not self._index[key]:
+                del self._index[key]
+
+    def update(self, component: Any, attribute: str = "value", value: Any = None, timestamp: float = None) -> list[Exception]:
+        """
+        Passes a component's new attribute value to every detection that follows it.  value defaults to the component's current value of the attribute.
+        """
+
+        detections = self._index.get((component.id, attribute))
+        if not detections:
+            return []
+        if value is None:
+            value = getattr(component, attribute, None)
+        if timestamp is None:
+            timestamp = get_clock().monotonic()
+
+        results = []
+        for detection in detections:
+            result = detection.update(timestamp, component, attribute, value)
+            if result is not None:
+                results.append(result)
+        return results
+
+    def tick(self, timestamp: float = None) -> list[Exception]:
+        """
+        Checks every duration-based detection at timestamp (default: now on the clock).
+        """
+
+        timestamp = get_clock().monotonic() if timestamp is None else timestamp
+        return [result for detection in self.detections for result in detection.tick(timestamp)]
+
+    def reset(self) -> None:
+        for detection in self.detections:
+            detection.reset()
+
+    def watch(self, component: Any, on_result: Callable) -> None:
+        """
+        Updates the detections every time the component's value changes, passing each result to on_result(result).
+
+        Only `value` is published by components, so detections on other attributes, such as B-1.flame, are not driven by a watch.  Feed those with `update()`, or run the engine as a detection of a ModbusDecoder, ReplayEngine or CaptureAnalyzer with the attribute bound there.  Raises TypeError for components that don't publish their value.
+        """
+
+        if not callable(getattr(component, "subscribe", None)):
+            raise TypeError(f"{component} does not publish value changes, feed it with update() instead")
+        self.unwatch(component)
+
+        def changed(component, value):
+            for result in self.update(component, "value", value):
+                on_result(result)
+
+        self._watched[id(component)] = (component, changed)
+        component.subscribe(changed)
+
+    def unwatch(self, component: Any) -> None:
+        watched = self._watched.pop(id(component), None)
+        if watched is not None:
+            component.unsubscribe(watched[1])
+
+    def __call__(self, timestamp: float, component: Any, attribute: str, value: Any) -> str | None:
+        results = self.update(component, attribute, value, timestamp)
+        return "; ".join(result.message for result in results) if results else None
+
+    def __getstate__(self) -> dict:
+        return {"detections": self.detections}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["detections"])
+
+
+def compile_window(source: dict) -> WindowDetection:
+    """
+    Builds a stateful detection from a YAML definition.
+    """
+
+    source = dict(source)
+    rule_id = str(source.pop("id", "")) or None
+    kind = source.pop("kind", None)
+    if rule_id is None or kind not in KINDS:
+        raise ValueError(f"A window needs an id and a kind ({', '.join(KINDS)}): {source!r}")
+
+    result = RESULTS.get(source.pop("result", "unsafe"))
+    if result is None:
+        raise ValueError(f"Window {rule_id}: result must be one of {', '.join(RESULTS)}")
+    source.pop("description", None)
+
+    try:
+        return KINDS[kind](rule_id, result=result, **source)
+    except TypeError as e:
+        raise ValueError(f"Window {rule_id}: {e}")
+
+
+def parse_windows(text: str) -> list[WindowDetection]:
+    """
+    Builds the stateful detections under `windows:` in a YAML document.
+    """
+
+    document = yaml.safe_load(text)
+    if not isinstance(document, dict):
+        return []
+    return [compile_window(source) for source in document.get("windows") or []]
+
+
+def load_windows(path: str) -> list[WindowDetection]:
+    """
+    Loads the stateful detections in a YAML file, or in every .yaml and .yml file of a directory.
+    """
+
+    detections = []
+    for file_path in yaml_files(path):
+        with open(file_path) as window_file:
+            detections += parse_windows(window_file.read())
+    return detections
+
+
+def _number(value: Any) -> float | None:
+    # Returns value as a float, or None if it isn't a number (bools count, like they do in arithmetic)
+    try:
+        return value + 0.0
+    except TypeError:
+        return None
+
+
+def _ids(components: Iterable[str] | str) -> list[str]:
+    return [components] if isinstance(components, str) else list(components)
+
+
+def _reference(reference: str) -> tuple[str, str]:
+    component, _, attribute = str(reference).rpartition(".")
+    if not component or not attribute:
+        raise ValueError(f"Expected COMPONENT.attribute, got {reference!r}")
+    return component, attribute
+
+
+def _tests(test: Any) -> tuple:
+    if not isinstance(test, dict):
+        return ((operator.eq, test),)
+    unknown = set(test) - set(OPERATORS)
+    if unknown:
+        raise ValueError(f"Unknown operators {', '.join(sorted(unknown))}")
+    return tuple((OPERATORS[name], operand) for name, operand in test.items())
+
+
+def _passes(tests: tuple, value: Any) -> bool:
+    try:
+        return all(compare(value, operand) for compare, operand in tests)
+    except TypeError:
+        return False
+
+
+def _moved(value: Any, reference: Any, tolerance: float) -> bool:
+    try:
+        return abs(value - reference) > tolerance
+    except TypeError:
+        return value != reference
@@ -1,3 +0,0 @@
-from db import connect_to_db
-
-connect_to_db()
\ No newline at end of file
@@ -0,0 +1,227 @@
+"""
+Read-through cache for inventory lookups.  Enriching an alert with its owner, business unit, location or status would otherwise cost a database round trip per alert, which adds up fast during an alarm flood.
+
+Entries expire after `INVENTORY_CACHE_TTL` seconds, and the least recently used entries are evicted once the cache holds `INVENTORY_CACHE_SIZE` of them.  Lookups that find nothing (None or an empty result) are cached too, for `INVENTORY_CACHE_NEGATIVE_TTL` seconds, so an unknown tag doesn't hit the database on every alert.  All can be overridden in the .env of the project.
+
+When several threads miss on the same key at once, only one of them runs the lookup and the others wait for its result.
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from dotenv import find_dotenv, load_dotenv
+
+load_dotenv(find_dotenv())
+
+INVENTORY_CACHE_SIZE = int(os.getenv('INVENTORY_CACHE_SIZE', 100_000))
+INVENTORY_CACHE_TTL = float(os.getenv('INVENTORY_CACHE_TTL', 300))
+INVENTORY_CACHE_NEGATIVE_TTL = float(os.getenv('INVENTORY_CACHE_NEGATIVE_TTL', 30))
+
+
+def is_empty(value: Any) -> bool:
+    """
+    True for lookup results that found nothing: None, or an empty list or tuple.
+    """
+
+    return value is None or (isinstance(value, (list, tuple)) and not value)
+
+
+class LookupCache:
+    """
+    A thread-safe TTL and LRU cache.  `get(key, loader)` returns the cached value, or calls loader() and caches what it returns.  Cached values are shared between callers and should be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = INVENTORY_CACHE_SIZE,
+        ttl: float = INVENTORY_CACHE_TTL,
+        negative_ttl: float = INVENTORY_CACHE_NEGATIVE_TTL,
+        negative: Callable[[Any], bool] = is_empty,
+        timer: Callable[[], float] = time.monotonic
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.negative = negative
+        self.timer = timer
+
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+        self._entries: OrderedDict = OrderedDict()
+        self._loading: dict[Hashable, threading.Event] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._lookup(key) is not None
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the value for key, calling loader() to fetch it on a miss.  Exceptions from loader() are not cached.
+        """
+
+        while True:
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    self.hits += 1
+                    if entry[2]:
+                        self.negative_hits += 1
+                    return entry[0]
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = threading.Event()
+                    generation = self._generation
+                    self.misses += 1
+                    break
+            # Another thread is already fetching this key
+            loading.wait()
+
+        try:
+            value = loader()
+        except BaseException:
+            with self._lock:
+                del self._loading[key]
+            loading.set()
+            raise
+
+        with self._lock:
+            del self._loading[key]
+            # Don't store a value that was invalidated while it was being fetched
+            if generation == self._generation:
+                self._store(key, value)
+        loading.set()
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Caches value for key, replacing any existing entry.
+        """
+
+        with self._lock:
+            self._store(key, value)
+
+    def invalidate(self, key: Hashable) -> bool:
+        """
+        Drops the entry for key.  Returns True if there was one.
+        """
+
+        with self._lock:
+            self._generation += 1
+            if self._entries.pop(key, None) is None:
+                return False
+            self.invalidations += 1
+            return True
+
+    def invalidate_matching(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Drops every entry whose key satisfies predicate(key).  Returns the number of entries dropped.
+        """
+
+        with self._lock:
+            self._generation += 1
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        """
+        Drops every entry.
+        """
+
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the hit and miss counts, the hit rate and the number of cached entries.
+        """
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "negative_hits": self.negative_hits,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _lookup(self, key: Hashable) -> tuple | None:
+        # Caller must hold the lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= self.timer():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        # Caller must hold the lock
+        negative = self.negative(value)
+        expires = self.timer() + (self.negative_ttl if negative else self.ttl)
+        self._entries[key] = (value, expires, negative)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_inventory_cache() -> LookupCache:
+    """
+    Returns the process-wide inventory lookup cache.
+    """
+
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LookupCache()
+        return _cache
+
+
+def cached(field: str = None, cache: LookupCache = None) -> Callable:
+    """
+    Decorator that puts a lookup function behind the inventory cache, keyed by (field, *args).  field defaults to the function name.  The wrapped function gains an `invalidate(*args)` method.
+    """
+
+    def decorator(function: Callable) -> Callable:
+        name = field or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args):
+            return (cache or get_inventory_cache()).get((name, *args), lambda: function(*args))
+
+        wrapper.invalidate = lambda *args: (cache or get_inventory_cache()).invalidate((name, *args))
+        return wrapper
+
+    return decorator
@@ -0,0 +1,150 @@
+"""
+Builds Components from inventory rows, and rows from Components.  A row's `type` column names the class (Sensor, Valve, Server, ...), its `id` becomes the component id and every other non-null column is passed to the class as a keyword argument, so columns such as `ip`, `unit` or `register` land on the component as attributes.
+
+The `components` table (see docker/postgres/init.sql) has columns for the fields every component shares and keeps everything else in a jsonb `attributes` column, which is unpacked into keyword arguments the same way.  Private attributes (other than those behind a property) and values that can't be stored as JSON are not saved.  References to other components are saved as their id, and datetimes as ISO 8601 strings.
+"""
+
+import json
+import math
+from datetime import datetime
+from typing import Any
+
+from otsafe.components.actuators import Actuator
+from otsafe.components.alarms import Alarm
+from otsafe.components.burners import Burner
+from otsafe.components.compact import CompactComponent
+from otsafe.components.controllers import Controller
+from otsafe.components.domain_controllers import DomainController
+from otsafe.components.generic import Component
+from otsafe.components.historians import Historian
+from otsafe.components.hmis import HMI
+from otsafe.components.opc_servers import OPCServer
+from otsafe.components.pumps import Pump
+from otsafe.components.sensors import Sensor
+from otsafe.components.servers import Server
+from otsafe.components.sis import SIS
+from otsafe.components.valves import Valve
+from otsafe.components.vessels import Vessel
+from otsafe.components.workstations import Workstation
+
+# The type names stored in the `type` column.  Only these classes can be saved, since each name must load back as
+# the same class.  otsafe.components.safety_systems.SIS is left out: it is built from Sensor and Actuator objects,
+# which a row can't hold.
+COMPONENT_TYPES: dict[str, type] = {
+    cls.__name__: cls
+    for cls in (
+        Component, Actuator, Alarm, Burner, Controller, DomainController, Historian, HMI,
+        OPCServer, Pump, Sensor, Server, SIS, Valve, Vessel, Workstation,
+    )
+}
+
+_TYPE_NAMES: dict[type, str] = {cls: name for name, cls in COMPONENT_TYPES.items()}
+
+
+COMPONENT_COLUMNS = ("id", "type", "ip", "port", "description", "created_at", "attributes")
+
+# Attributes saved as ISO 8601 strings that are turned back into datetimes on load
+TIMESTAMP_ATTRIBUTES = ("last_updated", "last_modified")
+
+_JSON_TYPES = (str, int, float, bool, type(None))
+
+
+def component_attributes(component: Any) -> dict:
+    """
+    Returns the attributes of a component that go in the `attributes` column: everything public, and private attributes behind a property, except the common columns.
+    """
+
+    attributes = {}
+    fields = component.fields() if isinstance(component, CompactComponent) else vars(component)
+    for name, value in fields.items():
+        if name.startswith("_"):
+            # Saved under the public name if it backs a property, such as Sensor.value
+            name = name[1:]
+            if not isinstance(getattr(type(component), name, None), property):
+                continue
+            value = getattr(component, name)
+        if name in COMPONENT_COLUMNS:
+            continue
+        if name == "name" and value == component.id:
+            # Subclasses that keep a name set it from the id they are built with
+            continue
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, Component):
+            value = value.id
+        elif isinstance(value, float) and not math.isfinite(value):
+            # jsonb has no NaN or infinity
+            continue
+        elif not isinstance(value, _JSON_TYPES) and not _is_json(value):
+            continue
+        attributes[name] = value
+    return attributes
+
+
+def component_row(component: Any) -> tuple:
+    """
+    Returns the row for a component, in COMPONENT_COLUMNS order, with the attributes encoded as JSON.  Compact components are saved as the regular class they subclass.  Raises ValueError for other classes that aren't in COMPONENT_TYPES, since they couldn't be loaded back.
+    """
+
+    type_name = _type_name(type(component))
+    if type_name is None:
+        cls = type(component)
+        raise ValueError(f"Can't save {cls.__module__}.{cls.__qualname__} {component.id!r}: not a COMPONENT_TYPES class")
+
+    return (
+        component.id,
+        type_name,
+        component.ip,
+        component.port,
+        component.description,
+        component.created_at,
+        json.dumps(component_attributes(component), separators=(",", ":")),
+    )
+
+
+def build_component(row: dict, types: dict[str, type] = COMPONENT_TYPES, type_column: str = "type") -> Any:
+    """
+    Builds a Component subclass from a row given as a dict of column names to values.  Rows without a type become plain Components.  Raises ValueError for unknown types or rows without an id.
+    """
+
+    fields = {column: value for column, value in row.items() if value is not None}
+    attributes = fields.pop("attributes", None)
+    if attributes:
+        if isinstance(attributes, str):
+            attributes = json.loads(attributes)
+        for name in TIMESTAMP_ATTRIBUTES:
+            if isinstance(attributes.get(name), str):
+                attributes[name] = datetime.fromisoformat(attributes[name])
+        # The columns win over a stale copy in attributes
+        fields = {**attributes, **fields}
+
+    type_name = fields.pop(type_column, "Component")
+    cls = types.get(type_name)
+    if cls is None:
+        raise ValueError(f"Unknown component type {type_name!r}")
+    if "id" not in fields:
+        raise ValueError(f"{type_name} row has no id")
+
+    # The constructors take the id as their first argument, which most subclasses call name
+    name = fields.pop("name", None)
+    component = cls(fields.pop("id"), **fields)
+    if name is not None:
+        component.name = name
+    return component
+
+
+def _is_json(value: Any) -> bool:
+    if not isinstance(value, (list, tuple, dict)):
+        return False
+    try:
+        json.dumps(value, allow_nan=False)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _type_name(cls: type) -> str | None:
+    # Compact classes are saved as the class they stand in for, and load back as it
+    if cls not in _TYPE_NAMES and issubclass(cls, CompactComponent):
+        _TYPE_NAMES[cls] = next((_TYPE_NAMES[base] for base in cls.__mro__ if base in _TYPE_NAMES), None)
+    return _TYPE_NAMES.get(cls)
@@ -1,15 +1,38 @@
 """
 Functions for connecting to any given databases detected in .env file.  Can be multiple databases, but only one is currently supported.  Will eventually support multiple databases.  For now, it just connects to the first database in the list.  Uses psycopg2 for a local or remote Postgres container.  Will eventually support other databases types.
+
+Connections are shared through a DatabasePool, so detection workers borrow an open connection instead of paying for a new one (and a Postgres backend slot) on every query.  The pool keeps at least `DB_POOL_MIN` and at most `DB_POOL_MAX` connections, waits up to `DB_POOL_TIMEOUT` seconds for one to be returned, closes connections beyond the minimum after `DB_POOL_IDLE_TIMEOUT` idle seconds, and checks with a `SELECT 1` any connection that has been idle longer than `DB_POOL_CHECK_INTERVAL` seconds before handing it out.  All can be overridden in the .env of the project.
+
+The `get_db_data*` helpers run on a pooled connection when they are given cur=None.  Owner, business unit, location and status lookups made that way go through the inventory cache (see otsafe.inventory.cache), since alert enrichment repeats them constantly.  Call `invalidate_db_lookups()` after changing those fields.
+
+The `get_db_data*` helpers load the whole result into memory.  For large results, such as the full asset inventory, `iter_db_data()` and `iter_components()` stream rows from a named server-side cursor `DB_FETCH_SIZE` rows at a time, so memory stays flat however many rows there are.
 """
 
 import os
-from typing import Any
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+from uuid import uuid4
 
 import psycopg2
 from dotenv import load_dotenv
 
+from otsafe.inventory.cache import get_inventory_cache
+from otsafe.inventory.components import COMPONENT_TYPES, build_component
+from otsafe.utils.stream import StageStats
+
 load_dotenv()
 
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', 1))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+DB_POOL_IDLE_TIMEOUT = float(os.getenv('DB_POOL_IDLE_TIMEOUT', 300))
+DB_POOL_CHECK_INTERVAL = float(os.getenv('DB_POOL_CHECK_INTERVAL', 30))
+DB_FETCH_SIZE = int(os.getenv('DB_FETCH_SIZE', 2000))
+
+CACHED_FIELDS = ("owner", "bu", "location", "status")
+
 def connect_to_db() -> Any:
     """
     Creates the initial connection to the database.  Returns a psycopg2 connection object.
@@ -57,75 +80,350 @@ def close_db_connection(conn: Any) -> None:
     
     conn.close()
 
+
+class DatabasePool:
+    """
+    A thread-safe pool of psycopg2 connections.
+
+    Connections are checked out with `acquire()` (or the `connection()` and `cursor()` context managers) and handed back with `release()`, which rolls back anything left uncommitted.  If every connection is busy, callers wait up to `acquire_timeout` seconds for one to be returned.  The time spent waiting is recorded in `wait`.
+    """
+
+    def __init__(
+        self,
+        minconn: int = DB_POOL_MIN,
+        maxconn: int = DB_POOL_MAX,
+        acquire_timeout: float = DB_POOL_TIMEOUT,
+        idle_timeout: float = DB_POOL_IDLE_TIMEOUT,
+        check_interval: float = DB_POOL_CHECK_INTERVAL,
+        connect: Callable = connect_to_db
+    ):
+        if not 0 <= minconn <= maxconn or maxconn < 1:
+            raise ValueError("expected 0 <= minconn <= maxconn and maxconn >= 1")
+
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.acquire_timeout = acquire_timeout
+        self.idle_timeout = idle_timeout
+        self.check_interval = check_interval
+        self.connect = connect
+
+        self.wait = StageStats()
+        self.created = 0
+        self.discarded = 0
+        self.failed_checks = 0
+        self.timeouts = 0
+
+        self._lock = threading.Lock()
+        self._returned = threading.Condition(self._lock)
+        self._idle: list[tuple] = []
+        self._open = 0
+        self._waiting = 0
+        self._closed = False
+
+        for _ in range(minconn):
+            self._idle.append((self._new_connection(), time.monotonic()))
+            self._open += 1
+
+    def acquire(self) -> Any:
+        """
+        Checks out a connection.  Returns a psycopg2 connection object.
+        """
+
+        began = time.perf_counter()
+        deadline = time.monotonic() + self.acquire_timeout
+        conn = returned_at = None
+
+        with self._returned:
+            while True:
+                if self._closed:
+                    raise ConnectionError("The database pool is closed")
+                self._close_expired()
+                if self._idle:
+                    # Most recently returned first, so surplus connections age out
+                    conn, returned_at = self._idle.pop()
+                    break
+                if self._open < self.maxconn:
+                    # Reserve the slot now, connect outside the lock
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise ConnectionError(f"No free database connection after {self.acquire_timeout}s")
+                self._waiting += 1
+                try:
+                    self._returned.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        try:
+            if conn is not None and not self._healthy(conn, returned_at):
+                self._close(conn)
+                with self._lock:
+                    self.failed_checks += 1
+                    self.discarded += 1
+                conn = None
+            if conn is None:
+                conn = self._new_connection()
+        except Exception:
+            with self._returned:
+                self._open -= 1
+                self._returned.notify()
+            raise
+
+        self.wait.record(time.perf_counter() - began)
+        return conn
+
+    def release(self, conn: Any, discard: bool = False) -> None:
+        """
+        Returns a connection to the pool, rolling back any open transaction.  If discard is True, the connection is broken or the pool has been closed, it is closed instead.
+        """
+
+        if not discard and not conn.closed and not self._closed:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._returned:
+            if not (discard or conn.closed or self._closed):
+                self._idle.append((conn, time.monotonic()))
+                self._returned.notify()
+                return
+            self._open -= 1
+            self.discarded += 1
+            self._returned.notify()
+        self._close(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager that checks out a connection, commits on a clean exit and returns it to the pool.
+        """
+
+        conn = self.acquire()
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def cursor(self, **kwargs):
+        """
+        Context manager that yields a cursor on a pooled connection.  kwargs are passed to `connection.cursor()`.
+        """
+
+        with self.connection() as conn:
+            with conn.cursor(**kwargs) as cur:
+                yield cur
+
+    def close_idle(self) -> None:
+        """
+        Closes every idle connection beyond the minimum that has outlived the idle timeout.
+        """
+
+        with self._returned:
+            self._close_expired()
+
+    def close_all(self) -> None:
+        """
+        Closes the pool: every idle connection now, and connections that are checked out when they are released.  Acquiring from a closed pool raises ConnectionError, and `get_db_pool()` replaces it with a new one.
+        """
+
+        with self._returned:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._close(conn)
+            self._open -= len(self._idle)
+            self.discarded += len(self._idle)
+            self._idle.clear()
+            self._returned.notify_all()
+
+    def stats(self) -> dict:
+        """
+        Returns the connection counts and how long callers have waited to check one out.
+        """
+
+        with self._lock:
+            return {
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "waiting": self._waiting,
+                "created": self.created,
+                "discarded": self.discarded,
+                "failed_checks": self.failed_checks,
+                "timeouts": self.timeouts,
+                "wait": self.wait,
+            }
+
+    def _new_connection(self) -> Any:
+        conn = self.connect()
+        with self._lock:
+            self.created += 1
+        return conn
+
+    def _healthy(self, conn: Any, returned_at: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - returned_at < self.check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+        except Exception:
+            return False
+        return True
+
+    def _close(self, conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _close_expired(self) -> None:
+        # Caller must hold the lock
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._idle and self._open > self.minconn and self._idle[0][1] < cutoff:
+            conn, _ = self._idle.pop(0)
+            self._close(conn)
+            self._open -= 1
+            self.discarded += 1
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_db_pool() -> DatabasePool:
+    """
+    Returns the process-wide database pool, creating it on first use.
+    """
+
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._closed:
+            _pool = DatabasePool()
+        return _pool
+
+def _fetch(cur: Any, query: str, params: tuple = None) -> Any:
+    if cur is None:
+        with get_db_pool().cursor() as cur:
+            cur.execute(query, params)
+            return cur.fetchall()
+    cur.execute(query, params)
+    return cur.fetchall()
+
+def _cached_fetch(field: str, cur: Any, query: str, value: Any) -> Any:
+    # Queries on a caller's own cursor may be part of a transaction, so only pooled ones are cached
+    if cur is not None:
+        return _fetch(cur, query, (value,))
+    return get_inventory_cache().get((field, query, value), lambda: _fetch(None, query, (value,)))
+
+def iter_db_data(query: str, params: tuple | dict = None, fetch_size: int = DB_FETCH_SIZE) -> Iterator[tuple]:
+    """
+    Executes a query on a named server-side cursor and yields the rows one at a time, fetching fetch_size rows per round trip.  The pooled connection is held until the generator is exhausted or closed.
+    """
+
+    with get_db_pool().cursor(name=f"otsafe_{uuid4().hex}") as cur:
+        cur.itersize = fetch_size
+        cur.execute(query, params)
+        yield from cur
+
+def iter_components(
+    query: str,
+    params: tuple | dict = None,
+    fetch_size: int = DB_FETCH_SIZE,
+    types: dict[str, type] = COMPONENT_TYPES
+) -> Iterator[Any]:
+    """
+    Like iter_db_data(), but builds each row into a Component subclass chosen by its `type` column.  See otsafe.inventory.components.build_component().
+    """
+
+    with get_db_pool().cursor(name=f"otsafe_{uuid4().hex}") as cur:
+        cur.itersize = fetch_size
+        cur.execute(query, params)
+        columns = None
+        for row in cur:
+            if columns is None:
+                # A named cursor only has a description once the first batch is fetched
+                columns = [column[0] for column in cur.description]
+            yield build_component(dict(zip(columns, row)), types)
+
+def invalidate_db_lookups(field: str = None, value: Any = None) -> int:
+    """
+    Drops cached owner, bu, location and status lookups, optionally only for one field, or one value of it.  Returns the number of entries dropped.
+    """
+
+    fields = CACHED_FIELDS if field is None else (field,)
+    # Keys are (field, query, value) for the queries here and (field, *args) for @cached lookups such as
+    # tasks.get_owner, so the value is the last element.  Lookups without arguments can't tell, and are dropped.
+    return get_inventory_cache().invalidate_matching(
+        lambda key: key[0] in fields and (value is None or len(key) < 2 or key[-1] == value)
+    )
+
 def get_db_data(cur: Any, query: str) -> Any:
     """
-    Executes a query on a psycopg2 cursor object.  Returns the results of the query.
+    Executes a query on a psycopg2 cursor object, or on a pooled connection if cur is None.  Returns the results of the query.
     """
     
-    cur.execute(query)
-    return cur.fetchall()
+    return _fetch(cur, query)
 
 def get_db_data_by_id(cur: Any, query: str, id: str) -> Any:
     """
-    Executes a query on a psycopg2 cursor object.  Returns the results of the query.
+    Executes a query on a psycopg2 cursor object, or on a pooled connection if cur is None.  Returns the results of the query.
     """
     
-    cur.execute(query, (id,))
-    return cur.fetchall()
+    return _fetch(cur, query, (id,))
 
 def get_db_data_by_name(cur: Any, query: str, name: str) -> Any:
     """
-    Executes a query on a psycopg2 cursor object.  Returns the results of the query.
+    Executes a query on a psycopg2 cursor object, or on a pooled connection if cur is None.  Returns the results of the query.
     """
     
-    cur.execute(query, (name,))
-    return cur.fetchall()
+    return _fetch(cur, query, (name,))
 
 def get_db_data_by_description(cur: Any, query: str, description: str) -> Any:
     """
-    Executes a query on a psycopg2 cursor object.  Returns the results of the query.
+    Executes a query on a psycopg2 cursor object, or on a pooled connection if cur is None.  Returns the results of the query.
     """
     
-    cur.execute(query, (description,))
-    return cur.fetchall()
+    return _fetch(cur, query, (description,))
 
 def get_db_data_by_owner(cur: Any, query: str, owner: str) -> Any:
     """
-    Executes a query on a psycopg2 cursor object.  Returns the results of the query.
+    Executes a query on a psycopg2 cursor object, or on a pooled connection if cur is None, in which case the result is cached.  Returns the results of the query.
     """
     
-    cur.execute(query, (owner,))
-    return cur.fetchall()
+    return _cached_fetch("owner", cur, query, owner)
 
 def get_db_data_by_bu(cur: Any, query: str, bu: str) -> Any:
     """
-    Executes a query on a psycopg2 cursor object.  Returns the results of the query.
+    Executes a query on a psycopg2 cursor object, or on a pooled connection if cur is None, in which case the result is cached.  Returns the results of the query.
     """
     
-    cur.execute(query, (bu,))
-    return cur.fetchall()
+    return _cached_fetch("bu", cur, query, bu)
 
 def get_db_data_by_type(cur: Any, query: str, type: str) -> Any:
     """
-    Executes a query on a psycopg2 cursor object.  Returns the results of the query.
+    Executes a query on a psycopg2 cursor object, or on a pooled connection if cur is None.  Returns the results of the query.
     """
     
-    cur.execute(query, (type,))
-    return cur.fetchall()   
+    return _fetch(cur, query, (type,))
 
 def get_db_data_by_status(cur: Any, query: str, status: str) -> Any:
     """
-    Executes a query on a psycopg2 cursor object.  Returns the results of the query.
+    Executes a query on a psycopg2 cursor object, or on a pooled connection if cur is None, in which case the result is cached.  Returns the results of the query.
     """
     
-    cur.execute(query, (status,))
-    return cur.fetchall()
+    return _cached_fetch("status", cur, query, status)
 
 def get_db_data_by_location(cur: Any, query: str, location: str) -> Any:
     """
-    Executes a query on a psycopg2 cursor object.  Returns the results of the query.
+    Executes a query on a psycopg2 cursor object, or on a pooled connection if cur is None, in which case the result is cached.  Returns the results of the query.
     """
     
-    cur.execute(query, (location,))
-    return cur.fetchall()
+    return _cached_fetch("location", cur, query, location)
 
@@ -0,0 +1,163 @@
+"""
+Bulk save and load of the component model to and from Postgres.
+
+`save_components()` streams the components with COPY into a temporary staging table and upserts them into `components` (see docker/postgres/init.sql) in one set-based statement, so a 250k tag model is written in a few round trips instead of one per row.  Rows whose columns and attributes haven't changed are left alone, which makes an incremental sync of a model that mostly hasn't moved cheap.  With full=True, rows for components that are no longer in the model are deleted as well.
+
+`load_components()` streams the table back, building each row into its Component subclass.  Both report rows per second in a SyncReport.
+"""
+
+import time
+from typing import Any, Iterable, Iterator
+
+from otsafe.inventory.components import COMPONENT_COLUMNS, COMPONENT_TYPES, component_row
+from otsafe.inventory.db import DB_FETCH_SIZE, get_db_pool, iter_components
+
+COMPONENT_TABLE = "components"
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+class SyncReport:
+    """
+    The outcome of a save or load.  `rows` is the number of rows sent or read.  For a save, `inserted` and `updated` count the rows that were written, `unchanged` those that already matched, and `deleted` the rows removed by a full sync.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.deleted = 0
+        self.seconds = 0.0
+
+    @property
+    def unchanged(self) -> int:
+        return self.rows - self.inserted - self.updated
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (
+            f"SyncReport(rows={self.rows}, inserted={self.inserted}, updated={self.updated}, "
+            f"deleted={self.deleted}, rows_per_second={self.rows_per_second:.0f})"
+        )
+
+
+class CopySource:
+    """
+    A file-like object that feeds COPY FROM STDIN from an iterable of rows, encoding them as they are read instead of building the whole payload up front.
+    """
+
+    def __init__(self, rows: Iterable[tuple]):
+        self._rows = iter(rows)
+        self._pending = ""
+        self.rows = 0
+
+    def read(self, size: int = -1) -> str:
+        chunks, length = [self._pending], len(self._pending)
+        while size < 0 or length < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = copy_line(row)
+            chunks.append(line)
+            length += len(line)
+            self.rows += 1
+
+        data = "".join(chunks)
+        if size < 0:
+            self._pending = ""
+            return data
+        self._pending = data[size:]
+        return data[:size]
+
+
+def copy_line(row: tuple) -> str:
+    """
+    Encodes a row as a line of COPY text format.
+    """
+
+    return "\t".join(
+        "\\N" if value is None
+        else value.isoformat() if hasattr(value, "isoformat")
+        else str(value).translate(_COPY_ESCAPES)
+        for value in row
+    ) + "\n"
+
+
+def save_components(components: Iterable[Any], full: bool = False, table: str = COMPONENT_TABLE) -> SyncReport:
+    """
+    Upserts components into the table.  With full=True, also deletes the rows of components that aren't in components.  Raises ValueError if two components share an id.
+    """
+
+    _check_table(table)
+    report = SyncReport()
+    columns = ", ".join(COMPONENT_COLUMNS)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in COMPONENT_COLUMNS[1:] if column != "created_at")
+    changed = ", ".join(f"t.{column}" for column in COMPONENT_COLUMNS[1:] if column != "created_at")
+    incoming = ", ".join(f"EXCLUDED.{column}" for column in COMPONENT_COLUMNS[1:] if column != "created_at")
+
+    began = time.perf_counter()
+    source = CopySource(_unique_rows(components))
+    with get_db_pool().cursor() as cur:
+        cur.execute(f"CREATE TEMP TABLE {table}_staging (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+        cur.copy_expert(f"COPY {table}_staging ({columns}) FROM STDIN", source)
+        cur.execute(
+            f"WITH upserted AS ("
+            f"INSERT INTO {table} AS t ({columns}) SELECT {columns} FROM {table}_staging "
+            f"ON CONFLICT (id) DO UPDATE SET {updates}, updated_at = now() "
+            f"WHERE ({changed}) IS DISTINCT FROM ({incoming}) "
+            f"RETURNING (xmax = 0) AS inserted) "
+            f"SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM upserted"
+        )
+        report.inserted, report.updated = cur.fetchone()
+        if full:
+            cur.execute(f"DELETE FROM {table} t WHERE NOT EXISTS (SELECT 1 FROM {table}_staging s WHERE s.id = t.id)")
+            report.deleted = cur.rowcount
+
+    report.rows = source.rows
+    report.seconds = time.perf_counter() - began
+    return report
+
+
+def load_components(
+    where: str = None,
+    params: tuple | dict = None,
+    fetch_size: int = DB_FETCH_SIZE,
+    types: dict[str, type] = COMPONENT_TYPES,
+    table: str = COMPONENT_TABLE,
+    report: SyncReport = None
+) -> Iterator[Any]:
+    """
+    Yields the components in the table, optionally filtered by a WHERE clause with params, from a server-side cursor.  If a report is given, it is filled in as rows are read.
+    """
+
+    _check_table(table)
+    query = f"SELECT {', '.join(COMPONENT_COLUMNS)} FROM {table}"
+    if where:
+        query += f" WHERE {where}"
+
+    report = report if report is not None else SyncReport()
+    began = time.perf_counter()
+    try:
+        for component in iter_components(query, params, fetch_size, types):
+            report.rows += 1
+            yield component
+    finally:
+        report.seconds = time.perf_counter() - began
+
+
+def _unique_rows(components: Iterable[Any]) -> Iterator[tuple]:
+    # ON CONFLICT can't update the same row twice in one statement
+    seen = set()
+    for component in components:
+        if component.id in seen:
+            raise ValueError(f"Duplicate component id {component.id!r}")
+        seen.add(component.id)
+        yield component_row(component)
+
+
+def _check_table(table: str) -> None:
+    if not table.isidentifier():
+        raise ValueError(f"Invalid table name {table!r}")
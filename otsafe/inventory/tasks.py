@@ -7,15 +7,21 @@ These functions can also build a local database from the REST API, and can updat
 
  It is the only file that should be allowed to access the database directly.  All other files should access the database via this file.
 
+Lookups are cached (see otsafe.inventory.cache), so enriching a flood of alerts doesn't make a round trip per alert.
+
 """
 
+from otsafe.inventory.cache import cached
+
 
+@cached("owner")
 def get_owner() -> str:
     """
     Returns the owner of a component from the database.  Currently just returns a string, but will eventually return a business entity object. 
     """
     return "Owner's Name Here"
 
+@cached("bu")
 def get_bu() -> str:
     """
     Returns the BU of a component from the database.  Currently just returns a string, but will eventually return a business entity object. 
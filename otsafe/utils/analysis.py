@@ -0,0 +1,195 @@
+"""
+Parallel analysis of Modbus/TCP captures.  A pyshark capture, or a single PcapReader, keeps one core busy; an investigation over dozens of rotating captures should use all of them.
+
+The CaptureAnalyzer splits the work into (file, flow shard) tasks and runs them on a process pool.  Both directions of a TCP connection hash to the same shard, so each worker sees every request and response of its connections in capture order and can pair them.  Every worker decodes its share with a ModbusDecoder bound to its own copy of the Components, and runs the same detections on every update.
+
+Updates and alerts from all tasks are merged into one timeline ordered by (timestamp, file, position in the file), which does not depend on the number of workers or shards.  Because each worker only sees its own connections, detections should judge a single update (for example an out-of-range value), not state accumulated across connections.  A transaction whose request and response straddle two rotated files is not paired.
+
+The number of workers defaults to the CPU count, and can be overridden by setting `CAPTURE_WORKERS` in the .env of the project.
+"""
+
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable
+
+from dotenv import find_dotenv, load_dotenv
+
+from otsafe.utils.decoder import ModbusDecoder
+from otsafe.utils.pcap import MODBUS_PORT, PcapReader
+
+load_dotenv(find_dotenv())
+
+CAPTURE_WORKERS = int(os.getenv('CAPTURE_WORKERS', os.cpu_count() or 1))
+
+
+def flow_shard(packet: Any, shards: int) -> int:
+    """
+    Returns the shard of a packet's TCP connection.  Both directions of a connection hash to the same shard, and the hash is stable across processes.
+    """
+
+    if shards == 1:
+        return 0
+    a, b = f"{packet.src}:{packet.sport}", f"{packet.dst}:{packet.dport}"
+    return zlib.crc32(f"{a}-{b}".encode() if a < b else f"{b}-{a}".encode()) % shards
+
+
+class AnalysisResult:
+    """
+    The merged output of an analysis.  `timeline` holds (timestamp, component id, attribute, value) updates, and `alerts` holds (timestamp, component id, message), both in timestamp order.
+    """
+
+    def __init__(self, timeline: list, alerts: list, packets: int, seconds: float, workers: int, stats: dict):
+        self.timeline = timeline
+        self.alerts = alerts
+        self.packets = packets
+        self.seconds = seconds
+        self.workers = workers
+        self.stats = stats
+
+    @property
+    def packets_per_second(self) -> float:
+        return self.packets / self.seconds if self.seconds else 0.0
+
+    def apply(self, components: Iterable) -> None:
+        """
+        Sets each Component's attributes to their last value in the timeline.
+        """
+
+        by_id = {component.id: component for component in components}
+        for _, component_id, attribute, value in self.timeline:
+            component = by_id.get(component_id)
+            if component is not None:
+                setattr(component, attribute, value)
+
+    def __repr__(self):
+        return f"AnalysisResult(packets={self.packets}, updates={len(self.timeline)}, alerts={len(self.alerts)}, workers={self.workers})"
+
+
+class CaptureAnalyzer:
+    """
+    Decodes captures on a process pool and runs detections on every Component update.
+
+    components are bound to each worker's ModbusDecoder with their default register or coil, or given as (component, bind kwargs) pairs.  A detection is a picklable callable detection(timestamp, component, attribute, value) that returns an alert message or None.
+    """
+
+    def __init__(
+        self,
+        components: Iterable,
+        detections: Iterable[Callable] = (),
+        port: int = MODBUS_PORT,
+        workers: int = CAPTURE_WORKERS,
+        flow_shards: int = None
+    ):
+        self.components = list(components)
+        self.detections = list(detections)
+        self.port = port
+        self.workers = max(1, workers)
+        self.flow_shards = flow_shards
+
+    def tasks(self, files: list, workers: int = None) -> list[tuple]:
+        """
+        Returns one task per (file, flow shard).  Unless flow_shards was given, each file is split into enough shards to keep every worker busy.
+        """
+
+        workers = workers or self.workers
+        shards = self.flow_shards or max(1, -(-workers // len(files)))
+        return [
+            (index, file_path, shard, shards, self.port, self.components, self.detections)
+            for index, file_path in enumerate(files)
+            for shard in range(shards)
+        ]
+
+    def run(self, files: list, workers: int = None) -> AnalysisResult:
+        """
+        Analyses every file and merges the results.  With a single worker the tasks run in this process.
+        """
+
+        workers = workers or self.workers
+        tasks = self.tasks(files, workers)
+
+        began = time.perf_counter()
+        if workers == 1:
+            results = list(map(_analyse, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_analyse, tasks))
+
+        timeline = sorted((entry for result in results for entry in result[0]), key=_order)
+        alerts = sorted((alert for result in results for alert in result[1]), key=_order)
+        seconds = time.perf_counter() - began
+
+        stats = {}
+        for result in results:
+            for name, count in result[3].items():
+                stats[name] = stats.get(name, 0) + count
+
+        return AnalysisResult(
+            [entry[3:] for entry in timeline],
+            [alert[3:] for alert in alerts],
+            sum(result[2] for result in results),
+            seconds,
+            workers,
+            stats,
+        )
+
+    def scaling(self, files: list, max_workers: int = None) -> list[dict]:
+        """
+        Runs the analysis with 1 to max_workers workers, and returns the throughput, speedup and parallel efficiency of each.
+        """
+
+        report = []
+        for workers in range(1, (max_workers or self.workers) + 1):
+            result = self.run(files, workers)
+            baseline = report[0]["seconds"] if report else result.seconds
+            speedup = baseline / result.seconds if result.seconds else 0.0
+            report.append({
+                "workers": workers,
+                "seconds": result.seconds,
+                "packets_per_second": result.packets_per_second,
+                "speedup": speedup,
+                "efficiency": speedup / workers,
+            })
+        return report
+
+
+def _order(entry: tuple) -> tuple:
+    # (timestamp, file, record offset, sequence within the record)
+    return entry[3], entry[0], entry[1], entry[2]
+
+
+def _analyse(task: tuple) -> tuple[list, list, int, dict]:
+    # Runs in a worker: decodes one flow shard of one file
+    file_index, file_path, shard, shards, port, components, detections = task
+    timeline, alerts = [], []
+    position = [0, 0]
+
+    def on_update(timestamp, component, attribute, value):
+        position[1] += 1
+        timeline.append((file_index, position[0], position[1], timestamp, component.id, attribute, value))
+        for detection in detections:
+            message = detection(timestamp, component, attribute, value)
+            if message is not None:
+                position[1] += 1
+                alerts.append((file_index, position[0], position[1], timestamp, component.id, message))
+
+    decoder = ModbusDecoder(port, on_update=on_update)
+    for component in components:
+        if isinstance(component, tuple):
+            decoder.bind(component[0], **component[1])
+        else:
+            decoder.bind(component)
+
+    packets = 0
+    with PcapReader(file_path, port) as reader:
+        for packet in reader:
+            if flow_shard(packet, shards) != shard:
+                continue
+            position[0], position[1] = packet.offset, 0
+            decoder.feed(packet)
+            packets += 1
+
+    stats = decoder.stats()
+    del stats["pending"]
+    return timeline, alerts, packets, stats
@@ -0,0 +1,264 @@
+"""
+Pluggable clocks and a discrete-event scheduler.  Every time-based behaviour in the components (SIS scan loops, value ramps, change_value_over_time and timestamps) asks `get_clock()` for the time and for sleeping (`sleep()`, or `sleep_async()` in coroutines), instead of calling `time` and `datetime` directly.
+
+By default that is the WallClock, which is just the system clock.  Installing a Simulation (`with Simulation() as sim:`) swaps in a virtual clock with an event queue.  Sleeping on a simulation jumps straight to the next event instead of waiting, so a simulated day of scans, ramps and trips finishes in seconds.
+
+Coroutines sleeping with `sleep_async()` are woken by an event of their own, in timestamp order with every other event, so concurrent sleeps overlap just as they do on the wall clock.  While any are asleep, a driver task on their event loop runs the next event each time every other task is waiting, so `asyncio.run()` of a coroutine that awaits ramps needs nothing else to move simulated time along.
+
+A Simulation with `realtime=True` runs the same events, in the same order and at the same simulated times, but paces them against the wall clock.  Because components only ever see simulated time, the results of both modes are identical.
+"""
+
+import asyncio
+import heapq
+import time
+from datetime import datetime
+from itertools import count
+from typing import Any, Callable
+
+
+class WallClock:
+    """
+    The system clock.
+    """
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        return time.time()
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    async def sleep_async(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class Event:
+    """
+    A callback scheduled on a Simulation.  Call `cancel()` to stop it from running.
+    """
+
+    __slots__ = ("when", "callback", "args", "kwargs", "interval", "cancelled")
+
+    def __init__(self, when: float, callback: Callable, args: tuple, kwargs: dict, interval: float = None):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs
+        self.interval = interval
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def __repr__(self):
+        return f"Event(when={self.when}, callback={getattr(self.callback, '__name__', self.callback)})"
+
+
+class Simulation:
+    """
+    A virtual clock with a discrete-event scheduler.
+
+    Simulated time starts at 0 on the monotonic clock, and at `start` (default: now) on the wall-clock `time()` and `now()`.
+    """
+
+    def __init__(self, start: datetime = None, realtime: bool = False):
+        self.epoch = (start or datetime.now()).timestamp()
+        self.realtime = realtime
+        self.events_run = 0
+
+        self._now = 0.0
+        self._queue: list = []
+        self._sequence = count()
+        self._wall_start = None
+        self._previous_clock = None
+        self._sleepers: set = set()
+        self._driver = None
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def time(self) -> float:
+        return self.epoch + self._now
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.time())
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Advances simulated time, running every event that falls due in the meantime.
+        """
+
+        self.run_until(self._now + seconds)
+
+    async def sleep_async(self, seconds: float) -> None:
+        """
+        Like sleep(), for coroutines.  Waits for an event at the current simulated time plus seconds, letting other coroutines run and sleep in the meantime.
+        """
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._sleepers.add(future)
+        self.schedule(seconds, _wake, future)
+        if self._driver is None:
+            self._driver = loop.create_task(self._drive())
+        await future
+
+    def schedule(self, delay: float, callback: Callable, *args, **kwargs) -> Event:
+        """
+        Runs callback after delay simulated seconds.  Returns the Event.
+        """
+
+        return self.schedule_at(self._now + delay, callback, *args, **kwargs)
+
+    def schedule_at(self, when: float, callback: Callable, *args, **kwargs) -> Event:
+        """
+        Runs callback at a simulated time.  Returns the Event.
+        """
+
+        event = Event(max(when, self._now), callback, args, kwargs)
+        self._push(event)
+        return event
+
+    def every(self, interval: float, callback: Callable, *args, start: float = None, **kwargs) -> Event:
+        """
+        Runs callback every interval simulated seconds, at a fixed rate, until the returned Event is cancelled.
+        """
+
+        event = Event(self._now if start is None else start, callback, args, kwargs, interval)
+        self._push(event)
+        return event
+
+    def step(self) -> bool:
+        """
+        Runs the next event.  Returns False if there was nothing left to run.
+        """
+
+        while self._queue:
+            _, _, event = heapq.heappop(self._queue)
+            if event.cancelled:
+                continue
+
+            self._advance(event.when)
+            if event.interval is not None:
+                event.when += event.interval
+                self._push(event)
+            self.events_run += 1
+            event.callback(*event.args, **event.kwargs)
+            return True
+
+        return False
+
+    def run_until(self, when: float) -> None:
+        """
+        Runs every event due up to and including the simulated time `when`, then moves the clock to `when`.
+        """
+
+        while self._queue and self._queue[0][0] <= when:
+            self.step()
+        self._advance(max(when, self._now))
+
+    def run_for(self, seconds: float) -> None:
+        """
+        Runs the simulation for a number of simulated seconds.
+        """
+
+        self.run_until(self._now + seconds)
+
+    def run(self) -> None:
+        """
+        Runs until there are no events left.  Never returns while a repeating event is scheduled.
+        """
+
+        while self.step():
+            pass
+
+    def __enter__(self) -> "Simulation":
+        self._previous_clock = set_clock(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        set_clock(self._previous_clock)
+
+    async def _drive(self) -> None:
+        # Runs the next event whenever every other task is waiting, until no coroutine is asleep
+        try:
+            while self._asleep():
+                await _settle()
+                if not self._asleep():
+                    break
+                if self.realtime:
+                    # Wait on the event loop rather than blocking it in _advance()
+                    delay = self._delay(self._next_when())
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                        continue
+                if not self.step():
+                    break
+        finally:
+            self._driver = None
+
+    def _asleep(self) -> bool:
+        # Sleepers are dropped once woken, or cancelled along with their task
+        self._sleepers = {future for future in self._sleepers if not future.done()}
+        return bool(self._sleepers)
+
+    def _next_when(self) -> float:
+        while self._queue and self._queue[0][2].cancelled:
+            heapq.heappop(self._queue)
+        return self._queue[0][0] if self._queue else self._now
+
+    def _push(self, event: Event) -> None:
+        heapq.heappush(self._queue, (event.when, next(self._sequence), event))
+
+    def _delay(self, when: float) -> float:
+        # Wall-clock seconds until a simulated time, in realtime mode
+        if self._wall_start is None:
+            self._wall_start = time.monotonic() - self._now
+        return self._wall_start + when - time.monotonic()
+
+    def _advance(self, when: float) -> None:
+        if self.realtime:
+            delay = self._delay(when)
+            if delay > 0:
+                time.sleep(delay)
+        self._now = when
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+async def _settle() -> None:
+    # Yields until no other callback is ready to run, so simulated time only moves on once every task woken at the
+    # current time has run as far as it can.  Event loops without a ready queue get a single yield.
+    loop = asyncio.get_running_loop()
+    await asyncio.sleep(0)
+    while getattr(loop, "_ready", None):
+        await asyncio.sleep(0)
+
+
+_clock: Any = WallClock()
+
+
+def get_clock() -> Any:
+    """
+    Returns the clock that components should use for the time and for sleeping.
+    """
+
+    return _clock
+
+
+def set_clock(clock: Any) -> Any:
+    """
+    Installs a clock for every component.  Returns the clock that was installed before.
+    """
+
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
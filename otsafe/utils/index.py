@@ -0,0 +1,239 @@
+"""
+Sidecar indexes for random access into historic captures.  Answering "show me 14:02 to 14:05 for PLC 10.1.2.3" should not mean reading the whole capture again.
+
+CaptureIndex.build() makes a single streaming pass over a capture with PcapReader.  It records two things: a timestamp-to-offset checkpoint every `interval` packets, and the record offset and timestamp of every packet, grouped by TCP connection.  The index is saved next to the capture as `<capture>.idx`, a compressed NumPy archive, and is rebuilt when the capture's size or modification time no longer match.
+
+A time window seeks to the checkpoint before it and reads forward until the window ends.  A host or flow query goes straight to the recorded offsets of the matching connections.  Use `otsafe.utils.listener.seek_pcap()` to read the matching packets.
+"""
+
+import os
+from array import array
+from datetime import datetime
+from typing import Iterator
+
+import numpy as np
+
+from otsafe.utils.pcap import MODBUS_PORT, Packet, PcapReader
+
+INDEX_SUFFIX = ".idx"
+INDEX_INTERVAL = 1000
+
+
+def flow_key(packet: Packet) -> str:
+    """
+    Returns the connection of a packet as "ip:port-ip:port", the same for both directions.
+    """
+
+    a, b = f"{packet.src}:{packet.sport}", f"{packet.dst}:{packet.dport}"
+    return f"{a}-{b}" if a < b else f"{b}-{a}"
+
+
+class CaptureIndex:
+    """
+    A time and flow index over one capture.
+
+    A checkpoint is kept every `interval` packets.  `checkpoint_offsets` holds its record offset, `checkpoint_times` the latest timestamp of any packet up to it, and `checkpoint_floors` the earliest timestamp of any packet from it on.  Both only increase, so packets that are slightly out of order are still found.
+
+    For flow i of `flows`, its packets are `offsets[starts[i]:starts[i + 1]]`, with timestamps in `timestamps`.
+    """
+
+    def __init__(
+        self,
+        checkpoint_times: np.ndarray,
+        checkpoint_offsets: np.ndarray,
+        checkpoint_floors: np.ndarray,
+        flows: list[str],
+        starts: np.ndarray,
+        offsets: np.ndarray,
+        timestamps: np.ndarray,
+        port: int | None = MODBUS_PORT,
+        size: int = 0,
+        mtime: int = 0
+    ):
+        self.checkpoint_times = checkpoint_times
+        self.checkpoint_offsets = checkpoint_offsets
+        self.checkpoint_floors = checkpoint_floors
+        self.flows = flows
+        self.starts = starts
+        self.offsets = offsets
+        self.timestamps = timestamps
+        self.port = port
+        self.size = size
+        self.mtime = mtime
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @classmethod
+    def build(cls, file_path: str, port: int | None = MODBUS_PORT, interval: int = INDEX_INTERVAL) -> "CaptureIndex":
+        """
+        Indexes a capture in one pass.
+        """
+
+        checkpoint_times, checkpoint_offsets = array("d"), array("Q")
+        offsets, timestamps, flow_ids = array("Q"), array("d"), array("I")
+        flows: dict[str, int] = {}
+        latest = float("-inf")
+
+        with PcapReader(file_path, port) as reader:
+            for count, packet in enumerate(reader):
+                if count % interval == 0:
+                    checkpoint_times.append(max(latest, packet.timestamp))
+                    checkpoint_offsets.append(packet.offset)
+                latest = max(latest, packet.timestamp)
+                offsets.append(packet.offset)
+                timestamps.append(packet.timestamp)
+                flow_ids.append(flows.setdefault(flow_key(packet), len(flows)))
+
+        in_file_order = np.array(timestamps, dtype=np.float64)
+        if len(in_file_order):
+            block_floors = np.minimum.reduceat(in_file_order, np.arange(0, len(in_file_order), interval))
+            checkpoint_floors = np.minimum.accumulate(block_floors[::-1])[::-1]
+        else:
+            checkpoint_floors = np.empty(0, dtype=np.float64)
+
+        ids = np.frombuffer(flow_ids, dtype=np.uint32) if flow_ids else np.empty(0, dtype=np.uint32)
+        order = np.argsort(ids, kind="stable")
+        stat = os.stat(file_path)
+
+        return cls(
+            np.array(checkpoint_times, dtype=np.float64),
+            np.array(checkpoint_offsets, dtype=np.uint64),
+            checkpoint_floors,
+            list(flows),
+            np.searchsorted(ids[order], np.arange(len(flows) + 1)),
+            np.array(offsets, dtype=np.uint64)[order],
+            in_file_order[order],
+            port,
+            stat.st_size,
+            stat.st_mtime_ns,
+        )
+
+    @classmethod
+    def open(cls, file_path: str, port: int | None = MODBUS_PORT, interval: int = INDEX_INTERVAL) -> "CaptureIndex":
+        """
+        Loads the sidecar index of a capture, building and saving it first if it is missing or stale.
+        """
+
+        path = file_path + INDEX_SUFFIX
+        if os.path.exists(path):
+            index = cls.load(path)
+            stat = os.stat(file_path)
+            if (index.size, index.mtime, index.port) == (stat.st_size, stat.st_mtime_ns, port):
+                return index
+
+        index = cls.build(file_path, port, interval)
+        index.save(path)
+        return index
+
+    @classmethod
+    def load(cls, path: str) -> "CaptureIndex":
+        with np.load(path, allow_pickle=False) as archive:
+            port = int(archive["port"])
+            return cls(
+                archive["checkpoint_times"],
+                archive["checkpoint_offsets"],
+                archive["checkpoint_floors"],
+                archive["flows"].tolist(),
+                archive["starts"],
+                archive["offsets"],
+                archive["timestamps"],
+                None if port < 0 else port,
+                int(archive["size"]),
+                int(archive["mtime"]),
+            )
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as sidecar:
+            np.savez_compressed(
+                sidecar,
+                checkpoint_times=self.checkpoint_times,
+                checkpoint_offsets=self.checkpoint_offsets,
+                checkpoint_floors=self.checkpoint_floors,
+                flows=np.array(self.flows, dtype=str),
+                starts=self.starts,
+                offsets=self.offsets,
+                timestamps=self.timestamps,
+                port=-1 if self.port is None else self.port,
+                size=self.size,
+                mtime=self.mtime,
+            )
+
+    def seek(self, start: float | datetime) -> int | None:
+        """
+        Returns the offset of the last checkpoint before start, or None if the capture is empty.  No packet before that offset is at or after start.
+        """
+
+        if not len(self.checkpoint_offsets):
+            return None
+        position = int(np.searchsorted(self.checkpoint_times, _seconds(start), side="left")) - 1
+        return int(self.checkpoint_offsets[max(position, 0)])
+
+    def matching_flows(self, host: str = None, port: int = None) -> list[int]:
+        """
+        Returns the ids of the flows with host, and port, as either endpoint.
+        """
+
+        matching = []
+        for i, flow in enumerate(self.flows):
+            endpoints = [endpoint.rsplit(":", 1) for endpoint in flow.split("-")]
+            if any((host is None or ip == host) and (port is None or int(p) == port) for ip, p in endpoints):
+                matching.append(i)
+        return matching
+
+    def flow_offsets(self, flows: list[int], start: float | datetime = None, end: float | datetime = None) -> np.ndarray:
+        """
+        Returns the offsets, in file order, of the packets of the given flows between start and end.
+        """
+
+        if not flows:
+            return np.empty(0, dtype=np.uint64)
+        selected = np.concatenate([np.arange(self.starts[i], self.starts[i + 1]) for i in flows])
+        mask = np.ones(len(selected), dtype=bool)
+        if start is not None:
+            mask &= self.timestamps[selected] >= _seconds(start)
+        if end is not None:
+            mask &= self.timestamps[selected] <= _seconds(end)
+        return np.sort(self.offsets[selected[mask]])
+
+    def __repr__(self):
+        return f"CaptureIndex(packets={len(self)}, flows={len(self.flows)}, checkpoints={len(self.checkpoint_offsets)})"
+
+
+def read_window(reader: PcapReader, index: CaptureIndex, start: float | datetime = None, end: float | datetime = None) -> Iterator[Packet]:
+    """
+    Yields the packets between start and end, reading forward from the nearest checkpoint.  Stops at the first checkpoint after which every packet is later than end.
+    """
+
+    start = None if start is None else _seconds(start)
+    end = None if end is None else _seconds(end)
+    offset = None if start is None else index.seek(start)
+    if start is not None and offset is None:
+        return
+
+    last = None
+    if end is not None:
+        position = int(np.searchsorted(index.checkpoint_floors, end, side="right"))
+        if position < len(index.checkpoint_offsets):
+            last = int(index.checkpoint_offsets[position])
+
+    for packet in reader.packets(offset):
+        if last is not None and packet.offset >= last:
+            return
+        if (start is None or packet.timestamp >= start) and (end is None or packet.timestamp <= end):
+            yield packet
+
+
+def read_offsets(reader: PcapReader, offsets) -> Iterator[Packet]:
+    """
+    Yields the packets recorded at each offset.
+    """
+
+    for offset in offsets:
+        packet = next(reader.packets(int(offset)), None)
+        if packet is not None:
+            yield packet
+
+
+def _seconds(value: float | datetime) -> float:
+    return value.timestamp() if isinstance(value, datetime) else float(value)
@@ -1,11 +1,65 @@
+from datetime import datetime
+from typing import Callable, Iterator
+
 import pyshark
 
+from otsafe.utils.index import CaptureIndex, read_offsets, read_window
+from otsafe.utils.pcap import MODBUS_PORT, Packet, PcapReader
+from otsafe.utils.stream import STREAM_QUEUE_POLICY, STREAM_QUEUE_SIZE, PacketStream
+
 
 def load_pcap(file_path: str):
     """Load a pcap file into a pyshark capture object"""
     return pyshark.FileCapture(file_path)
 
 
+def stream_pcap(file_path: str, port: int | None = MODBUS_PORT) -> PcapReader:
+    """Stream TCP packets on the given port from a pcap or pcapng file, without pyshark.  Use load_pcap() for a full dissection."""
+    return PcapReader(file_path, port)
+
+
 def load_live_capture(interface: str = "eth0", timeout: int = 50):
     """Load a live capture into a pyshark capture object"""
     return pyshark.LiveCapture(interface=interface).sniff(timeout=timeout)
+
+
+def stream_live_capture(
+    handler: Callable,
+    interface: str = "eth0",
+    port: int | None = MODBUS_PORT,
+    capacity: int = STREAM_QUEUE_SIZE,
+    policy: str = STREAM_QUEUE_POLICY,
+    workers: int = 1
+) -> PacketStream:
+    """Stream packets from a live capture to handler(packet) as they arrive, through a bounded queue.  Call start() or use it as a context manager.  See otsafe.utils.stream for the overflow policies."""
+    capture = pyshark.LiveCapture(interface=interface, bpf_filter=None if port is None else f"tcp port {port}")
+    return PacketStream(
+        capture.sniff_continuously(), handler, capacity, policy, workers,
+        close=capture.close, interrupt=lambda: capture.eventloop.call_soon_threadsafe(_kill_capture, capture)
+    )
+
+
+def seek_pcap(
+    file_path: str,
+    start: float | datetime = None,
+    end: float | datetime = None,
+    host: str = None,
+    port: int | None = MODBUS_PORT
+) -> Iterator[Packet]:
+    """Yield the packets of a capture between start and end, optionally only those to or from host, using its sidecar index (built on first use).  Only the matching part of the capture is read."""
+    index = CaptureIndex.open(file_path, port)
+    with PcapReader(file_path, port) as reader:
+        if host is None:
+            yield from read_window(reader, index, start, end)
+        else:
+            yield from read_offsets(reader, index.flow_offsets(index.matching_flows(host), start, end))
+
+
+def _kill_capture(capture) -> None:
+    """Kill the tshark and dumpcap processes of a capture, from inside its event loop.  pyshark's close() can't be called while the capture thread is running that loop, so stop() wakes the loop with this instead: the capture thread then reads the end of tshark's output and closes the capture itself."""
+    for process in list(capture._running_processes):
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
@@ -0,0 +1,200 @@
+"""
+Shared Modbus/TCP connection pool.  Every Component reads and writes through a single pool keyed by (ip, port), so polling a device once a second reuses the same socket instead of paying for a TCP handshake on every request.
+
+Idle connections are closed after `MODBUS_IDLE_TIMEOUT` seconds, and no more than `MODBUS_MAX_CONNECTIONS` sockets are opened to any one device.  Both can be overridden in the .env of the project.  A request that fails because the link dropped is retried once on a fresh connection.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any
+
+from dotenv import find_dotenv, load_dotenv
+from pymodbus.client import ModbusTcpClient
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+
+from otsafe.exceptions.exceptions import ConnectionError
+
+load_dotenv(find_dotenv())
+
+MODBUS_PORT = 502
+MODBUS_IDLE_TIMEOUT = float(os.getenv('MODBUS_IDLE_TIMEOUT', 60))
+MODBUS_MAX_CONNECTIONS = int(os.getenv('MODBUS_MAX_CONNECTIONS', 2))
+
+
+class ModbusConnectionPool:
+    """
+    A thread-safe pool of connected Modbus/TCP clients, keyed by (ip, port).
+
+    Connections are checked out with `acquire()` (or the `connection()` context manager) and handed back with `release()`.  If every connection to a device is busy, callers wait up to `acquire_timeout` seconds for one to be returned.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: float = MODBUS_IDLE_TIMEOUT,
+        max_connections: int = MODBUS_MAX_CONNECTIONS,
+        acquire_timeout: float = 10,
+        client_class: type = ModbusTcpClient,
+        **client_kwargs
+    ):
+        self.idle_timeout = idle_timeout
+        self.max_connections = max_connections
+        self.acquire_timeout = acquire_timeout
+        self.client_class = client_class
+        self.client_kwargs = client_kwargs
+
+        self._lock = threading.Lock()
+        self._returned = threading.Condition(self._lock)
+        self._idle: dict[tuple, list] = defaultdict(list)
+        self._open: dict[tuple, int] = defaultdict(int)
+
+    def acquire(self, ip: str, port: int = MODBUS_PORT) -> Any:
+        """
+        Checks out a connected client for the device.  Returns a pymodbus client.
+        """
+
+        key = (ip, port or MODBUS_PORT)
+        deadline = time.monotonic() + self.acquire_timeout
+        client = None
+
+        with self._returned:
+            while True:
+                self._close_expired(key)
+                if self._idle[key]:
+                    client, _ = self._idle[key].pop()
+                    break
+                if self._open[key] < self.max_connections:
+                    # Reserve the slot now, connect outside the lock
+                    self._open[key] += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ConnectionError(f"No free Modbus connection to {key[0]}:{key[1]}")
+                self._returned.wait(remaining)
+
+        try:
+            if client is None:
+                client = self.client_class(key[0], port=key[1], **self.client_kwargs)
+            if not client.connected and not client.connect():
+                raise ConnectionError(f"Unable to connect to {key[0]}:{key[1]}")
+        except Exception:
+            self._discard(key, client)
+            raise
+
+        return client
+
+    def release(self, ip: str, port: int, client: Any, discard: bool = False) -> None:
+        """
+        Returns a client to the pool.  If discard is True, or the link has dropped, the client is closed instead.
+        """
+
+        key = (ip, port or MODBUS_PORT)
+        if discard or not client.connected:
+            self._discard(key, client)
+            return
+
+        with self._returned:
+            self._idle[key].append((client, time.monotonic()))
+            self._returned.notify()
+
+    @contextmanager
+    def connection(self, ip: str, port: int = MODBUS_PORT):
+        """
+        Context manager that checks out a client and returns it to the pool on exit.
+        """
+
+        client = self.acquire(ip, port)
+        try:
+            yield client
+        except Exception:
+            self.release(ip, port, client, discard=True)
+            raise
+        self.release(ip, port, client)
+
+    def execute(self, ip: str, port: int, method: str, *args, **kwargs) -> Any:
+        """
+        Calls `method` on a pooled client for the device.  If the link has dropped, the request is retried once on a new connection.
+        """
+
+        for attempt in range(2):
+            client = self.acquire(ip, port)
+            try:
+                result = getattr(client, method)(*args, **kwargs)
+            except (ConnectionException, ModbusIOException, OSError):
+                self.release(ip, port, client, discard=True)
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                self.release(ip, port, client, discard=True)
+                raise
+            self.release(ip, port, client)
+            return result
+
+    def close_idle(self) -> None:
+        """
+        Closes every idle connection that has outlived the idle timeout.
+        """
+
+        with self._returned:
+            for key in list(self._idle):
+                self._close_expired(key)
+
+    def close_all(self) -> None:
+        """
+        Closes every idle connection in the pool.  Connections that are checked out are closed when they are released.
+        """
+
+        with self._returned:
+            for key, idle in self._idle.items():
+                for client, _ in idle:
+                    client.close()
+                self._open[key] -= len(idle)
+                idle.clear()
+            self._returned.notify_all()
+
+    def stats(self) -> dict:
+        """
+        Returns the number of open and idle connections per device.
+        """
+
+        with self._lock:
+            return {
+                key: {"open": self._open[key], "idle": len(self._idle[key])}
+                for key in self._open
+                if self._open[key]
+            }
+
+    def _close_expired(self, key: tuple) -> None:
+        # Caller must hold the lock
+        cutoff = time.monotonic() - self.idle_timeout
+        idle = self._idle[key]
+        while idle and idle[0][1] < cutoff:
+            client, _ = idle.pop(0)
+            client.close()
+            self._open[key] -= 1
+
+    def _discard(self, key: tuple, client: Any) -> None:
+        if client is not None:
+            client.close()
+        with self._returned:
+            self._open[key] -= 1
+            self._returned.notify()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ModbusConnectionPool:
+    """
+    Returns the process-wide connection pool shared by every Component.
+    """
+
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ModbusConnectionPool()
+        return _pool
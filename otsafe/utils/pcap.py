@@ -0,0 +1,294 @@
+"""
+Fast streaming reader for pcap and pcapng captures.  pyshark hands every packet to tshark and builds a full dissection for it, which is what you want for one packet and far too slow for a multi-GB plant capture.
+
+PcapReader memory-maps the capture and walks it record by record.  Each frame is yielded as a Packet holding a memoryview slice of the map, so no packet bytes are copied.  Link, IP and TCP headers are only parsed far enough to apply the port filter (TCP/502 by default), and everything else is skipped before any object is built.
+
+Supported link types are Ethernet (with 802.1Q VLAN tags), Linux cooked capture, BSD loopback and raw IP, over IPv4 or IPv6.  For a full dissection of a packet, use `otsafe.utils.listener.load_pcap()`, which wraps pyshark.
+"""
+
+import mmap
+import socket
+import struct
+from typing import Iterator
+
+MODBUS_PORT = 502
+
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LINUX_SLL = 113
+
+PCAP_MAGIC = {
+    b"\xd4\xc3\xb2\xa1": ("<", 1e-6),
+    b"\xa1\xb2\xc3\xd4": (">", 1e-6),
+    b"\x4d\x3c\xb2\xa1": ("<", 1e-9),
+    b"\xa1\xb2\x3c\x4d": (">", 1e-9),
+}
+PCAPNG_MAGIC = b"\x0a\x0d\x0d\x0a"
+
+_U16BE = struct.Struct(">H")
+_PORTS = struct.Struct(">HH")
+
+
+class Packet:
+    """
+    A captured frame.  `frame` is a memoryview into the capture, `offset` is the position of its record in the file, and the `*_offset` fields index into `frame`.
+    """
+
+    __slots__ = ("timestamp", "offset", "frame", "ip_version", "ip_offset", "tcp_offset", "payload_offset", "sport", "dport")
+
+    def __init__(self, timestamp, offset, frame, ip_version, ip_offset, tcp_offset, payload_offset, sport, dport):
+        self.timestamp = timestamp
+        self.offset = offset
+        self.frame = frame
+        self.ip_version = ip_version
+        self.ip_offset = ip_offset
+        self.tcp_offset = tcp_offset
+        self.payload_offset = payload_offset
+        self.sport = sport
+        self.dport = dport
+
+    @property
+    def payload(self) -> memoryview:
+        # Bounded by the IP length, so Ethernet padding on short frames is not part of the payload
+        if self.ip_version == 4:
+            end = self.ip_offset + _U16BE.unpack_from(self.frame, self.ip_offset + 2)[0]
+        else:
+            end = self.ip_offset + 40 + _U16BE.unpack_from(self.frame, self.ip_offset + 4)[0]
+        return self.frame[self.payload_offset:end]
+
+    @property
+    def src(self) -> str:
+        if self.ip_version == 4:
+            return socket.inet_ntop(socket.AF_INET, self.frame[self.ip_offset + 12:self.ip_offset + 16])
+        return socket.inet_ntop(socket.AF_INET6, self.frame[self.ip_offset + 8:self.ip_offset + 24])
+
+    @property
+    def dst(self) -> str:
+        if self.ip_version == 4:
+            return socket.inet_ntop(socket.AF_INET, self.frame[self.ip_offset + 16:self.ip_offset + 20])
+        return socket.inet_ntop(socket.AF_INET6, self.frame[self.ip_offset + 24:self.ip_offset + 40])
+
+    @property
+    def flow(self) -> tuple:
+        """
+        (src, sport, dst, dport) of the packet.
+        """
+
+        return (self.src, self.sport, self.dst, self.dport)
+
+    def __repr__(self):
+        return f"Packet({self.timestamp:.6f}, {self.src}:{self.sport} -> {self.dst}:{self.dport}, {len(self.frame)} bytes)"
+
+
+def parse_frame(frame: memoryview, linktype: int, port: int | None):
+    """
+    Parses the headers of a frame down to TCP.  Returns (ip_version, ip_offset, tcp_offset, payload_offset, sport, dport), or None if the frame is not TCP or does not match the port.
+    """
+
+    if linktype == LINKTYPE_ETHERNET:
+        offset = 12
+        ethertype = _U16BE.unpack_from(frame, offset)[0] if len(frame) >= 14 else 0
+        while ethertype in (0x8100, 0x88A8):
+            offset += 4
+            ethertype = _U16BE.unpack_from(frame, offset)[0] if len(frame) >= offset + 2 else 0
+        offset += 2
+    elif linktype == LINKTYPE_LINUX_SLL:
+        ethertype = _U16BE.unpack_from(frame, 14)[0] if len(frame) >= 16 else 0
+        offset = 16
+    elif linktype == LINKTYPE_RAW:
+        ethertype = {4: 0x0800, 6: 0x86DD}.get(frame[0] >> 4, 0) if len(frame) else 0
+        offset = 0
+    elif linktype == LINKTYPE_NULL:
+        ethertype = {4: 0x0800, 6: 0x86DD}.get(frame[4] >> 4, 0) if len(frame) > 4 else 0
+        offset = 4
+    else:
+        return None
+
+    if ethertype == 0x0800:
+        if len(frame) < offset + 20 or frame[offset + 9] != 6:
+            return None
+        # Skip fragments after the first, they carry no TCP header
+        if _U16BE.unpack_from(frame, offset + 6)[0] & 0x1FFF:
+            return None
+        ip_version, tcp_offset = 4, offset + (frame[offset] & 0x0F) * 4
+    elif ethertype == 0x86DD:
+        if len(frame) < offset + 40 or frame[offset + 6] != 6:
+            return None
+        ip_version, tcp_offset = 6, offset + 40
+    else:
+        return None
+
+    if len(frame) < tcp_offset + 20:
+        return None
+    sport, dport = _PORTS.unpack_from(frame, tcp_offset)
+    if port is not None and sport != port and dport != port:
+        return None
+
+    return ip_version, offset, tcp_offset, tcp_offset + (frame[tcp_offset + 12] >> 4) * 4, sport, dport
+
+
+class PcapReader:
+    """
+    Streams packets from a pcap or pcapng file.  Only TCP packets to or from `port` are yielded, pass port=None for every TCP packet.
+    """
+
+    def __init__(self, file_path: str, port: int | None = MODBUS_PORT):
+        self.file_path = file_path
+        self.port = port
+
+        self._file = open(file_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+        magic = bytes(self._view[:4])
+        if magic in PCAP_MAGIC:
+            self.format = "pcap"
+            self._endian, self._resolution = PCAP_MAGIC[magic]
+            self.linktype = struct.unpack_from(self._endian + "I", self._view, 20)[0] & 0x0FFFFFFF
+        elif magic == PCAPNG_MAGIC:
+            self.format = "pcapng"
+            self._endian, self._interfaces = self._pcapng_header()
+            self.linktype = self._interfaces[0][0] if self._interfaces else None
+        else:
+            self.close()
+            raise ValueError(f"{file_path} is not a pcap or pcapng file")
+
+    def __iter__(self) -> Iterator[Packet]:
+        return self.packets()
+
+    def __enter__(self) -> "PcapReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def packets(self, offset: int = None) -> Iterator[Packet]:
+        """
+        Yields matching packets.  offset can be the file position of a record to start from (see Packet.offset).  For pcapng files, resuming from an offset assumes the interfaces described at the start of the file.
+        """
+
+        if self.format == "pcap":
+            return self._pcap_packets(24 if offset is None else offset)
+        if offset is None:
+            return self._pcapng_packets(0, "<", [])
+        return self._pcapng_packets(offset, self._endian, list(self._interfaces))
+
+    def close(self) -> None:
+        """
+        Closes the capture.  Packets still holding a memoryview keep the map alive until they are released.
+        """
+
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+    def _pcap_packets(self, position: int) -> Iterator[Packet]:
+        view, size, port, linktype = self._view, len(self._view), self.port, self.linktype
+        header = struct.Struct(self._endian + "IIII")
+        resolution = self._resolution
+
+        while position + 16 <= size:
+            seconds, fraction, caplen, _ = header.unpack_from(view, position)
+            start = position + 16
+            frame = view[start:start + caplen]
+            parsed = parse_frame(frame, linktype, port)
+            if parsed is not None:
+                yield Packet(seconds + fraction * resolution, position, frame, *parsed)
+            position = start + caplen
+
+    def _pcapng_header(self) -> tuple[str, list]:
+        # Reads the byte order and interfaces from the blocks before the first packet
+        view, position = self._view, 0
+        endian = "<" if bytes(view[8:12]) == b"\x4d\x3c\x2b\x1a" else ">"
+        interfaces = []
+
+        while position + 12 <= len(view):
+            block_type, block_length = struct.unpack_from(endian + "II", view, position)
+            if block_type in (3, 6) or block_length < 12:
+                break
+            if block_type == 1:
+                linktype = struct.unpack_from(endian + "H", view, position + 8)[0]
+                interfaces.append((linktype, self._tsresol(view, position, block_length, endian)))
+            position += block_length
+
+        return endian, interfaces
+
+    def _pcapng_packets(self, position: int, endian: str, interfaces: list) -> Iterator[Packet]:
+        view, size, port = self._view, len(self._view), self.port
+
+        while position + 12 <= size:
+            block_type = struct.unpack_from(endian + "I", view, position)[0]
+
+            if block_type == 0x0A0D0D0A:
+                # Section header, sets the byte order for the section
+                endian = "<" if bytes(view[position + 8:position + 12]) == b"\x4d\x3c\x2b\x1a" else ">"
+                interfaces = []
+
+            block_length = struct.unpack_from(endian + "I", view, position + 4)[0]
+            if block_length < 12:
+                break
+
+            if block_type == 1:
+                linktype = struct.unpack_from(endian + "H", view, position + 8)[0]
+                interfaces.append((linktype, self._tsresol(view, position, block_length, endian)))
+            elif block_type == 6:
+                interface, high, low, caplen = struct.unpack_from(endian + "IIII", view, position + 8)
+                linktype, resolution = interfaces[interface]
+                frame = view[position + 28:position + 28 + caplen]
+                parsed = parse_frame(frame, linktype, port)
+                if parsed is not None:
+                    yield Packet(((high << 32) | low) * resolution, position, frame, *parsed)
+            elif block_type == 3 and interfaces:
+                linktype, _ = interfaces[0]
+                original = struct.unpack_from(endian + "I", view, position + 8)[0]
+                frame = view[position + 12:position + 12 + min(original, block_length - 16)]
+                parsed = parse_frame(frame, linktype, port)
+                if parsed is not None:
+                    yield Packet(0.0, position, frame, *parsed)
+
+            position += block_length
+
+    @staticmethod
+    def _tsresol(view: memoryview, position: int, block_length: int, endian: str) -> float:
+        # Reads the if_tsresol option of an interface description block
+        option = position + 16
+        end = position + block_length - 4
+        while option + 4 <= end:
+            code, length = struct.unpack_from(endian + "HH", view, option)
+            if code == 0:
+                break
+            if code == 9 and length >= 1:
+                value = view[option + 4]
+                return 2.0 ** -(value & 0x7F) if value & 0x80 else 10.0 ** -value
+            option += 4 + (length + 3) // 4 * 4
+        return 1e-6
+
+
+def write_pcap(file_path: str, frames: list, linktype: int = LINKTYPE_ETHERNET) -> None:
+    """
+    Writes (timestamp, frame bytes) pairs to a classic pcap file.  Useful for building test captures.
+    """
+
+    with open(file_path, "wb") as capture:
+        capture.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, linktype))
+        for timestamp, frame in frames:
+            seconds = int(timestamp)
+            capture.write(struct.pack("<IIII", seconds, round((timestamp - seconds) * 1e6), len(frame), len(frame)))
+            capture.write(frame)
+
+
+def tcp_frame(src: str, dst: str, sport: int, dport: int, payload: bytes = b"") -> bytes:
+    """
+    Builds an Ethernet/IPv4/TCP frame carrying payload.  Useful for building test captures.
+    """
+
+    tcp = struct.pack(">HHIIBBHHH", sport, dport, 0, 0, 5 << 4, 0x18, 65535, 0, 0)
+    ip = struct.pack(
+        ">BBHHHBBH4s4s", 0x45, 0, 20 + len(tcp) + len(payload), 0, 0x4000, 64, 6, 0,
+        socket.inet_aton(src), socket.inet_aton(dst),
+    )
+    return b"\x00" * 12 + b"\x08\x00" + ip + tcp + bytes(payload)
@@ -0,0 +1,198 @@
+"""
+Asyncio Modbus polling engine.  Components are registered into scan-rate groups (for example 0.1, 1 and 10 seconds), and every group is polled on one event loop with pymodbus's async TCP client, so thousands of devices can be in flight without a thread each.
+
+Within a group the registers wanted from each device are coalesced with the ReadPlanner, and the polled values land directly on each Component's `value` and `last_updated`.  Latency, timeouts and errors are recorded per device.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any
+
+from dotenv import find_dotenv, load_dotenv
+from pymodbus.client import AsyncModbusTcpClient
+
+from otsafe.exceptions.exceptions import ConnectionError
+from otsafe.utils.planner import MAX_READ_COUNT, MODBUS_READ_GAP, ReadPlanner, split_to_component
+
+load_dotenv(find_dotenv())
+
+MODBUS_TIMEOUT = float(os.getenv('MODBUS_TIMEOUT', 3))
+MODBUS_MAX_IN_FLIGHT = int(os.getenv('MODBUS_MAX_IN_FLIGHT', 1000))
+
+
+class DeviceStats:
+    """
+    Polling statistics for a single device.
+    """
+
+    def __init__(self):
+        self.polls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.last_latency = None
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    @property
+    def avg_latency(self) -> float | None:
+        completed = self.polls - self.timeouts - self.errors
+        return self.total_latency / completed if completed else None
+
+    def record(self, latency: float) -> None:
+        self.polls += 1
+        self.last_latency = latency
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def __repr__(self):
+        return f"DeviceStats(polls={self.polls}, timeouts={self.timeouts}, errors={self.errors}, avg_latency={self.avg_latency})"
+
+
+class PollingEngine:
+    """
+    Polls registered Components over Modbus/TCP on a single event loop, grouped by scan rate.
+    """
+
+    def __init__(
+        self,
+        timeout: float = MODBUS_TIMEOUT,
+        max_in_flight: int = MODBUS_MAX_IN_FLIGHT,
+        max_gap: int = MODBUS_READ_GAP,
+        max_count: int = MAX_READ_COUNT,
+        client_class: type = AsyncModbusTcpClient,
+    ):
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.max_gap = max_gap
+        self.max_count = max_count
+        self.client_class = client_class
+
+        self.groups: dict[float, ReadPlanner] = {}
+        self.stats: dict[tuple, DeviceStats] = {}
+        self._clients: dict[tuple, Any] = {}
+        self._device_locks: dict[tuple, asyncio.Lock] = {}
+        self._semaphore = None
+        self._running = False
+
+    def register(self, component: Any, interval: float = 1, register: int = None, count: int = None) -> None:
+        """
+        Adds a Component to the scan-rate group for `interval` seconds.
+        """
+
+        if interval not in self.groups:
+            self.groups[interval] = ReadPlanner(max_gap=self.max_gap, max_count=self.max_count)
+        self.groups[interval].add(component, register, count)
+
+    def unregister(self, component: Any) -> None:
+        """
+        Removes a Component from every scan-rate group.
+        """
+
+        for planner in self.groups.values():
+            planner.remove(component)
+
+    async def scan(self, interval: float) -> None:
+        """
+        Polls every device in one scan-rate group once, concurrently.
+        """
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        plan = self.groups[interval].plan()
+        await asyncio.gather(*(self._poll_device(key, blocks) for key, blocks in plan.items()))
+
+    async def run(self, duration: float = None) -> None:
+        """
+        Polls every scan-rate group at its own fixed rate until `stop()` is called, or for `duration` seconds.
+        """
+
+        self._running = True
+        tasks = [asyncio.create_task(self._run_group(interval)) for interval in self.groups]
+        try:
+            if duration is None:
+                await asyncio.gather(*tasks)
+            else:
+                await asyncio.sleep(duration)
+        finally:
+            self._running = False
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self) -> None:
+        """
+        Stops the engine after the current scans finish.
+        """
+
+        self._running = False
+
+    def close(self) -> None:
+        """
+        Closes every client connection.
+        """
+
+        for client in self._clients.values():
+            client.close()
+        self._clients.clear()
+
+    async def _run_group(self, interval: float) -> None:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        scans = 0
+
+        while self._running:
+            await self.scan(interval)
+            scans += 1
+            # Schedule against the start time so scan time does not add drift
+            await asyncio.sleep(max(0, start + scans * interval - loop.time()))
+
+    async def _poll_device(self, key: tuple, blocks: list) -> None:
+        ip, port, unit_id = key
+        stats = self.stats.setdefault(key, DeviceStats())
+        lock = self._device_locks.setdefault(key, asyncio.Lock())
+
+        async with self._semaphore, lock:
+            for block in blocks:
+                began = time.perf_counter()
+                try:
+                    client = await self._client(ip, port)
+                    response = await asyncio.wait_for(
+                        client.read_holding_registers(block.start, count=block.count, device_id=unit_id),
+                        self.timeout,
+                    )
+                except asyncio.TimeoutError:
+                    stats.polls += 1
+                    stats.timeouts += 1
+                    continue
+                except Exception:
+                    stats.polls += 1
+                    stats.errors += 1
+                    self._drop_client(ip, port)
+                    continue
+
+                if response.isError():
+                    stats.polls += 1
+                    stats.errors += 1
+                    continue
+
+                stats.record(time.perf_counter() - began)
+                for component, offset, count in block.targets:
+                    split_to_component(component, response.registers[offset:offset + count])
+
+    async def _client(self, ip: str, port: int) -> Any:
+        client = self._clients.get((ip, port))
+        if client is None:
+            client = self.client_class(ip, port=port, timeout=self.timeout)
+            self._clients[(ip, port)] = client
+        if not client.connected:
+            await asyncio.wait_for(client.connect(), self.timeout)
+            if not client.connected:
+                raise ConnectionError(f"Unable to connect to {ip}:{port}")
+        return client
+
+    def _drop_client(self, ip: str, port: int) -> None:
+        client = self._clients.pop((ip, port), None)
+        if client is not None:
+            client.close()
@@ -0,0 +1,305 @@
+"""
+Continuous packet streaming.  A PacketStream reads packets from a source (usually a pyshark live capture, see `otsafe.utils.listener.stream_live_capture()`) on a capture thread, and hands them through a bounded queue to worker threads that run a handler on each one as it arrives.
+
+When the handler falls behind, the queue fills up and the overflow policy decides what gives:
+
+- "block" applies backpressure: the capture thread waits for room.  Nothing is dropped here, but on a SPAN port the kernel or switch will drop packets instead.
+- "drop_newest" discards the arriving packet, keeping the backlog intact.
+- "drop_oldest" discards the oldest queued packet, keeping the freshest view of the process.
+
+Drops are counted, and latency is recorded for each stage: capture (packet timestamp to enqueue), queue (enqueue to dequeue) and handler.
+
+The queue size and policy can be overridden by setting `STREAM_QUEUE_SIZE` and `STREAM_QUEUE_POLICY` in the .env of the project.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Iterable
+
+from dotenv import find_dotenv, load_dotenv
+
+load_dotenv(find_dotenv())
+
+BLOCK = "block"
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+POLICIES = (BLOCK, DROP_NEWEST, DROP_OLDEST)
+
+STREAM_QUEUE_SIZE = int(os.getenv('STREAM_QUEUE_SIZE', 10_000))
+STREAM_QUEUE_POLICY = os.getenv('STREAM_QUEUE_POLICY', BLOCK)
+
+
+class StageStats:
+    """
+    Latency statistics for one stage of the stream.  Percentiles are taken over the most recent samples.
+    """
+
+    def __init__(self, samples: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: deque = deque(maxlen=samples)
+
+    @property
+    def avg(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, p: float) -> float | None:
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def record(self, latency: float) -> None:
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+        self.recent.append(latency)
+
+    def __repr__(self):
+        return f"StageStats(count={self.count}, avg={self.avg}, p99={self.percentile(99)}, max={self.max})"
+
+
+class PacketQueue:
+    """
+    A bounded, thread-safe FIFO with an overflow policy.  Items are stored with the time they were enqueued.
+    """
+
+    def __init__(self, capacity: int = STREAM_QUEUE_SIZE, policy: str = STREAM_QUEUE_POLICY):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy {policy!r}, expected one of {', '.join(POLICIES)}")
+
+        self.capacity = capacity
+        self.policy = policy
+        self.enqueued = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.high_water = 0
+
+        self._items: deque = deque()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: Any) -> bool:
+        """
+        Adds an item, applying the overflow policy when the queue is full.  Returns False if the item was dropped or the queue is closed.
+        """
+
+        with self._lock:
+            if len(self._items) >= self.capacity:
+                if self.policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                if self.policy == DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                else:
+                    self.blocked += 1
+                    while len(self._items) >= self.capacity and not self._closed:
+                        self._not_full.wait()
+            if self._closed:
+                return False
+
+            self._items.append((item, time.perf_counter()))
+            self.enqueued += 1
+            self.high_water = max(self.high_water, len(self._items))
+            self._not_empty.notify()
+            return True
+
+    def get(self, timeout: float = None) -> tuple | None:
+        """
+        Removes and returns the oldest (item, enqueued_at) pair.  Returns None if the queue is closed and empty, or the timeout expires.
+        """
+
+        with self._lock:
+            self._not_empty.wait_for(lambda: self._items or self._closed, timeout)
+            if not self._items:
+                return None
+            entry = self._items.popleft()
+            self._not_full.notify()
+            return entry
+
+    def close(self) -> None:
+        """
+        Stops accepting items and wakes every waiting thread.  Items already queued can still be taken.
+        """
+
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+
+class PacketStream:
+    """
+    Streams packets from source to handler(packet) on `workers` threads, through a bounded PacketQueue.
+
+    source is any iterable of packets, such as pyshark's `LiveCapture.sniff_continuously()` or a PcapReader.  interrupt, if given, is called by `stop()` on the caller's thread to wake a source that is blocked waiting for its next packet, so it must be safe to call from any thread.  close, if given, is called on the capture thread once capturing stops, so a source bound to that thread (a pyshark capture runs its event loop there) is closed where it runs.  An exception raised by close is raised again by `stop()`.
+    """
+
+    def __init__(
+        self,
+        source: Iterable,
+        handler: Callable,
+        capacity: int = STREAM_QUEUE_SIZE,
+        policy: str = STREAM_QUEUE_POLICY,
+        workers: int = 1,
+        close: Callable = None,
+        interrupt: Callable = None
+    ):
+        self.source = source
+        self.handler = handler
+        self.workers = workers
+        self.queue = PacketQueue(capacity, policy)
+
+        self.captured = 0
+        self.processed = 0
+        self.errors = 0
+        self.capture_latency = StageStats()
+        self.queue_latency = StageStats()
+        self.handler_latency = StageStats()
+
+        self._close = close
+        self._interrupt = interrupt
+        self._close_error = None
+        self._stats_lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._running = False
+
+    def __enter__(self) -> "PacketStream":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """
+        Starts the capture thread and the worker threads.
+        """
+
+        self._running = True
+        self._threads = [threading.Thread(target=self._capture, name="packet-capture", daemon=True)]
+        self._threads += [
+            threading.Thread(target=self._work, name=f"packet-worker-{i}", daemon=True) for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        """
+        Stops capturing, and waits for the workers to finish the packets already queued.
+        """
+
+        self._running = False
+        try:
+            if self._interrupt is not None:
+                self._interrupt()
+        finally:
+            self.queue.close()
+            for thread in self._threads:
+                thread.join(timeout)
+            if not self._threads and self._close is not None:
+                # Never started, so there is no capture thread to close the source
+                self._close()
+
+        error, self._close_error = self._close_error, None
+        if error is not None:
+            raise error
+
+    def join(self, timeout: float = None) -> None:
+        """
+        Waits for a finite source to be exhausted and every queued packet to be handled.
+        """
+
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def run(self, duration: float = None) -> dict:
+        """
+        Streams for duration seconds, or until the source is exhausted, and returns the stats.
+        """
+
+        self.start()
+        if duration is None:
+            self.join()
+        else:
+            self._threads[0].join(duration)
+        self.stop()
+        return self.stats()
+
+    def stats(self) -> dict:
+        return {
+            "captured": self.captured,
+            "enqueued": self.queue.enqueued,
+            "processed": self.processed,
+            "dropped": self.queue.dropped,
+            "blocked": self.queue.blocked,
+            "errors": self.errors,
+            "queued": len(self.queue),
+            "high_water": self.queue.high_water,
+            "capture_latency": self.capture_latency,
+            "queue_latency": self.queue_latency,
+            "handler_latency": self.handler_latency,
+        }
+
+    def _capture(self) -> None:
+        try:
+            for packet in self.source:
+                if not self._running:
+                    break
+                self.captured += 1
+                captured_at = _timestamp(packet)
+                if captured_at is not None:
+                    self.capture_latency.record(max(0.0, time.time() - captured_at))
+                self.queue.put(packet)
+        finally:
+            # A finite source is exhausted, let the workers drain the queue and exit
+            self.queue.close()
+            if self._close is not None:
+                try:
+                    self._close()
+                except Exception as error:
+                    self._close_error = error
+
+    def _work(self) -> None:
+        while True:
+            entry = self.queue.get()
+            if entry is None:
+                return
+            packet, enqueued_at = entry
+            began = time.perf_counter()
+            try:
+                self.handler(packet)
+                failed = False
+            except Exception:
+                failed = True
+            finished = time.perf_counter()
+
+            with self._stats_lock:
+                self.queue_latency.record(began - enqueued_at)
+                self.handler_latency.record(finished - began)
+                self.processed += 1
+                self.errors += failed
+
+
+def _timestamp(packet: Any) -> float | None:
+    # PcapReader packets carry `timestamp`, pyshark packets `sniff_timestamp` (a string)
+    timestamp = getattr(packet, "timestamp", None)
+    if timestamp is None:
+        timestamp = getattr(packet, "sniff_timestamp", None)
+    try:
+        return None if timestamp is None else float(timestamp)
+    except (TypeError, ValueError):
+        return None
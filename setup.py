@@ -6,8 +6,10 @@ setup(
     packages=find_packages(),
     install_requires=[
         'cryptography',
+        'numpy',
         'pymodbus',
         'pyshark',
         'python-dotenv',
+        'pyyaml',
     ],
 )
\ No newline at end of file
@@ -1,5 +1,9 @@
 import unittest
-from otsafe.components.alarms import Alarm
+from otsafe.components.actuators import Actuator
+from otsafe.components.alarms import Alarm, AlarmBus
+from otsafe.components.safety_systems import SIS
+from otsafe.components.sensors import Sensor
+from otsafe.utils.clock import Simulation
 
 class TestAlarm(unittest.TestCase):
 
@@ -14,5 +18,62 @@ class TestAlarm(unittest.TestCase):
         self.alarm.message = "Test message"
         self.assertEqual(self.alarm.message, "Test message")
 
+
+class TestAlarmBus(unittest.TestCase):
+
+    def setUp(self):
+        self.sim = Simulation().__enter__()
+        self.bus = AlarmBus(capacity=3, dedup_window=10, rate_limit=2)
+
+    def tearDown(self):
+        self.sim.__exit__()
+
+    def test_deduplicates_active_alarms(self):
+        first = self.bus.publish("PT-1", "high", "High pressure")
+        second = self.bus.publish("PT-1", "high", "High pressure")
+        self.assertIs(first, second)
+        self.assertEqual(first.count, 2)
+        self.assertEqual(len(self.bus.events), 1)
+
+        self.bus.clear("PT-1")
+        self.assertIsNot(self.bus.publish("PT-1", "high"), first)
+
+    def test_shelving(self):
+        self.bus.shelve("PT-1", "high", duration=5)
+        self.assertIsNone(self.bus.publish("PT-1", "high"))
+        self.sim.sleep(5)
+        self.assertIsNotNone(self.bus.publish("PT-1", "high"))
+        self.assertEqual(self.bus.shelved, 1)
+
+    def test_shelving_active_alarm(self):
+        first = self.bus.publish("PT-1", "high")
+        self.bus.shelve("PT-1", "high")
+        self.assertIsNone(self.bus.publish("PT-1", "high"))
+        self.assertEqual((first.count, self.bus.shelved, self.bus.deduplicated), (1, 1, 0))
+        self.bus.unshelve("PT-1")
+        self.assertIs(self.bus.publish("PT-1", "high"), first)
+        self.assertEqual(first.count, 2)
+
+    def test_rate_limit_and_ring_buffer(self):
+        published = [self.bus.publish(f"PT-{i}", "high") for i in range(5)]
+        self.assertEqual(sum(event is not None for event in published), 2)
+        self.assertEqual(self.bus.rate_limited, 3)
+
+        for i in range(5, 10):
+            self.sim.sleep(1)
+            self.bus.publish(f"PT-{i}", "high")
+        self.assertEqual([event.source for event in self.bus.events], ["PT-7", "PT-8", "PT-9"])
+        self.assertEqual(self.bus.overwritten, 4)
+
+    def test_sis_run_publishes_instead_of_raising(self):
+        sensor = Sensor(name="PT-1", value=100)
+        sis = SIS(sensor=sensor, actuator=Actuator(name="XV-1"), name="SIF-1", alarm_bus=self.bus)
+        sis.set_min(10)
+        sis.set_max(90)
+        self.assertIsNone(sis.run(check=True))
+        self.assertIsNone(sis.run(check=True))
+        self.assertEqual(self.bus.events[0].source, "SIF-1")
+        self.assertEqual(self.bus.events[0].count, 2)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+import os
+import struct
+import tempfile
+import unittest
+from otsafe.components.sensors import Sensor
+from otsafe.utils.analysis import CaptureAnalyzer, flow_shard
+from otsafe.utils.pcap import PcapReader, tcp_frame, write_pcap
+
+
+def high_value(timestamp, component, attribute, value):
+    return f"{component.id} high at {value}" if value > 100 else None
+
+
+def exchange(client: str, port: int, transaction: int, register: int, value: int) -> list:
+    request = struct.pack(">HHHBBHH", transaction, 0, 6, 1, 3, register, 1)
+    response = struct.pack(">HHHBBBH", transaction, 0, 5, 1, 3, 2, value)
+    return [
+        tcp_frame(client, "10.0.0.3", port, 502, request),
+        tcp_frame("10.0.0.3", client, 502, port, response),
+    ]
+
+
+class TestCaptureAnalyzer(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.files = []
+        for index in range(2):
+            frames = []
+            for step in range(50):
+                for client in range(4):
+                    value = 150 if (index, step, client) == (1, 20, 3) else step
+                    frames += exchange(f"10.0.1.{client}", 40000 + client, step, client, value)
+            path = os.path.join(self.directory.name, f"capture-{index}.pcap")
+            write_pcap(path, [(index * 1000 + i * 0.01, frame) for i, frame in enumerate(frames)])
+            self.files.append(path)
+        self.sensors = [Sensor(name=f"PT-{i}", ip="10.0.0.3", register=i) for i in range(4)]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_flow_shard_is_symmetric(self):
+        with PcapReader(self.files[0]) as reader:
+            request, response = list(reader)[:2]
+            self.assertEqual(flow_shard(request, 7), flow_shard(response, 7))
+
+    def test_single_worker(self):
+        result = CaptureAnalyzer(self.sensors, [high_value], workers=1).run(self.files)
+        self.assertEqual(result.packets, 800)
+        self.assertEqual(len(result.timeline), 400)
+        self.assertEqual(result.alerts, [(1000 + 167 * 0.01, "PT-3", "PT-3 high at 150")])
+        timestamps = [entry[0] for entry in result.timeline]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    def test_merge_is_deterministic(self):
+        analyzer = CaptureAnalyzer(self.sensors, [high_value])
+        single = analyzer.run(self.files, workers=1)
+        parallel = CaptureAnalyzer(self.sensors, [high_value], workers=2, flow_shards=3).run(self.files)
+        self.assertEqual(parallel.timeline, single.timeline)
+        self.assertEqual(parallel.alerts, single.alerts)
+        self.assertEqual(parallel.stats, single.stats)
+
+    def test_apply(self):
+        result = CaptureAnalyzer(self.sensors, workers=1).run(self.files)
+        result.apply(self.sensors)
+        self.assertEqual([s.value for s in self.sensors], [49, 49, 49, 49])
+
+    def test_scaling(self):
+        report = CaptureAnalyzer(self.sensors).scaling(self.files, max_workers=2)
+        self.assertEqual([r["workers"] for r in report], [1, 2])
+        self.assertEqual(report[0]["speedup"], 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import numpy as np
+from otsafe.components.actuators import Actuator
+from otsafe.components.arrays import SensorArray
+from otsafe.components.safety_systems import SIS
+from otsafe.components.sensors import Sensor
+from otsafe.utils.clock import Simulation
+
+
+class TestSensorArray(unittest.TestCase):
+
+    def setUp(self):
+        sensors = [Sensor(name=f"TT-{i}", value=i * 10, unit=" degC") for i in range(10)]
+        self.array = SensorArray.from_sensors(sensors, noise=0.1)
+
+    def test_initialization(self):
+        self.assertEqual(len(self.array), 10)
+        self.assertEqual(self.array.units, [" degC"])
+        np.testing.assert_array_equal(self.array.read(), np.arange(0, 100, 10))
+
+    def test_grows_past_capacity(self):
+        array = SensorArray(capacity=1)
+        for i in range(5):
+            array.add(f"PT-{i}", i)
+        self.assertEqual(array["PT-4"].value, 4)
+        self.assertIsNone(array[array.add("PT-5")].value)
+
+    def test_noisy_read_within_percentage(self):
+        noisy = self.array.noisy_read(rng=np.random.default_rng(1))
+        self.assertTrue(np.all(np.abs(noisy - self.array.values) <= self.array.values * 0.1))
+
+    def test_bulk_update_and_thresholds(self):
+        self.array.update([500, 600], indices=[1, 2], timestamp=0)
+        np.testing.assert_array_equal(self.array.above(500), [1, 2])
+        np.testing.assert_array_equal(self.array.below(0), [0])
+        np.testing.assert_array_equal(self.array.outside(0, 600), [0, 2])
+        self.assertEqual(self.array.timestamps[1], 0)
+
+    def test_view_behaves_like_sensor(self):
+        view = self.array["TT-3"]
+        self.assertIsInstance(view, Sensor)
+        self.assertEqual(view.read(), Sensor(name="TT-3", value=30, unit=" degC").read())
+        view.value = 35
+        self.assertEqual(self.array.values[3], 35)
+        self.assertEqual(self.array.read_strings()[3], "35 degC")
+        view.value = 35.5
+        self.assertEqual((view.read(), self.array.read_strings()[3]), ("35.5 degC", "35.5 degC"))
+        view.value = None
+        self.assertEqual(view.read(), "None degC")
+
+    def test_view_refuses_ramp(self):
+        view = self.array["TT-3"]
+        with self.assertRaises(NotImplementedError):
+            view.ramp(50, 10)
+        self.assertEqual(view.value, 30)
+        with Simulation() as sim:
+            self.assertEqual(view.change_value_over_time(40, 6), 40)
+            self.assertEqual(sim.monotonic(), 60)
+        self.assertEqual(self.array.values[3], 40)
+
+    def test_watched_view_trips(self):
+        function = SIS(sensor=self.array["TT-0"], actuator=Actuator(name="XV-1", open=True), name="SIS-1")
+        function.set_min(-10)
+        function.set_max(90)
+        seen = []
+        function.watch(on_trip=lambda sis, message: seen.append(message), intervene=False)
+
+        view = self.array["TT-0"]
+        view.value = 95
+        view.value = 95
+        self.assertEqual(seen, ["Detected high value of 95.0 with set point 90"])
+
+        self.array.update(np.array([96.0, 1.0]), np.array([0, 1]))
+        self.array.update(np.array([96.0]), np.array([0]))
+        self.assertEqual(len(seen), 2)
+
+        function.unwatch()
+        self.assertEqual(self.array._subscribers, {})
+        view.value = 99
+        self.assertEqual(len(seen), 2)
+
+if __name__ == '__main__':
+    unittest.main()
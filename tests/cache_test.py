@@ -0,0 +1,205 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from otsafe.inventory import cache, db, tasks
+from otsafe.inventory.cache import LookupCache, cached
+from otsafe.inventory.db import DatabasePool, get_db_data_by_owner, get_db_data_by_status, invalidate_db_lookups
+
+
+class FakeTimer:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCursor:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.queries.append((query, params))
+        self.params = params
+
+    def fetchall(self):
+        return [] if self.params == ("nobody",) else [self.params]
+
+
+class FakeConnection:
+
+    queries = []
+
+    def __init__(self):
+        self.closed = 0
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+class TestLookupCache(unittest.TestCase):
+
+    def setUp(self):
+        self.timer = FakeTimer()
+        self.cache = LookupCache(maxsize=3, ttl=10, negative_ttl=1, timer=self.timer)
+        self.calls = []
+
+    def load(self, value):
+        def loader():
+            self.calls.append(value)
+            return value
+        return loader
+
+    def test_read_through(self):
+        self.assertEqual(self.cache.get("a", self.load("alice")), "alice")
+        self.assertEqual(self.cache.get("a", self.load("other")), "alice")
+        self.assertEqual(self.calls, ["alice"])
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (1, 1, 0.5))
+
+    def test_ttl(self):
+        self.cache.get("a", self.load("alice"))
+        self.timer.now = 10
+        self.assertEqual(self.cache.get("a", self.load("bob")), "bob")
+        self.assertEqual(self.cache.stats()["expirations"], 1)
+
+    def test_negative_ttl(self):
+        self.assertEqual(self.cache.get("a", self.load([])), [])
+        self.assertEqual(self.cache.get("a", self.load(["late"])), [])
+        self.assertEqual(self.cache.stats()["negative_hits"], 1)
+        self.timer.now = 1
+        self.assertEqual(self.cache.get("a", self.load(["late"])), ["late"])
+
+    def test_lru_eviction(self):
+        for key in "abc":
+            self.cache.get(key, self.load(key))
+        self.cache.get("a", self.load("a"))
+        self.cache.get("d", self.load("d"))
+        self.assertNotIn("b", self.cache)
+        self.assertIn("a", self.cache)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_invalidate(self):
+        self.cache.get(("owner", 1), self.load("alice"))
+        self.cache.get(("owner", 2), self.load("bob"))
+        self.cache.get(("bu", 1), self.load("ops"))
+        self.assertTrue(self.cache.invalidate(("owner", 1)))
+        self.assertFalse(self.cache.invalidate(("owner", 1)))
+        self.assertEqual(self.cache.invalidate_matching(lambda key: key[0] == "owner"), 1)
+        self.assertEqual(len(self.cache), 1)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_errors_not_cached(self):
+        def fail():
+            raise OSError("database unavailable")
+        with self.assertRaises(OSError):
+            self.cache.get("a", fail)
+        self.assertEqual(self.cache.get("a", self.load("alice")), "alice")
+
+    def test_concurrent_misses_load_once(self):
+        release = threading.Event()
+
+        def slow():
+            release.wait(1)
+            self.calls.append("slow")
+            return "alice"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.get("a", slow))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.02)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["alice"] * 4)
+        self.assertEqual(self.calls, ["slow"])
+
+    def test_invalidated_during_load_not_stored(self):
+        def load():
+            self.cache.invalidate("a")
+            return "stale"
+        self.assertEqual(self.cache.get("a", load), "stale")
+        self.assertNotIn("a", self.cache)
+
+    def test_cached_decorator(self):
+        @cached(cache=self.cache)
+        def owner(component_id):
+            self.calls.append(component_id)
+            return f"owner of {component_id}"
+
+        owner("PT-1")
+        owner("PT-1")
+        owner.invalidate("PT-1")
+        owner("PT-1")
+        self.assertEqual(self.calls, ["PT-1", "PT-1"])
+
+
+class TestCachedLookups(unittest.TestCase):
+
+    def setUp(self):
+        FakeConnection.queries = []
+        pool = DatabasePool(minconn=0, maxconn=1, connect=FakeConnection)
+        for patcher in (patch.object(db, "_pool", pool), patch.object(cache, "_cache", LookupCache())):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_pooled_lookups_cached(self):
+        query = "SELECT * FROM components WHERE owner = %s"
+        self.assertEqual(get_db_data_by_owner(None, query, "ops"), [("ops",)])
+        self.assertEqual(get_db_data_by_owner(None, query, "ops"), [("ops",)])
+        self.assertEqual(get_db_data_by_owner(None, query, "nobody"), [])
+        self.assertEqual(get_db_data_by_owner(None, query, "nobody"), [])
+        self.assertEqual(len(FakeConnection.queries), 2)
+
+    def test_explicit_cursor_not_cached(self):
+        cur = FakeConnection().cursor()
+        get_db_data_by_status(cur, "SELECT 1 WHERE %s", "active")
+        get_db_data_by_status(cur, "SELECT 1 WHERE %s", "active")
+        self.assertEqual(len(FakeConnection.queries), 2)
+
+    def test_invalidate_db_lookups(self):
+        get_db_data_by_owner(None, "SELECT %s", "ops")
+        get_db_data_by_owner(None, "SELECT %s", "eng")
+        get_db_data_by_status(None, "SELECT %s", "active")
+        self.assertEqual(invalidate_db_lookups("owner", "ops"), 1)
+        self.assertEqual(invalidate_db_lookups(), 2)
+
+    def test_task_lookups_cached(self):
+        self.assertEqual(tasks.get_owner(), "Owner's Name Here")
+        self.assertEqual(tasks.get_bu(), "Business Unit's Name Here")
+        tasks.get_owner()
+        self.assertEqual(cache.get_inventory_cache().stats()["hits"], 1)
+
+    def test_task_lookups_invalidated_by_field(self):
+        tasks.get_owner()
+        tasks.get_bu()
+        get_db_data_by_owner(None, "SELECT %s", "ops")
+        self.assertEqual(invalidate_db_lookups("owner", "eng"), 1)
+        self.assertNotIn(("owner",), cache.get_inventory_cache())
+        self.assertIn(("bu",), cache.get_inventory_cache())
+        self.assertEqual(invalidate_db_lookups("bu"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import time
+import unittest
+from datetime import datetime
+from otsafe.components.sensors import Sensor
+from otsafe.components.sis import SIS
+from otsafe.utils.clock import Simulation, WallClock, get_clock
+
+
+def scenario(sim: Simulation, seconds: float, interval: float) -> list:
+    """Ramps a sensor while sampling it on a fixed scan, returns every sample."""
+    sensor = Sensor(name="TT-1", value=0)
+    samples = []
+    sensor.ramp(1000, seconds / 2, "exponential")
+    sim.every(interval, lambda: samples.append((sim.monotonic(), sensor.value)))
+    sim.schedule(seconds * 0.75, sensor.change_value_over_time, 990, interval)
+    sim.run_for(seconds)
+    return samples
+
+
+class TestSimulation(unittest.TestCase):
+
+    def test_default_clock(self):
+        self.assertIsInstance(get_clock(), WallClock)
+
+    def test_events_run_in_order(self):
+        sim = Simulation()
+        order = []
+        sim.schedule(2, order.append, "b")
+        sim.schedule(1, order.append, "a")
+        sim.schedule(2, order.append, "c")
+        cancelled = sim.schedule(1.5, order.append, "x")
+        cancelled.cancel()
+        sim.run()
+        self.assertEqual(order, ["a", "b", "c"])
+        self.assertEqual(sim.monotonic(), 2)
+
+    def test_components_use_simulated_time(self):
+        start = datetime(2024, 1, 1)
+        with Simulation(start=start) as sim:
+            sim.sleep(60)
+            sensor = Sensor(name="TestSensor")
+            sis = SIS(name="TestSIS", value=0)
+            sis.change_value_over_time(10, 60)
+        self.assertEqual(sensor.created_at, datetime(2024, 1, 1, 0, 1))
+        self.assertEqual(sis.last_updated, datetime(2024, 1, 1, 0, 11))
+        self.assertIsInstance(get_clock(), WallClock)
+
+    def test_await_ramp_in_simulated_time(self):
+        async def run(sensors):
+            return await asyncio.gather(*(sensor.ramp(100, 3600 * (i + 1)) for i, sensor in enumerate(sensors)))
+
+        began = time.perf_counter()
+        with Simulation() as sim:
+            sensors = [Sensor(name=f"TT-{i}", value=0) for i in range(3)]
+            results = asyncio.run(asyncio.wait_for(run(sensors), 5))
+            self.assertEqual(sim.monotonic(), 3 * 3600)
+        self.assertEqual(results, [100, 100, 100])
+        self.assertEqual([sensor.value for sensor in sensors], [100, 100, 100])
+        self.assertLess(time.perf_counter() - began, 5)
+
+    def test_async_sleeps_overlap(self):
+        async def nap(sim, seconds):
+            await sim.sleep_async(seconds)
+            return sim.monotonic()
+
+        async def run(sim):
+            return await asyncio.gather(nap(sim, 100), nap(sim, 1))
+
+        with Simulation() as sim:
+            self.assertEqual(asyncio.run(asyncio.wait_for(run(sim), 5)), [100, 1])
+            self.assertEqual(sim.monotonic(), 100)
+
+    def test_overlapping_async_ramps(self):
+        async def finish(sim, ramp):
+            await ramp
+            return sim.monotonic()
+
+        async def run(sim, slow, fast, durations):
+            return await asyncio.gather(finish(sim, slow.ramp(100, durations[0])), finish(sim, fast.ramp(50, durations[1])))
+
+        for realtime, durations in ((False, (3600, 10)), (True, (0.2, 0.05))):
+            with self.subTest(realtime=realtime), Simulation(realtime=realtime) as sim:
+                scans = []
+                sim.every(durations[1] / 2, lambda: scans.append(sim.monotonic()))
+                slow, fast = Sensor(name="TT-1", value=0), Sensor(name="TT-2", value=0)
+                began = time.perf_counter()
+                self.assertEqual(asyncio.run(asyncio.wait_for(run(sim, slow, fast, durations), 5)), list(durations))
+                self.assertEqual((slow.value, fast.value), (100, 50))
+                self.assertEqual(scans[:3], [0, durations[1] / 2, durations[1]])
+                if realtime:
+                    self.assertGreaterEqual(time.perf_counter() - began, 0.2)
+
+    def test_simulated_day_is_fast(self):
+        began = time.perf_counter()
+        with Simulation() as sim:
+            samples = scenario(sim, 86_400, 1)
+        self.assertLess(time.perf_counter() - began, 10)
+        self.assertEqual(len(samples), 86_401)
+        self.assertEqual(samples[-1], (86_400, 990))
+
+    def test_realtime_matches_virtual(self):
+        with Simulation() as sim:
+            virtual = scenario(sim, 0.2, 0.01)
+        with Simulation(realtime=True) as sim:
+            began = time.perf_counter()
+            realtime = scenario(sim, 0.2, 0.01)
+        self.assertGreaterEqual(time.perf_counter() - began, 0.2)
+        self.assertEqual(virtual, realtime)
+
+if __name__ == '__main__':
+    unittest.main()
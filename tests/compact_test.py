@@ -0,0 +1,74 @@
+import gc
+import unittest
+from datetime import datetime
+from otsafe.components import compact
+from otsafe.components.compact import CompactActuator, CompactBurner, CompactSensor, CompactValve
+from otsafe.components.burners import Burner
+from otsafe.components.generic import Component
+from otsafe.components.sensors import Sensor
+from otsafe.detections.rules import RuleEngine, parse_rules
+from otsafe.inventory.components import COMPONENT_COLUMNS, build_component, component_row
+
+
+class TestCompactComponents(unittest.TestCase):
+
+    def setUp(self):
+        self.sensor = CompactSensor(name="TestSensor", value=100, unit="psi")
+
+    def test_initialization(self):
+        self.assertEqual(self.sensor.id, "TestSensor")
+        self.assertIsNone(self.sensor.ip)
+        self.assertEqual(self.sensor.read(), "100psi")
+        self.assertIsInstance(self.sensor.created_at, datetime)
+        self.assertEqual(self.sensor.fields()["unit"], "psi")
+        self.assertEqual(vars(self.sensor), {})
+
+    def test_kwargs_override_core_fields(self):
+        valve = CompactValve(name="TestValve", ip="10.0.0.1", port=502)
+        self.assertEqual(valve.ip, "10.0.0.1")
+        self.assertEqual(valve.extras(), {})
+
+    def test_extra_kwargs_use_side_table(self):
+        sensor = CompactSensor(name="PT-1", register=40)
+        self.assertEqual(sensor.register, 40)
+        sensor.set_extra("count", 2)
+        self.assertEqual(sensor.extras(), {"register": 40, "count": 2})
+        with self.assertRaises(AttributeError):
+            sensor.missing
+
+    def test_side_table_released_with_component(self):
+        sensor = CompactSensor(name="PT-2", register=41)
+        key = id(sensor)
+        del sensor
+        gc.collect()
+        self.assertNotIn(key, compact._extras)
+
+    def test_timestamp_properties(self):
+        actuator = CompactActuator(name="TestActuator")
+        moment = datetime(2024, 1, 1, 12, 0)
+        actuator.last_modified = moment
+        self.assertEqual(actuator.last_modified, moment)
+
+    def test_drop_in_for_regular_classes(self):
+        self.assertIsInstance(self.sensor, Sensor)
+        self.assertIsInstance(CompactValve(name="XV-1"), Component)
+        self.assertEqual(self.sensor.noisy_samples(0, 2).tolist(), [100, 100])
+
+    def test_rules_match_by_type(self):
+        rules = parse_rules("rules:\n  - id: cold-burner\n    match: {type: Burner}\n    when:\n      temperature: {lt: 100}\n")
+        results = RuleEngine(rules).evaluate(CompactBurner(name="B-1", temperature=20))
+        self.assertEqual([r.rule.id for r in results], ["cold-burner"])
+
+    def test_saved_as_regular_class(self):
+        sensor = CompactSensor(name="PT-1", value=42, unit="psi", ip="10.0.0.3", register=5)
+        loaded = build_component(dict(zip(COMPONENT_COLUMNS, component_row(sensor))))
+        self.assertIs(type(loaded), Sensor)
+        self.assertEqual((loaded.id, loaded.value, loaded.unit, loaded.ip, loaded.register), ("PT-1", 42, "psi", "10.0.0.3", 5))
+        self.assertEqual(loaded.last_updated, sensor.last_updated)
+        self.assertEqual(vars(sensor), {})
+        burner = build_component(dict(zip(COMPONENT_COLUMNS, component_row(CompactBurner(name="B-1", temperature=650)))))
+        self.assertIs(type(burner), Burner)
+        self.assertEqual((burner.name, burner.temperature), ("B-1", 650))
+
+if __name__ == '__main__':
+    unittest.main()
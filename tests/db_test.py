@@ -0,0 +1,307 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from otsafe.components.generic import Component
+from otsafe.components.sensors import Sensor
+from otsafe.components.valves import Valve
+from otsafe.inventory import db
+from otsafe.inventory.components import build_component
+from otsafe.inventory.db import DatabasePool, get_db_data, get_db_data_by_owner, iter_components, iter_db_data
+
+
+class FakeCursor:
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.queries = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        if self.conn.broken:
+            raise OSError("server closed the connection unexpectedly")
+        self.conn.queries.append((query, params))
+        self.conn.in_transaction = True
+
+    def fetchall(self):
+        return [self.conn.queries[-1][1]]
+
+
+class FakeNamedCursor:
+
+    def __init__(self, conn, name):
+        self.conn = conn
+        self.name = name
+        self.itersize = 2000
+        self.description = None
+        self.fetches = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.conn.named.remove(self)
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.queries.append((query, params))
+
+    def __iter__(self):
+        columns, rows = self.conn.result
+        for start in range(0, len(rows), self.itersize):
+            self.fetches += 1
+            self.description = [(column,) for column in columns]
+            yield from rows[start:start + self.itersize]
+
+
+class FakeConnection:
+
+    result = ((), [])
+
+    def __init__(self):
+        self.named = []
+        self.closed = 0
+        self.broken = False
+        self.in_transaction = False
+        self.queries = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, name=None, **kwargs):
+        if name is None:
+            return FakeCursor(self)
+        self.named.append(FakeNamedCursor(self, name))
+        return self.named[-1]
+
+    def commit(self):
+        self.commits += 1
+        self.in_transaction = False
+
+    def rollback(self):
+        if self.broken:
+            raise OSError("connection already closed")
+        if self.in_transaction:
+            self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = 1
+
+
+class TestDatabasePool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = DatabasePool(minconn=1, maxconn=2, acquire_timeout=0.01, connect=FakeConnection)
+
+    def test_minconn_opened_up_front(self):
+        self.assertEqual(self.pool.stats()["open"], 1)
+        self.assertEqual(self.pool.stats()["idle"], 1)
+        self.assertEqual(self.pool.created, 1)
+
+    def test_reuses_connection(self):
+        first = self.pool.acquire()
+        self.pool.release(first)
+        second = self.pool.acquire()
+        self.assertIs(first, second)
+        self.assertEqual(self.pool.created, 1)
+
+    def test_maxconn(self):
+        self.pool.acquire()
+        self.pool.acquire()
+        with self.assertRaises(ConnectionError):
+            self.pool.acquire()
+        self.assertEqual(self.pool.stats()["timeouts"], 1)
+        self.assertEqual(self.pool.stats()["in_use"], 2)
+
+    def test_waits_for_release(self):
+        self.pool.acquire_timeout = 1
+        first = self.pool.acquire()
+        second = self.pool.acquire()
+        timer = threading.Timer(0.05, self.pool.release, (first,))
+        timer.start()
+        self.assertIs(self.pool.acquire(), first)
+        timer.join()
+        self.assertGreaterEqual(self.pool.wait.max, 0.04)
+        self.pool.release(second)
+
+    def test_release_rolls_back(self):
+        with self.pool.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn = self.pool.acquire()
+        self.assertEqual(conn.commits, 1)
+        conn.cursor().execute("UPDATE x SET y = 1")
+        self.pool.release(conn)
+        self.assertEqual(conn.rollbacks, 1)
+        self.assertFalse(conn.in_transaction)
+
+    def test_connection_rolls_back_on_error(self):
+        with self.assertRaises(ValueError):
+            with self.pool.connection() as conn:
+                conn.cursor().execute("UPDATE x SET y = 1")
+                raise ValueError("boom")
+        self.assertEqual(conn.commits, 0)
+        self.assertEqual(conn.rollbacks, 1)
+        self.assertEqual(self.pool.stats()["idle"], 1)
+
+    def test_broken_connection_discarded(self):
+        conn = self.pool.acquire()
+        conn.broken = True
+        self.pool.release(conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(self.pool.stats()["open"], 0)
+        self.assertEqual(self.pool.discarded, 1)
+
+    def test_health_check_replaces_dead_connection(self):
+        self.pool.check_interval = 0
+        conn = self.pool.acquire()
+        self.pool.release(conn)
+        conn.broken = True
+        fresh = self.pool.acquire()
+        self.assertIsNot(fresh, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(self.pool.failed_checks, 1)
+        self.assertEqual(self.pool.stats()["open"], 1)
+
+    def test_health_check_skipped_when_recent(self):
+        conn = self.pool.acquire()
+        self.pool.release(conn)
+        self.pool.acquire()
+        self.assertEqual(conn.queries, [])
+
+    def test_failed_connect_frees_slot(self):
+        pool = DatabasePool(minconn=0, maxconn=1, acquire_timeout=0.01, connect=self._refuse)
+        with self.assertRaises(ConnectionError):
+            pool.acquire()
+        self.assertEqual(pool.stats()["open"], 0)
+
+    def test_idle_timeout_keeps_minimum(self):
+        self.pool.idle_timeout = 0
+        first = self.pool.acquire()
+        second = self.pool.acquire()
+        self.pool.release(first)
+        self.pool.release(second)
+        time.sleep(0.001)
+        self.pool.close_idle()
+        self.assertEqual(self.pool.stats()["open"], 1)
+
+    def test_close_all(self):
+        conn = self.pool.acquire()
+        self.pool.release(conn)
+        self.pool.close_all()
+        self.assertTrue(conn.closed)
+        self.assertEqual(self.pool.stats()["open"], 0)
+
+    def test_close_all_closes_checked_out_on_release(self):
+        conn = self.pool.acquire()
+        self.pool.close_all()
+        self.assertFalse(conn.closed)
+        self.pool.release(conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(self.pool.stats()["open"], 0)
+        with self.assertRaises(ConnectionError):
+            self.pool.acquire()
+
+    def test_closed_pool_replaced(self):
+        with patch.object(db, "_pool", self.pool), patch.object(db, "DatabasePool", lambda: "new pool"):
+            self.assertIs(db.get_db_pool(), self.pool)
+            self.pool.close_all()
+            self.assertEqual(db.get_db_pool(), "new pool")
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            DatabasePool(minconn=3, maxconn=2, connect=FakeConnection)
+
+    @staticmethod
+    def _refuse():
+        raise ConnectionError("Unable to connect to database")
+
+
+class TestPooledQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = DatabasePool(minconn=1, maxconn=1, connect=FakeConnection)
+        patcher = patch.object(db, "_pool", self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pooled_query(self):
+        rows = get_db_data_by_owner(None, "SELECT * FROM components WHERE owner = %s", "ops")
+        self.assertEqual(rows, [("ops",)])
+        self.assertEqual(self.pool.stats()["idle"], 1)
+
+    def test_explicit_cursor(self):
+        conn = FakeConnection()
+        rows = get_db_data(conn.cursor(), "SELECT 1")
+        self.assertEqual(rows, [None])
+        self.assertEqual(self.pool.stats()["idle"], 1)
+        self.assertEqual(conn.queries, [("SELECT 1", None)])
+
+
+class TestStreamingQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = DatabasePool(minconn=1, maxconn=1, connect=FakeConnection)
+        self.conn = self.pool.acquire()
+        self.pool.release(self.conn)
+        self.conn.result = (
+            ("id", "type", "ip", "unit", "value", "state"),
+            [(f"PT-{i}", "Sensor", "10.0.0.3", "psi", i, None) for i in range(5)] + [("XV-1", "Valve", None, None, None, True)],
+        )
+        patcher = patch.object(db, "_pool", self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rows_fetched_in_batches(self):
+        rows = iter_db_data("SELECT * FROM components WHERE type = %s", ("Sensor",), fetch_size=2)
+        self.assertEqual(next(rows)[0], "PT-0")
+        cursor = self.conn.named[0]
+        self.assertTrue(cursor.name.startswith("otsafe_"))
+        self.assertEqual(cursor.itersize, 2)
+        self.assertEqual(cursor.fetches, 1)
+        self.assertEqual(self.pool.stats()["in_use"], 1)
+        self.assertEqual(len(list(rows)), 5)
+        self.assertEqual(cursor.fetches, 3)
+        self.assertEqual(self.pool.stats()["in_use"], 0)
+
+    def test_closing_releases_connection(self):
+        rows = iter_db_data("SELECT * FROM components")
+        next(rows)
+        rows.close()
+        self.assertEqual(self.conn.named, [])
+        self.assertEqual(self.pool.stats()["idle"], 1)
+
+    def test_components(self):
+        components = list(iter_components("SELECT * FROM components", fetch_size=4))
+        self.assertEqual([type(component) for component in components], [Sensor] * 5 + [Valve])
+        self.assertEqual(components[3].id, "PT-3")
+        self.assertEqual(components[3].value, 3)
+        self.assertEqual(components[3].unit, "psi")
+        self.assertEqual(components[3].ip, "10.0.0.3")
+        self.assertTrue(components[5].state)
+        self.assertIsNone(components[5].ip)
+
+
+class TestBuildComponent(unittest.TestCase):
+
+    def test_default_type(self):
+        component = build_component({"id": "host-1", "ip": "10.0.0.9", "port": 502})
+        self.assertIs(type(component), Component)
+        self.assertEqual((component.ip, component.port), ("10.0.0.9", 502))
+
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            build_component({"id": "x", "type": "Reactor"})
+
+    def test_missing_id(self):
+        with self.assertRaises(ValueError):
+            build_component({"type": "Sensor"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import struct
+import unittest
+from otsafe.components.actuators import Actuator
+from otsafe.components.sensors import Sensor
+from otsafe.components.valves import Valve
+from otsafe.utils.decoder import ModbusDecoder
+from otsafe.utils.pcap import PcapReader
+
+DEMO_PCAP = os.path.join(os.path.dirname(__file__), "..", "otsafe", "demo", "modbus_test_data_part1.pcap")
+CLIENT = ("10.0.0.9", 3082)
+SERVER = ("10.0.0.3", 502)
+
+
+def adu(transaction: int, function: int, data: bytes, unit_id: int = 1) -> bytes:
+    return struct.pack(">HHHBB", transaction, 0, len(data) + 2, unit_id, function) + data
+
+
+class TestModbusDecoder(unittest.TestCase):
+
+    def setUp(self):
+        self.decoder = ModbusDecoder()
+        self.sensors = [Sensor(name=f"PT-{i}", ip="10.0.0.3", register=10 + i) for i in range(3)]
+        for sensor in self.sensors:
+            self.decoder.bind(sensor)
+
+    def request(self, payload: bytes) -> int:
+        return self.decoder.decode(*CLIENT, *SERVER, payload)
+
+    def response(self, payload: bytes, timestamp: float = None) -> int:
+        return self.decoder.decode(*SERVER, *CLIENT, payload, timestamp)
+
+    def test_read_holding_registers(self):
+        self.request(adu(1, 3, struct.pack(">HH", 10, 3)))
+        self.assertEqual(self.response(adu(1, 3, bytes([6]) + struct.pack(">HHH", 7, 8, 9)), 1093521600.0), 3)
+        self.assertEqual([s.value for s in self.sensors], [7, 8, 9])
+        self.assertEqual(self.sensors[0].last_updated.timestamp(), 1093521600.0)
+
+    def test_pairs_by_transaction(self):
+        self.request(adu(1, 3, struct.pack(">HH", 10, 1)))
+        self.request(adu(2, 4, struct.pack(">HH", 11, 1)))
+        self.response(adu(2, 4, bytes([2]) + struct.pack(">H", 22)))
+        self.response(adu(1, 3, bytes([2]) + struct.pack(">H", 11)))
+        self.assertEqual([s.value for s in self.sensors[:2]], [11, 22])
+
+    def test_unmatched_and_exception_responses(self):
+        self.response(adu(5, 3, bytes([2]) + struct.pack(">H", 1)))
+        self.request(adu(6, 3, struct.pack(">HH", 10, 1)))
+        self.response(adu(6, 0x83, bytes([2])))
+        self.assertIsNone(self.sensors[0].value)
+        self.assertEqual(self.decoder.stats()["unmatched"], 1)
+        self.assertEqual(self.decoder.stats()["exceptions"], 1)
+
+    def test_truncated_responses(self):
+        self.request(adu(1, 3, struct.pack(">HH", 10, 1)))
+        self.request(adu(2, 6, struct.pack(">HH", 12, 40)))
+        self.request(adu(3, 1, struct.pack(">HH", 0, 1)))
+        # A short response followed by another ADU in the same segment must not read into the next one
+        self.assertEqual(self.response(struct.pack(">HHHBB", 1, 0, 2, 1, 3) + adu(2, 6, struct.pack(">H", 12))), 0)
+        self.assertEqual(self.response(adu(3, 1, b"")), 0)
+        self.assertIsNone(self.sensors[0].value)
+        self.assertIsNone(self.sensors[2].value)
+        self.assertEqual(self.decoder.stats()["malformed"], 3)
+        self.assertEqual(self.decoder.stats()["pending"], 0)
+
+    def test_register_writes(self):
+        self.request(adu(1, 6, struct.pack(">HH", 12, 40)))
+        self.response(adu(1, 6, struct.pack(">HH", 12, 40)))
+        self.request(adu(2, 16, struct.pack(">HHB", 10, 2, 4) + struct.pack(">HH", 1, 2)))
+        self.response(adu(2, 16, struct.pack(">HH", 10, 2)))
+        self.assertEqual([s.value for s in self.sensors], [1, 2, 40])
+
+    def test_coils(self):
+        valve = Valve(name="XV-1", ip="10.0.0.3")
+        actuator = Actuator(name="XY-1", ip="10.0.0.3")
+        self.decoder.bind(valve, coil=0)
+        self.decoder.bind(actuator, coil=9)
+
+        self.request(adu(1, 1, struct.pack(">HH", 0, 10)))
+        self.response(adu(1, 1, bytes([2, 0b00000001, 0b00000010])))
+        self.assertTrue(valve.state)
+        self.assertTrue(actuator.open)
+
+        self.request(adu(2, 5, struct.pack(">HH", 9, 0)))
+        self.response(adu(2, 5, struct.pack(">HH", 9, 0)))
+        self.assertFalse(actuator.open)
+
+        self.request(adu(3, 15, struct.pack(">HHB", 0, 10, 2) + bytes([0, 2])))
+        self.response(adu(3, 15, struct.pack(">HH", 0, 10)))
+        self.assertFalse(valve.state)
+        self.assertTrue(actuator.open)
+
+    def test_multiple_adus_per_segment(self):
+        self.request(adu(1, 3, struct.pack(">HH", 10, 1)) + adu(2, 3, struct.pack(">HH", 11, 1)))
+        updated = self.response(adu(1, 3, bytes([2, 0, 1])) + adu(2, 3, bytes([2, 0, 2])))
+        self.assertEqual(updated, 2)
+        self.assertEqual(self.decoder.stats()["adus"], 4)
+
+    def test_scale_and_unbind(self):
+        valve = Valve(name="FV-1", ip="10.0.0.3", register=20)
+        self.decoder.bind(valve, scale=0.01)
+        self.decoder.unbind(self.sensors[0])
+        self.request(adu(1, 3, struct.pack(">HH", 10, 11)))
+        self.response(adu(1, 3, bytes([22]) + struct.pack(">11H", *range(11))))
+        self.assertIsNone(self.sensors[0].value)
+        self.assertEqual(valve.open_percentage, 0.1)
+
+    def test_demo_capture(self):
+        sensor = Sensor(name="PT-5", ip="10.0.0.3", register=5, unit_id=10)
+        self.decoder.bind(sensor)
+        with PcapReader(DEMO_PCAP) as reader:
+            self.decoder.run(reader)
+        # Read as 9, then written to 11
+        self.assertEqual(sensor.value, 11)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from otsafe.utils.index import INDEX_SUFFIX, CaptureIndex, flow_key
+from otsafe.utils.listener import seek_pcap
+from otsafe.utils.pcap import PcapReader, tcp_frame, write_pcap
+
+
+class TestCaptureIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "capture.pcap")
+        frames = []
+        for i in range(3000):
+            plc = f"10.1.2.{i % 3}"
+            # Every 50th packet arrives half a second late
+            timestamp = 1000 + i * 0.01 - (0.5 if i % 50 == 49 else 0)
+            if i % 2:
+                frames.append((timestamp, tcp_frame(plc, "10.0.0.57", 502, 40000 + i % 3)))
+            else:
+                frames.append((timestamp, tcp_frame("10.0.0.57", plc, 40000 + i % 3, 502)))
+        frames.append((1100, tcp_frame("10.0.0.57", "10.0.0.9", 40000, 443)))
+        write_pcap(self.path, frames)
+
+        with PcapReader(self.path) as reader:
+            self.all = [(p.offset, p.timestamp, p.src, p.dst) for p in reader]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def expected(self, start=None, end=None, host=None) -> list:
+        return [
+            p for p in self.all
+            if (start is None or p[1] >= start) and (end is None or p[1] <= end)
+            and (host is None or host in (p[2], p[3]))
+        ]
+
+    def seek(self, **kwargs) -> list:
+        return [(p.offset, p.timestamp, p.src, p.dst) for p in seek_pcap(self.path, **kwargs)]
+
+    def test_build(self):
+        index = CaptureIndex.build(self.path, interval=100)
+        self.assertEqual(len(index), 3000)
+        self.assertEqual(len(index.flows), 3)
+        self.assertEqual(len(index.checkpoint_offsets), 30)
+        self.assertTrue(all(a <= b for a, b in zip(index.checkpoint_floors, index.checkpoint_floors[1:])))
+
+    def test_time_window(self):
+        self.assertEqual(self.seek(start=1010, end=1012.5), self.expected(1010, 1012.5))
+        self.assertEqual(self.seek(start=1029.5), self.expected(1029.5))
+        self.assertEqual(self.seek(end=1000.2), self.expected(end=1000.2))
+
+    def test_seek_skips_earlier_checkpoints(self):
+        index = CaptureIndex.build(self.path, interval=100)
+        self.assertGreater(index.seek(1015), self.all[1000][0])
+        self.assertLessEqual(index.seek(1015), self.expected(1015)[0][0])
+
+    def test_host(self):
+        self.assertEqual(self.seek(host="10.1.2.1"), self.expected(host="10.1.2.1"))
+        start, end = datetime.fromtimestamp(1005), datetime.fromtimestamp(1006)
+        self.assertEqual(self.seek(start=start, end=end, host="10.1.2.2"), self.expected(1005, 1006, "10.1.2.2"))
+
+    def test_sidecar_is_reused_and_rebuilt(self):
+        list(seek_pcap(self.path, start=1001, end=1002))
+        sidecar = self.path + INDEX_SUFFIX
+        self.assertTrue(os.path.exists(sidecar))
+        built = os.stat(sidecar).st_mtime_ns
+        CaptureIndex.open(self.path)
+        self.assertEqual(os.stat(sidecar).st_mtime_ns, built)
+
+        write_pcap(self.path, [(5.0, tcp_frame("10.1.2.0", "10.0.0.57", 502, 40000))])
+        self.assertEqual(len(CaptureIndex.open(self.path)), 1)
+
+    def test_flow_key_is_symmetric(self):
+        with PcapReader(self.path) as reader:
+            packets = list(reader)
+            self.assertEqual(flow_key(packets[0]), flow_key(packets[3]))
+            self.assertEqual(flow_key(packets[0]), "10.0.0.57:40000-10.1.2.0:502")
+
+if __name__ == '__main__':
+    unittest.main()
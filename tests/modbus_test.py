@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from pymodbus.exceptions import ConnectionException
+from otsafe.components.generic import Component
+from otsafe.exceptions.exceptions import ConnectionError
+from otsafe.utils.modbus import ModbusConnectionPool
+
+
+class FakeClient:
+
+    def __init__(self, host, port=502):
+        self.host = host
+        self.port = port
+        self.connected = False
+        self.connects = 0
+
+    def connect(self):
+        self.connects += 1
+        self.connected = True
+        return True
+
+    def close(self):
+        self.connected = False
+
+    def read_holding_registers(self, address, count=1):
+        return [address] * count
+
+
+class TestModbusConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = ModbusConnectionPool(max_connections=1, acquire_timeout=0.01, client_class=FakeClient)
+
+    def test_reuses_connection(self):
+        first = self.pool.acquire("10.0.0.1", 502)
+        self.pool.release("10.0.0.1", 502, first)
+        second = self.pool.acquire("10.0.0.1", 502)
+        self.assertIs(first, second)
+        self.assertEqual(second.connects, 1)
+
+    def test_max_connections(self):
+        self.pool.acquire("10.0.0.1", 502)
+        with self.assertRaises(ConnectionError):
+            self.pool.acquire("10.0.0.1", 502)
+
+    def test_idle_timeout(self):
+        self.pool.idle_timeout = 0
+        first = self.pool.acquire("10.0.0.1", 502)
+        self.pool.release("10.0.0.1", 502, first)
+        second = self.pool.acquire("10.0.0.1", 502)
+        self.assertIsNot(first, second)
+        self.assertFalse(first.connected)
+
+    def test_reconnects_after_drop(self):
+        client = self.pool.acquire("10.0.0.1", 502)
+        client.read_holding_registers = MagicMock(side_effect=ConnectionException("dropped"))
+        self.pool.release("10.0.0.1", 502, client)
+        result = self.pool.execute("10.0.0.1", 502, "read_holding_registers", 7, count=2)
+        self.assertEqual(result, [7, 7])
+        self.assertEqual(self.pool.stats(), {("10.0.0.1", 502): {"open": 1, "idle": 1}})
+
+    def test_component_uses_shared_pool(self):
+        component = Component(id="PLC", ip="10.0.0.2", port=502)
+        with patch('otsafe.components.generic.get_pool', return_value=self.pool):
+            self.assertEqual(component.read_modbus(3, 2), [3, 3])
+            self.assertEqual(component.read_modbus(4, 1), [4])
+        self.assertEqual(self.pool.stats(), {("10.0.0.2", 502): {"open": 1, "idle": 1}})
+
+if __name__ == '__main__':
+    unittest.main()
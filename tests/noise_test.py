@@ -0,0 +1,33 @@
+import unittest
+import numpy as np
+from otsafe.components.noise import NoiseGenerator
+from otsafe.components.sensors import Sensor
+
+
+class TestNoiseGenerator(unittest.TestCase):
+
+    def test_uniform_within_percentage(self):
+        samples = NoiseGenerator(0.1, seed=1).samples(100, 10_000)
+        self.assertEqual(samples.shape, (10_000,))
+        self.assertTrue(np.all((samples >= 90) & (samples <= 110)))
+
+    def test_seed_is_reproducible_across_chunks(self):
+        whole = NoiseGenerator(0.1, "gaussian", seed=7).samples(100, 1000)
+        chunks = np.concatenate(list(NoiseGenerator(0.1, "gaussian", seed=7).stream(100, chunk_size=300, total=1000)))
+        np.testing.assert_array_equal(whole, chunks)
+
+    def test_drift(self):
+        samples = NoiseGenerator(0, "drift", seed=1, drift=0.01).samples(100, 3)
+        np.testing.assert_allclose(samples, [101, 102, 103])
+
+    def test_unknown_distribution(self):
+        with self.assertRaises(ValueError):
+            NoiseGenerator(0.1, "poisson")
+
+    def test_sensor_helpers(self):
+        sensor = Sensor(name="TestSensor", value=50)
+        np.testing.assert_array_equal(sensor.noisy_samples(0.1, 5, seed=3), NoiseGenerator(0.1, seed=3).samples(50, 5))
+        self.assertEqual([len(c) for c in sensor.noisy_stream(0.1, chunk_size=4, total=10)], [4, 4, 2])
+
+if __name__ == '__main__':
+    unittest.main()
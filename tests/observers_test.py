@@ -0,0 +1,68 @@
+import unittest
+from otsafe.components.actuators import Actuator
+from otsafe.components.compact import CompactSensor
+from otsafe.components.safety_systems import SIS
+from otsafe.components.sensors import Sensor
+from otsafe.components import sis
+
+
+class TestObservers(unittest.TestCase):
+
+    def setUp(self):
+        self.sensor = Sensor(name="TestSensor", value=0)
+        self.seen = []
+
+    def record(self, component, value):
+        self.seen.append((component.id, value))
+
+    def test_subscribe_and_unsubscribe(self):
+        self.sensor.subscribe(self.record)
+        self.sensor.value = 5
+        self.sensor.unsubscribe(self.record)
+        self.sensor.value = 6
+        self.assertEqual(self.seen, [("TestSensor", 5)])
+        self.assertIsNone(self.sensor._subscribers)
+
+    def test_unchanged_value_not_published(self):
+        self.sensor.subscribe(self.record)
+        for value in (5, 5, 5, 6, 6):
+            self.sensor.value = value
+        self.assertEqual(self.seen, [("TestSensor", 5), ("TestSensor", 6)])
+
+    def test_ramped_value_not_republished(self):
+        self.sensor.subscribe(self.record)
+        self.sensor.ramp(10, 0)
+        self.sensor.value = 10
+        self.sensor.value = 0
+        self.assertEqual(self.seen, [("TestSensor", 0)])
+
+    def test_compact_sensor(self):
+        sensor = CompactSensor(name="PT-1", value=0)
+        sensor.subscribe(self.record)
+        sensor.value = 3
+        self.assertEqual(self.seen, [("PT-1", 3)])
+
+    def test_change_driven_sis(self):
+        actuator = Actuator(name="XV-1", open=True)
+        function = SIS(sensor=self.sensor, actuator=actuator)
+        function.set_min(-10)
+        function.set_max(10)
+        function.watch(on_trip=lambda sis, message: self.seen.append(message))
+
+        self.sensor.value = 5
+        self.sensor.value = 11
+        self.assertEqual(self.seen, ["Detected high value of 11 with set point 10"])
+        self.assertFalse(actuator.open)
+
+        function.unwatch()
+        self.sensor.value = 12
+        self.assertEqual(len(self.seen), 1)
+
+    def test_change_driven_sis_value(self):
+        function = sis.SIS(name="TestSIS", value=50, min_alarm_value=10, max_alarm_value=90)
+        function.watch(on_trip=lambda sis, message: self.seen.append(message))
+        function.value = 5
+        self.assertEqual(self.seen, ["Min alarm SIS triggered!"])
+
+if __name__ == '__main__':
+    unittest.main()
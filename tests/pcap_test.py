@@ -0,0 +1,85 @@
+import os
+import struct
+import tempfile
+import unittest
+from otsafe.utils.listener import stream_pcap
+from otsafe.utils.pcap import PcapReader, tcp_frame, write_pcap
+
+DEMO_PCAP = os.path.join(os.path.dirname(__file__), "..", "otsafe", "demo", "modbus_test_data_part1.pcap")
+
+
+def pcapng(frames: list) -> bytes:
+    """Builds a little-endian pcapng capture with one Ethernet interface."""
+    shb = struct.pack("<IIIHHqI", 0x0A0D0D0A, 28, 0x1A2B3C4D, 1, 0, -1, 28)
+    idb = struct.pack("<IIHHII", 1, 20, 1, 0, 65535, 20)
+    blocks = [shb, idb]
+    for timestamp, frame in frames:
+        padded = frame + b"\x00" * (-len(frame) % 4)
+        ticks = round(timestamp * 1e6)
+        length = 32 + len(padded)
+        blocks.append(struct.pack("<IIIIIII", 6, length, 0, ticks >> 32, ticks & 0xFFFFFFFF, len(frame), len(frame)) + padded + struct.pack("<I", length))
+    return b"".join(blocks)
+
+
+class TestPcapReader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.frames = [
+            (1.5, tcp_frame("10.0.0.1", "10.0.0.2", 40000, 502, b"\x00\x01")),
+            (2.0, tcp_frame("10.0.0.1", "10.0.0.2", 40000, 80, b"GET")),
+            (2.5, tcp_frame("10.0.0.2", "10.0.0.1", 502, 40000, b"\x00\x02")),
+        ]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_demo_capture(self):
+        with stream_pcap(DEMO_PCAP) as reader:
+            packets = list(reader)
+            self.assertEqual(len(packets), 118)
+            self.assertEqual(packets[0].flow, ("10.0.0.57", 2387, "10.0.0.3", 502))
+
+    def test_filters_on_port(self):
+        write_pcap(self.path("test.pcap"), self.frames)
+        with PcapReader(self.path("test.pcap")) as reader:
+            packets = list(reader)
+            self.assertEqual([p.timestamp for p in packets], [1.5, 2.5])
+            self.assertEqual(bytes(packets[1].payload), b"\x00\x02")
+            self.assertIsInstance(packets[1].payload, memoryview)
+        with PcapReader(self.path("test.pcap"), port=None) as reader:
+            self.assertEqual(len(list(reader)), 3)
+
+    def test_ignores_ethernet_padding(self):
+        frame = tcp_frame("10.0.0.1", "10.0.0.2", 40000, 502) + b"\x00" * 6
+        write_pcap(self.path("test.pcap"), [(1.0, frame)])
+        with PcapReader(self.path("test.pcap")) as reader:
+            self.assertEqual(bytes(next(iter(reader)).payload), b"")
+
+    def test_resume_from_offset(self):
+        write_pcap(self.path("test.pcap"), self.frames)
+        with PcapReader(self.path("test.pcap"), port=None) as reader:
+            offsets = [p.offset for p in reader]
+            self.assertEqual([p.timestamp for p in reader.packets(offsets[1])], [2.0, 2.5])
+
+    def test_pcapng(self):
+        with open(self.path("test.pcapng"), "wb") as capture:
+            capture.write(pcapng(self.frames))
+        with PcapReader(self.path("test.pcapng")) as reader:
+            packets = list(reader)
+            self.assertEqual(reader.format, "pcapng")
+            self.assertEqual([p.timestamp for p in packets], [1.5, 2.5])
+            self.assertEqual(packets[0].dst, "10.0.0.2")
+            self.assertEqual([p.timestamp for p in reader.packets(packets[1].offset)], [2.5])
+
+    def test_rejects_other_files(self):
+        with open(self.path("test.txt"), "wb") as other:
+            other.write(b"not a capture")
+        with self.assertRaises(ValueError):
+            PcapReader(self.path("test.txt"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from unittest.mock import MagicMock
+from otsafe.components.sensors import Sensor
+from otsafe.utils.planner import ReadPlanner, coalesce
+
+
+class TestCoalesce(unittest.TestCase):
+
+    def test_merges_within_gap(self):
+        blocks = coalesce([(0, 1, "a"), (5, 2, "b"), (30, 1, "c")], max_gap=10)
+        self.assertEqual([(b.start, b.count) for b in blocks], [(0, 7), (30, 1)])
+        self.assertEqual(blocks[0].targets, [("a", 0, 1), ("b", 5, 2)])
+
+    def test_respects_max_count(self):
+        blocks = coalesce([(r, 1, r) for r in range(0, 300, 5)], max_gap=10)
+        self.assertTrue(all(b.count <= 125 for b in blocks))
+        self.assertEqual(len(blocks), 3)
+
+    def test_rejects_oversized_range(self):
+        with self.assertRaises(ValueError):
+            coalesce([(0, 126, "a")])
+
+
+class TestReadPlanner(unittest.TestCase):
+
+    def setUp(self):
+        self.sensors = [
+            Sensor(name=f"TT-{i}", ip="10.0.0.1", port=502, register=i * 7) for i in range(40)
+        ]
+        self.planner = ReadPlanner(max_gap=10)
+        for sensor in self.sensors:
+            self.planner.add(sensor)
+
+    def test_request_count(self):
+        self.assertEqual(self.planner.request_count(), 3)
+
+    def test_execute_splits_results(self):
+        def read(ip, port, method, start, count, device_id):
+            response = MagicMock()
+            response.isError.return_value = False
+            response.registers = list(range(start, start + count))
+            return response
+
+        pool = MagicMock()
+        pool.execute.side_effect = read
+        results = self.planner.execute(pool=pool)
+
+        self.assertEqual(pool.execute.call_count, 3)
+        self.assertEqual(results[self.sensors[10]], [70])
+        self.assertEqual(self.sensors[10].value, 70)
+
+if __name__ == '__main__':
+    unittest.main()
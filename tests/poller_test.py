@@ -0,0 +1,71 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+from otsafe.components.sensors import Sensor
+from otsafe.utils.poller import PollingEngine
+
+
+class FakeAsyncClient:
+
+    hang = set()
+
+    def __init__(self, host, port=502, timeout=3):
+        self.host = host
+        self.connected = False
+
+    async def connect(self):
+        self.connected = True
+        return True
+
+    def close(self):
+        self.connected = False
+
+    async def read_holding_registers(self, address, count=1, device_id=1):
+        if self.host in self.hang:
+            await asyncio.sleep(1)
+        response = MagicMock()
+        response.isError.return_value = False
+        response.registers = [address + i for i in range(count)]
+        return response
+
+
+class TestPollingEngine(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        FakeAsyncClient.hang = set()
+        self.engine = PollingEngine(timeout=0.05, client_class=FakeAsyncClient)
+
+    async def test_scan_updates_sensor_values(self):
+        fast = Sensor(name="PT-1", ip="10.0.0.1", port=502, register=10)
+        slow = Sensor(name="PT-2", ip="10.0.0.2", port=502, register=20)
+        self.engine.register(fast, interval=0.1)
+        self.engine.register(slow, interval=10)
+
+        await self.engine.scan(0.1)
+
+        self.assertEqual(fast.value, 10)
+        self.assertIsNone(slow.value)
+        self.assertEqual(self.engine.stats[("10.0.0.1", 502, 1)].polls, 1)
+
+    async def test_records_timeouts(self):
+        FakeAsyncClient.hang = {"10.0.0.3"}
+        sensor = Sensor(name="PT-3", ip="10.0.0.3", port=502, register=1)
+        self.engine.register(sensor, interval=1)
+
+        await self.engine.scan(1)
+
+        self.assertEqual(self.engine.stats[("10.0.0.3", 502, 1)].timeouts, 1)
+        self.assertIsNone(sensor.value)
+
+    async def test_run_polls_each_group(self):
+        sensors = [Sensor(name=f"PT-{i}", ip=f"10.0.1.{i}", port=502, register=i) for i in range(100)]
+        for sensor in sensors:
+            self.engine.register(sensor, interval=0.01)
+
+        await self.engine.run(duration=0.3)
+
+        self.assertTrue(all(sensor.value == i for i, sensor in enumerate(sensors)))
+        self.assertGreater(self.engine.stats[("10.0.1.0", 502, 1)].polls, 1)
+
+if __name__ == '__main__':
+    unittest.main()
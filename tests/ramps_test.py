@@ -0,0 +1,80 @@
+import asyncio
+import unittest
+from otsafe.components.ramps import Ramp
+from otsafe.components.sensors import Sensor
+from otsafe.components.sis import SIS
+from otsafe.utils.clock import Simulation
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRamp(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_linear(self):
+        ramp = Ramp(0, 100, 10, clock=self.clock)
+        self.clock.now = 2.5
+        self.assertEqual(ramp.value(), 25)
+        self.clock.now = 20
+        self.assertEqual(ramp.value(), 100)
+        self.assertTrue(ramp.done)
+
+    def test_exponential_reaches_target(self):
+        ramp = Ramp(0, 100, 10, "exponential", clock=self.clock)
+        self.clock.now = 2
+        self.assertGreater(ramp.value(), 20)
+        self.clock.now = 10
+        self.assertEqual(ramp.value(), 100)
+
+    def test_step(self):
+        ramp = Ramp(10, 0, 10, "step", clock=self.clock)
+        self.clock.now = 3.5
+        self.assertEqual(ramp.value(), 7)
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            Ramp(0, 1, 1, "sine")
+
+
+class TestSensorRamp(unittest.TestCase):
+
+    def test_ramp_is_evaluated_on_read(self):
+        sensor = Sensor(name="TestSensor", value=0)
+        with Simulation() as sim:
+            sensor.ramp(50, 5)
+            sim.sleep(1)
+            self.assertEqual(sensor.value, 10)
+            sim.sleep(5)
+            self.assertEqual(sensor.value, 50)
+        self.assertIsNone(sensor._ramp)
+
+    def test_setting_value_cancels_ramp(self):
+        sensor = Sensor(name="TestSensor", value=0)
+        sensor.ramp(50, 60)
+        sensor.value = 7
+        self.assertEqual(sensor.value, 7)
+
+    def test_change_value_over_time(self):
+        sis = SIS(name="TestSIS", value=0)
+        self.assertEqual(sis.change_value_over_time(3, 0.01), 3)
+
+    def test_many_concurrent_ramps(self):
+        sensors = [Sensor(name=f"TT-{i}", value=0) for i in range(1000)]
+
+        async def run():
+            return await asyncio.gather(*(sensor.ramp(i, 0.05) for i, sensor in enumerate(sensors)))
+
+        self.assertEqual(asyncio.run(run()), list(range(1000)))
+        self.assertEqual(sensors[999].value, 999)
+
+if __name__ == '__main__':
+    unittest.main()
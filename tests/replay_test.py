@@ -0,0 +1,113 @@
+import os
+import struct
+import tempfile
+import time
+import unittest
+from otsafe.components.actuators import Actuator
+from otsafe.components.safety_systems import SIS
+from otsafe.components.sensors import Sensor
+from otsafe.components.sis import SIS as ValueSIS
+from otsafe.utils.clock import Simulation
+from otsafe.utils.pcap import PcapReader, tcp_frame, write_pcap
+from otsafe.utils.replay import ReplayEngine
+
+
+def negative(timestamp, component, attribute, value):
+    return "negative value" if isinstance(value, int) and value > 0x7FFF else None
+
+
+class TestReplayEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "capture.pcap")
+        frames = []
+        # One read of register 0 every second for 10 seconds, out of range at 7 s
+        for second, value in enumerate([50, 51, 52, 53, 54, 55, 56, 95, 50, 0xFFFF]):
+            request = struct.pack(">HHHBBHH", second, 0, 6, 1, 3, 0, 1)
+            response = struct.pack(">HHHBBBH", second, 0, 5, 1, 3, 2, value)
+            frames.append((100 + second, tcp_frame("10.0.0.57", "10.0.0.3", 40000, 502, request)))
+            frames.append((100 + second + 0.01, tcp_frame("10.0.0.3", "10.0.0.57", 502, 40000, response)))
+        write_pcap(self.path, frames)
+
+        self.sensor = Sensor(name="PT-1", value=50, ip="10.0.0.3", register=0)
+        self.actuator = Actuator(name="XV-1", open=True)
+        self.function = SIS(sensor=self.sensor, actuator=self.actuator, name="SIS-1")
+        self.function.set_min(10)
+        self.function.set_max(90)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def engine(self, speed, **kwargs) -> ReplayEngine:
+        return ReplayEngine([self.sensor], [self.function], speed=speed, **kwargs)
+
+    def test_detections_as_fast_as_possible(self):
+        report = self.engine(None, detections=[negative]).replay_file(self.path)
+        self.assertEqual(report.packets, 20)
+        self.assertEqual(report.events, 10)
+        self.assertEqual(report.detections, [
+            (107.01, "SIS-1", "Detected high value of 95 with set point 90"),
+            (109.01, "SIS-1", "Detected high value of 65535 with set point 90"),
+            (109.01, "PT-1", "negative value"),
+        ])
+        self.assertEqual(report.latency.count, 3)
+        self.assertGreater(report.events_per_second, 0)
+        # Watching stops with the replay, and the actuator is left alone unless asked
+        self.assertIsNone(self.sensor._subscribers)
+        self.assertTrue(self.actuator.open)
+
+    def test_value_sis(self):
+        function = ValueSIS("SIS-2", value=50, ip="10.0.0.3", register=0, min_alarm_value=10, max_alarm_value=90)
+        report = ReplayEngine([function], [function], speed=None).replay_file(self.path)
+        self.assertEqual(report.detections, [
+            (107.01, "SIS-2", "Max alarm SIS triggered!"),
+            (109.01, "SIS-2", "Max alarm SIS triggered!"),
+        ])
+        self.assertIsNone(function._watcher)
+
+    def test_existing_watch_restored(self):
+        seen = []
+        self.function.watch(on_trip=lambda sis, message: seen.append(message), intervene=False)
+        watcher = self.function._watcher
+        report = self.engine(None).replay_file(self.path)
+        self.assertEqual(len(report.detections), 2)
+        self.assertEqual(seen, [])
+        self.assertIs(self.function._watcher, watcher)
+        self.sensor.value = 95
+        self.assertEqual(seen, ["Detected high value of 95 with set point 90"])
+        self.function.unwatch()
+
+    def test_replays_are_repeatable(self):
+        first = self.engine(None).replay_file(self.path)
+        second = self.engine(None).replay_file(self.path)
+        self.assertEqual(first.detections, second.detections)
+
+    def test_keeps_original_timing(self):
+        for speed, expected in ((1, 9.01), (10, 0.901)):
+            with Simulation() as sim:
+                self.engine(speed).replay_file(self.path)
+                self.assertAlmostEqual(sim.monotonic(), expected, places=6)
+
+    def test_wall_clock_pacing(self):
+        began = time.perf_counter()
+        report = self.engine(50).replay_file(self.path)
+        self.assertGreaterEqual(time.perf_counter() - began, 9.01 / 50)
+        self.assertEqual(len(report.detections), 2)
+
+    def test_time_window(self):
+        report = self.engine(None).replay_file(self.path, start=105, end=108)
+        self.assertEqual(report.packets, 7)
+        self.assertEqual([d[0] for d in report.detections], [107.01])
+
+    def test_intervene(self):
+        with PcapReader(self.path) as reader:
+            self.engine(None, intervene=True).replay(reader)
+        self.assertFalse(self.actuator.open)
+
+    def test_rejects_bad_speed(self):
+        with self.assertRaises(ValueError):
+            ReplayEngine(speed=0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import pickle
+import unittest
+from otsafe.components.burners import Burner
+from otsafe.components.sensors import Sensor
+from otsafe.components.sis import SIS
+from otsafe.detections.rules import RuleEngine, compile_rule, load_rules, parse_rules
+from otsafe.exceptions.exceptions import ImpossibleCondition, UnsafeCondition
+
+DEFINITIONS = os.path.join(os.path.dirname(__file__), "..", "otsafe", "definitions")
+
+RULES = """
+rules:
+  - id: high-pressure
+    severity: high
+    match: {type: Sensor, id: "PT-*"}
+    when:
+      value: {gt: 150}
+    message: "{id} at {value}{unit}"
+  - id: pressure-band
+    match: {id: [PT-1, PT-2]}
+    when:
+      any:
+        - value: {outside: [10, 200]}
+        - unit: {ne: psi}
+  - id: colder-than-inlet
+    result: impossible
+    match: {type: Burner}
+    when:
+      all:
+        - flame: true
+        - temperature: {lt: {ref: TT-1.value}}
+"""
+
+
+class TestRules(unittest.TestCase):
+
+    def setUp(self):
+        self.inlet = Sensor(name="TT-1", value=80)
+        self.engine = RuleEngine(parse_rules(RULES), [self.inlet])
+
+    def rule(self, when, **source):
+        return compile_rule({"id": "test", "when": when, **source})
+
+    def test_unsafe_condition(self):
+        sensor = Sensor(name="PT-1", value=160, unit="psi")
+        results = self.engine.evaluate(sensor)
+        self.assertEqual([r.rule.id for r in results], ["high-pressure"])
+        self.assertIsInstance(results[0], UnsafeCondition)
+        self.assertEqual(results[0].message, "PT-1 at 160psi")
+        self.assertEqual(results[0].severity, "high")
+        self.assertIs(results[0].component, sensor)
+
+    def test_any_and_outside(self):
+        self.assertEqual([r.rule.id for r in self.engine.evaluate(Sensor(name="PT-2", value=5, unit="psi"))], ["pressure-band"])
+        self.assertEqual([r.rule.id for r in self.engine.evaluate(Sensor(name="PT-2", value=50, unit="bar"))], ["pressure-band"])
+        self.assertEqual(self.engine.evaluate(Sensor(name="PT-3", value=5, unit="bar")), [])
+
+    def test_impossible_condition_with_reference(self):
+        burner = Burner(name="B-1", flame=True, temperature=20)
+        with self.assertRaises(ImpossibleCondition):
+            self.engine.check(burner)
+        self.inlet.value = 10
+        self.engine.check(burner)
+
+    def test_operators(self):
+        sensor = Sensor(name="PT-9", value=7, unit="psi", status="FAULT 12")
+        cases = [
+            ({"value": 7}, True),
+            ({"value": {"in": [1, 7]}}, True),
+            ({"value": {"not_in": [1, 7]}}, False),
+            ({"value": {"between": [7, 8]}}, True),
+            ({"value": {"ge": 7, "lt": 7}}, False),
+            ({"status": {"matches": "^FAULT \\d+$"}}, True),
+            ({"description": {"is_null": True}}, True),
+            ({"value": {"eq": {"attr": "value"}}}, True),
+            ({"not": {"value": 7}}, False),
+            ({"missing": {"gt": 1}}, False),
+            ({"unit": {"gt": 1}}, False),
+        ]
+        for when, expected in cases:
+            self.assertEqual(self.rule(when).evaluate(sensor) is not None, expected, when)
+
+    def test_rejects_invalid_rules(self):
+        for when in ({"value": {"near": 1}}, {"__class__": 1}, {"value": {"between": [1]}}, [], {"value": {"matches": "("}}):
+            with self.assertRaises(ValueError):
+                self.rule(when)
+        with self.assertRaises(ValueError):
+            self.rule({"value": 1}, result="dangerous")
+        with self.assertRaises(ValueError):
+            compile_rule({"when": {"value": 1}})
+
+    def test_constants_are_not_source(self):
+        rule = self.rule({"unit": "x') or __import__('os').system('true') or ('"})
+        self.assertIsNone(rule.evaluate(Sensor(name="PT-1", value=1, unit="psi")))
+
+    def test_stream_and_watch(self):
+        sensors = [Sensor(name=f"PT-{i}", value=100 + i * 30, unit="psi") for i in range(3)]
+        self.assertEqual([r.component.id for r in self.engine.process(sensors)], ["PT-2"])
+
+        seen = []
+        self.engine.watch(sensors[0], seen.append)
+        sensors[0].value = 180
+        self.engine.unwatch(sensors[0])
+        sensors[0].value = 190
+        self.assertEqual([r.message for r in seen], ["PT-0 at 180psi"])
+
+    def test_detection_and_pickling(self):
+        engine = pickle.loads(pickle.dumps(self.engine))
+        self.assertEqual(engine(0.0, Sensor(name="PT-5", value=151, unit="psi"), "value", 151), "PT-5 at 151psi")
+        self.assertIsNone(engine(0.0, Sensor(name="PT-5", value=15, unit="psi"), "value", 15))
+
+    def test_definitions(self):
+        rules = load_rules(DEFINITIONS)
+        self.assertEqual([rule.id for rule in rules], ["sis-high-trip-bypassed", "burner-flame-without-heat"])
+        engine = RuleEngine(rules)
+        function = SIS(name="SIS-1", value=95, max_alarm_value=90)
+        self.assertEqual([r.message for r in engine.evaluate(function)], ["SIS-1 at 95, at or above its high set point"])
+        self.assertIsInstance(engine.evaluate(Burner(name="B-1", flame=True, temperature=0))[0], ImpossibleCondition)
+
+class TestDispatch(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = RuleEngine(parse_rules(RULES))
+        self.sensor = Sensor(name="PT-1", value=160, unit="psi")
+
+    def ids(self, rules) -> list:
+        return [rule.id for rule in rules]
+
+    def test_dispatches_on_attribute(self):
+        self.assertEqual(self.ids(self.engine.dispatch(self.sensor, "value")), ["high-pressure", "pressure-band"])
+        self.assertEqual(self.ids(self.engine.dispatch(self.sensor, "unit")), ["pressure-band"])
+        self.assertEqual(self.engine.dispatch(self.sensor, "last_updated"), ())
+        self.assertEqual(self.ids(self.engine.dispatch(Burner(name="B-1"), "flame")), ["colder-than-inlet"])
+        self.assertEqual(self.engine.dispatch(Sensor(name="TT-1"), "value"), ())
+
+    def test_cost_per_event_is_flat(self):
+        for i in range(500):
+            self.engine.add(compile_rule({"id": f"valve-{i}", "match": {"type": "Valve"}, "when": {"open_percentage": {"gt": 0.9}}}))
+        self.engine.evaluate(self.sensor, "value")
+        self.assertEqual(self.engine.evaluations, 2)
+
+    def test_add_and_remove_update_cached_dispatch(self):
+        self.assertEqual(len(self.engine.dispatch(self.sensor, "value")), 2)
+        self.engine.add(compile_rule({"id": "pt-1-only", "match": {"id": "PT-1"}, "when": {"value": {"gt": 0}}}))
+        self.assertEqual(self.ids(self.engine.dispatch(self.sensor, "value")), ["high-pressure", "pressure-band", "pt-1-only"])
+        self.assertEqual(self.ids(self.engine.dispatch(Sensor(name="PT-7"), "value")), ["high-pressure"])
+
+        self.engine.remove("high-pressure")
+        self.assertEqual(self.ids(self.engine.dispatch(self.sensor, "value")), ["pressure-band", "pt-1-only"])
+        self.assertNotIn(("value", None), self.engine._by_attribute)
+        with self.assertRaises(KeyError):
+            self.engine.remove("high-pressure")
+
+    def test_referenced_attribute_change(self):
+        inlet = Sensor(name="TT-1", value=10)
+        burner = Burner(name="B-1", flame=True, temperature=20)
+        self.engine.register(inlet)
+        self.engine.register(burner)
+        self.assertEqual(self.engine.evaluate(inlet, "value"), [])
+
+        inlet.value = 80
+        results = self.engine.evaluate(inlet, "value")
+        self.assertEqual([(r.rule.id, r.component.id) for r in results], [("colder-than-inlet", "B-1")])
+        self.assertEqual(self.engine.evaluate(inlet, "unit"), [])
+
+if __name__ == '__main__':
+    unittest.main()
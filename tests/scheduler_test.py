@@ -0,0 +1,73 @@
+import unittest
+from otsafe.components.actuators import Actuator
+from otsafe.components.safety_systems import SIS
+from otsafe.components.scheduler import SISScheduler
+from otsafe.components.sensors import Sensor
+from otsafe.components import sis
+from otsafe.utils.clock import Simulation, get_clock
+
+
+class SlowSIS(sis.SIS):
+
+    def check(self):
+        get_clock().sleep(1.5)
+        return None
+
+
+class TestSISScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.trips = []
+        self.scheduler = SISScheduler(on_trip=lambda sis, message: self.trips.append((sis, message)))
+
+    def test_many_functions_one_thread(self):
+        with Simulation():
+            functions = []
+            for i in range(2000):
+                function = SIS(sensor=Sensor(name=f"PT-{i}", value=50), actuator=Actuator(name=f"XV-{i}"))
+                function.set_min(10)
+                function.set_max(90)
+                functions.append(function)
+                self.scheduler.add(function, interval=0.1 if i % 2 else 1)
+            self.scheduler.run(duration=10)
+
+        self.assertEqual(self.scheduler.stats[functions[1]].scans, 101)
+        self.assertEqual(self.scheduler.stats[functions[0]].scans, 11)
+        self.assertEqual(self.scheduler.stats[functions[0]].max_jitter, 0)
+        self.assertEqual(self.trips, [])
+
+    def test_trip_is_reported_and_actuates(self):
+        sensor = Sensor(name="PT-1", value=50)
+        actuator = Actuator(name="XV-1", open=True)
+        function = SIS(sensor=sensor, actuator=actuator)
+        function.set_min(10)
+        function.set_max(90)
+
+        with Simulation() as sim:
+            self.scheduler.add(function, interval=1)
+            sim.schedule(2.5, setattr, sensor, "value", 95)
+            self.scheduler.run(duration=5)
+
+        self.assertEqual(self.trips[0], (function, "Detected high value of 95 with set point 90"))
+        self.assertFalse(actuator.open)
+        self.assertTrue(self.scheduler.stats[function].within_budget(1))
+
+    def test_records_overruns(self):
+        slow = SlowSIS(name="Slow", value=50)
+        with Simulation():
+            self.scheduler.add(slow, interval=1)
+            self.scheduler.run(duration=6)
+
+        stats = self.scheduler.stats[slow]
+        self.assertEqual(stats.overruns, stats.scans)
+        self.assertGreater(stats.missed, 0)
+        self.assertGreater(stats.worst_latency, 2)
+
+    def test_remove(self):
+        function = sis.SIS(name="TestSIS", value=50)
+        self.scheduler.add(function)
+        self.scheduler.remove(function)
+        self.assertIsNone(self.scheduler.run_pending())
+
+if __name__ == '__main__':
+    unittest.main()
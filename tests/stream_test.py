@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from otsafe.utils import listener
+from otsafe.utils.stream import BLOCK, DROP_NEWEST, DROP_OLDEST, PacketQueue, PacketStream
+
+
+class Packet:
+    def __init__(self, number):
+        self.number = number
+        self.timestamp = time.time()
+
+
+class FakeProcess:
+    def __init__(self):
+        self.returncode = None
+        self.killed = asyncio.Event()
+
+    def kill(self):
+        self.returncode = -9
+        self.killed.set()
+
+
+class FakeLiveCapture:
+    """Stands in for pyshark.LiveCapture: packets are read by running its event loop on the iterating thread, which blocks until tshark is killed."""
+
+    def __init__(self, interface=None, bpf_filter=None):
+        self.eventloop = asyncio.new_event_loop()
+        self.tshark = FakeProcess()
+        self._running_processes = {self.tshark}
+        self.closed_on = None
+
+    async def next_packet(self):
+        await self.tshark.killed.wait()
+        raise EOFError
+
+    def sniff_continuously(self):
+        while True:
+            try:
+                yield self.eventloop.run_until_complete(self.next_packet())
+            except EOFError:
+                return
+
+    def close(self):
+        self.eventloop.run_until_complete(self.close_async())
+        self.closed_on = threading.current_thread().name
+
+    async def close_async(self):
+        for process in self._running_processes:
+            process.kill()
+        self._running_processes.clear()
+
+
+class TestPacketQueue(unittest.TestCase):
+
+    def fill(self, policy: str) -> PacketQueue:
+        queue = PacketQueue(capacity=3, policy=policy)
+        for i in range(5):
+            queue.put(i)
+        queue.close()
+        return queue
+
+    def drain(self, queue: PacketQueue) -> list:
+        items = []
+        while (entry := queue.get()) is not None:
+            items.append(entry[0])
+        return items
+
+    def test_drop_newest(self):
+        queue = self.fill(DROP_NEWEST)
+        self.assertEqual(self.drain(queue), [0, 1, 2])
+        self.assertEqual(queue.dropped, 2)
+
+    def test_drop_oldest(self):
+        queue = self.fill(DROP_OLDEST)
+        self.assertEqual(self.drain(queue), [2, 3, 4])
+        self.assertEqual(queue.dropped, 2)
+        self.assertEqual(queue.high_water, 3)
+
+    def test_block_waits_for_room(self):
+        queue = PacketQueue(capacity=1, policy=BLOCK)
+        queue.put(0)
+        producer = threading.Thread(target=queue.put, args=(1,))
+        producer.start()
+        time.sleep(0.05)
+        self.assertTrue(producer.is_alive())
+        self.assertEqual(queue.get()[0], 0)
+        producer.join(1)
+        self.assertEqual(queue.get()[0], 1)
+        self.assertEqual((queue.dropped, queue.blocked), (0, 1))
+
+    def test_close_releases_blocked_producer(self):
+        queue = PacketQueue(capacity=1, policy=BLOCK)
+        queue.put(0)
+        results = []
+        producer = threading.Thread(target=lambda: results.append(queue.put(1)))
+        producer.start()
+        queue.close()
+        producer.join(1)
+        self.assertEqual(results, [False])
+
+    def test_rejects_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            PacketQueue(policy="drop_all")
+
+
+class TestPacketStream(unittest.TestCase):
+
+    def test_handles_every_packet(self):
+        seen = []
+        stream = PacketStream((Packet(i) for i in range(100)), lambda p: seen.append(p.number), capacity=10, workers=2)
+        stats = stream.run()
+        self.assertEqual(sorted(seen), list(range(100)))
+        self.assertEqual((stats["captured"], stats["processed"], stats["dropped"]), (100, 100, 0))
+        self.assertEqual(stats["handler_latency"].count, 100)
+        self.assertIsNotNone(stats["capture_latency"].percentile(99))
+
+    def test_drops_when_handler_falls_behind(self):
+        stream = PacketStream((Packet(i) for i in range(50)), lambda p: time.sleep(0.001), capacity=5, policy=DROP_NEWEST)
+        stats = stream.run()
+        self.assertGreater(stats["dropped"], 0)
+        self.assertEqual(stats["processed"] + stats["dropped"], 50)
+
+    def test_counts_handler_errors(self):
+        def handler(packet):
+            if packet.number % 2:
+                raise ValueError(packet.number)
+
+        stats = PacketStream((Packet(i) for i in range(10)), handler).run()
+        self.assertEqual((stats["processed"], stats["errors"]), (10, 5))
+
+    def test_stop_interrupts_endless_source(self):
+        def endless():
+            i = 0
+            while True:
+                yield Packet(i)
+                i += 1
+
+        with PacketStream(endless(), lambda p: None, capacity=100, policy=DROP_OLDEST) as stream:
+            time.sleep(0.05)
+        self.assertGreater(stream.processed, 0)
+        self.assertFalse(any(thread.is_alive() for thread in stream._threads))
+
+    def test_close_errors_are_raised(self):
+        def close():
+            raise OSError("close failed")
+
+        stream = PacketStream(iter([Packet(0)]), lambda p: None, close=close)
+        stream.start()
+        stream.join(1)
+        with self.assertRaises(OSError):
+            stream.stop()
+
+
+class TestLiveCapture(unittest.TestCase):
+
+    def test_stop_blocked_capture(self):
+        with patch.object(listener.pyshark, "LiveCapture", FakeLiveCapture):
+            stream = listener.stream_live_capture(lambda p: None, interface="lo")
+        capture = stream._close.__self__
+        self.addCleanup(capture.eventloop.close)
+
+        stream.start()
+        deadline = time.monotonic() + 1
+        while not capture.eventloop.is_running() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(capture.eventloop.is_running())
+
+        stream.stop(timeout=1)
+        self.assertFalse(any(thread.is_alive() for thread in stream._threads))
+        self.assertEqual(capture.tshark.returncode, -9)
+        self.assertEqual(capture.closed_on, "packet-capture")
+        self.assertEqual(capture._running_processes, set())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,232 @@
+import json
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from otsafe.components.burners import Burner
+from otsafe.components.safety_systems import SIS
+from otsafe.components.sensors import Sensor
+from otsafe.components.servers import Server
+from otsafe.components.valves import Valve
+from otsafe.inventory import db
+from otsafe.inventory.components import COMPONENT_COLUMNS, COMPONENT_TYPES, build_component, component_attributes, component_row
+from otsafe.inventory.db import DatabasePool
+from otsafe.inventory.sync import CopySource, SyncReport, copy_line, load_components, save_components
+
+
+class FakeCursor:
+
+    def __init__(self, conn, name=None):
+        self.conn = conn
+        self.itersize = 2000
+        self.description = [(column,) for column in COMPONENT_COLUMNS]
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.queries.append((query, params))
+        if query.startswith("DELETE"):
+            self.rowcount = self.conn.deleted
+
+    def copy_expert(self, query, source, size=8192):
+        self.conn.queries.append((query, None))
+        chunks = []
+        while True:
+            data = source.read(size)
+            if not data:
+                break
+            chunks.append(data)
+        self.conn.copied = "".join(chunks)
+
+    def fetchone(self):
+        return self.conn.counts
+
+    def __iter__(self):
+        return iter(self.conn.rows)
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = 0
+        self.queries = []
+        self.copied = None
+        self.counts = (0, 0)
+        self.deleted = 0
+        self.rows = []
+        self.commits = 0
+
+    def cursor(self, name=None, **kwargs):
+        return FakeCursor(self, name)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+def parse_copy(payload):
+    # Inverse of copy_line for the escapes it produces
+    rows = []
+    for line in payload.splitlines():
+        fields = []
+        for field in line.split("\t"):
+            if field == "\\N":
+                fields.append(None)
+                continue
+            out, escaped = [], False
+            for char in field:
+                if escaped:
+                    out.append({"t": "\t", "n": "\n", "r": "\r"}.get(char, char))
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                else:
+                    out.append(char)
+            fields.append("".join(out))
+        rows.append(dict(zip(COMPONENT_COLUMNS, fields)))
+    return rows
+
+
+class TestComponentRows(unittest.TestCase):
+
+    def test_attributes(self):
+        sensor = Sensor("PT-1", value=42, unit="psi", ip="10.0.0.3", port=502, register=5, limits=[0, 100])
+        sensor.ratio = float("nan")
+        attributes = component_attributes(sensor)
+        self.assertEqual(attributes["value"], 42)
+        self.assertEqual(attributes["register"], 5)
+        self.assertEqual(attributes["limits"], [0, 100])
+        self.assertIsInstance(attributes["last_updated"], str)
+        self.assertNotIn("ip", attributes)
+        self.assertNotIn("ratio", attributes)
+        self.assertFalse(any(name.startswith("_") for name in attributes))
+
+    def test_references_saved_as_id(self):
+        sensor = Sensor("PT-1", value=1, valve=Valve("XV-1"))
+        self.assertEqual(component_attributes(sensor)["valve"], "XV-1")
+
+    def test_unregistered_type_refused(self):
+        sis = SIS(Sensor("PT-1", value=1), Valve("XV-1"), "SIS-1")
+        with self.assertRaises(ValueError):
+            component_row(sis)
+
+    def test_round_trip_every_type(self):
+        for type_name, cls in COMPONENT_TYPES.items():
+            with self.subTest(type_name):
+                component = cls(f"{type_name}-1", description="test")
+                row = dict(zip(COMPONENT_COLUMNS, component_row(component)))
+                self.assertEqual(row["type"], type_name)
+                self.assertNotIn("name", json.loads(row["attributes"]))
+                loaded = build_component(row)
+                self.assertIs(type(loaded), cls)
+                self.assertEqual(loaded.id, component.id)
+                self.assertEqual(loaded.description, "test")
+                self.assertEqual(getattr(loaded, "name", None), getattr(component, "name", None))
+
+    def test_name_differing_from_id(self):
+        burner = Burner("B-1")
+        burner.name = "Boiler 1 burner"
+        loaded = build_component(dict(zip(COMPONENT_COLUMNS, component_row(burner))))
+        self.assertEqual((loaded.id, loaded.name), ("B-1", "Boiler 1 burner"))
+
+    def test_round_trip(self):
+        sensor = Sensor("PT-1", value=42, unit="psi", ip="10.0.0.3", port=502, register=5)
+        row = dict(zip(COMPONENT_COLUMNS, component_row(sensor)))
+        self.assertEqual(row["type"], "Sensor")
+        loaded = build_component(row)
+        self.assertIs(type(loaded), Sensor)
+        self.assertEqual((loaded.id, loaded.value, loaded.unit, loaded.register), ("PT-1", 42, "psi", 5))
+        self.assertEqual(loaded.created_at, sensor.created_at)
+        self.assertEqual(loaded.last_updated, sensor.last_updated)
+
+    def test_copy_escaping(self):
+        line = copy_line(("a\tb", None, "c\\d\ne", 7, datetime(2024, 1, 2, 3, 4, 5)))
+        self.assertEqual(line, "a\\tb\t\\N\tc\\\\d\\ne\t7\t2024-01-02T03:04:05\n")
+
+    def test_copy_source_chunks(self):
+        source = CopySource([("a",), ("bb",), ("ccc",)])
+        self.assertEqual(source.read(3), "a\nb")
+        self.assertEqual(source.read(100), "b\nccc\n")
+        self.assertEqual(source.read(100), "")
+        self.assertEqual(source.rows, 3)
+
+
+class TestSaveComponents(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = DatabasePool(minconn=1, maxconn=1, connect=FakeConnection)
+        self.conn = self.pool.acquire()
+        self.pool.release(self.conn)
+        patcher = patch.object(db, "_pool", self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_save(self):
+        self.conn.counts = (2, 1)
+        components = [
+            Sensor("PT-1", value=42, unit="psi", ip="10.0.0.3", port=502),
+            Valve("XV-1", state=True, description="feed\tvalve"),
+            Server("HIST-1", os="Windows"),
+        ]
+        report = save_components(components)
+        self.assertEqual((report.rows, report.inserted, report.updated, report.unchanged), (3, 2, 1, 0))
+        self.assertEqual(self.conn.commits, 1)
+        queries = [query for query, _ in self.conn.queries]
+        self.assertTrue(queries[0].startswith("CREATE TEMP TABLE components_staging"))
+        self.assertTrue(queries[1].startswith("COPY components_staging"))
+        self.assertIn("ON CONFLICT (id) DO UPDATE", queries[2])
+        self.assertIn("IS DISTINCT FROM", queries[2])
+        self.assertEqual(len(queries), 3)
+
+        rows = parse_copy(self.conn.copied)
+        self.assertEqual([row["id"] for row in rows], ["PT-1", "XV-1", "HIST-1"])
+        self.assertEqual(rows[1]["description"], "feed\tvalve")
+        self.assertIsNone(rows[2]["ip"])
+        self.assertEqual(json.loads(rows[2]["attributes"])["os"], "Windows")
+
+    def test_full_sync_deletes(self):
+        self.conn.counts = (0, 0)
+        self.conn.deleted = 4
+        report = save_components([Sensor("PT-1", value=1)], full=True)
+        self.assertEqual((report.unchanged, report.deleted), (1, 4))
+        self.assertTrue(self.conn.queries[-1][0].startswith("DELETE FROM components"))
+
+    def test_duplicate_ids(self):
+        with self.assertRaises(ValueError):
+            save_components([Sensor("PT-1"), Sensor("PT-1")])
+        self.assertEqual(self.conn.commits, 0)
+
+    def test_unregistered_type_not_saved(self):
+        with self.assertRaises(ValueError):
+            save_components([SIS(Sensor("PT-1"), Valve("XV-1"), "SIS-1")])
+        self.assertEqual(self.conn.commits, 0)
+
+    def test_invalid_table(self):
+        with self.assertRaises(ValueError):
+            save_components([], table="components; DROP TABLE x")
+
+    def test_load(self):
+        sensor = Sensor("PT-1", value=42, unit="psi")
+        valve = Valve("XV-1", state=True)
+        self.conn.rows = [component_row(sensor), component_row(valve)]
+        report = SyncReport()
+        loaded = list(load_components("type = %s", ("Sensor",), report=report))
+        self.assertEqual([type(component) for component in loaded], [Sensor, Valve])
+        self.assertEqual(loaded[0].value, 42)
+        self.assertTrue(loaded[1].state)
+        self.assertEqual(report.rows, 2)
+        self.assertTrue(self.conn.queries[0][0].endswith("FROM components WHERE type = %s"))
+
+
+if __name__ == '__main__':
+    unittest.main()
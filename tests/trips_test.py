@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+from otsafe.components.actuators import Actuator
+from otsafe.components.arrays import SensorArray
+from otsafe.components.safety_systems import SIS
+from otsafe.components.sensors import Sensor
+from otsafe.components import sis
+from otsafe.components.trips import TRIP_HIGH, TRIP_LOW, TripTable
+from otsafe.exceptions.exceptions import AlarmException
+
+
+class TestTripTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = TripTable(capacity=2)
+        self.functions = []
+        for i in range(5):
+            function = SIS(sensor=Sensor(name=f"PT-{i}", value=50), actuator=Actuator(name=f"XV-{i}"))
+            function.set_min(10)
+            function.set_max(90)
+            self.table.register(function)
+            self.functions.append(function)
+
+    def test_compiles_setpoints(self):
+        np.testing.assert_array_equal(self.table.low, [10] * 5)
+        np.testing.assert_array_equal(self.table.high, [90] * 5)
+
+    def test_evaluate(self):
+        self.functions[1].sensor.value = 5
+        self.functions[3].sensor.value = 90
+        indices, directions = self.table.evaluate()
+        np.testing.assert_array_equal(indices, [1, 3])
+        np.testing.assert_array_equal(directions, [TRIP_LOW, TRIP_HIGH])
+
+    def test_setpoint_change_is_incremental(self):
+        self.functions[2].set_max(40)
+        self.assertEqual(self.table.high[2], 40)
+        self.assertEqual(self.table.tripped(), [(self.functions[2], TRIP_HIGH)])
+
+    def test_unset_setpoints_never_trip(self):
+        function = sis.SIS(name="TestSIS", value=1000)
+        self.table.register(function)
+        self.assertEqual(self.table.tripped(), [])
+        function.set_max_alarm(2000)
+        with self.assertRaises(AlarmException):
+            function.set_min_alarm(1000)
+        self.assertEqual(self.table.tripped(), [(function, TRIP_LOW)])
+
+    def test_unregister(self):
+        self.table.unregister(self.functions[0])
+        self.assertEqual(len(self.table), 4)
+        self.assertEqual(self.table.index(self.functions[4]), 0)
+        self.assertIsNone(self.functions[0].trip_table)
+
+    def test_array_backed_sensors(self):
+        array = SensorArray()
+        table = TripTable()
+        for i in range(100):
+            array.add(f"TT-{i}", 50)
+            function = SIS(sensor=array[i], actuator=Actuator(name=f"XV-{i}"))
+            function.set_min(0)
+            function.set_max(100)
+            table.register(function)
+        array.update([150, -5], indices=[7, 42])
+        indices, directions = table.evaluate()
+        np.testing.assert_array_equal(indices, [7, 42])
+        np.testing.assert_array_equal(directions, [TRIP_HIGH, TRIP_LOW])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+import os
+import pickle
+import struct
+import unittest
+from otsafe.components.burners import Burner
+from otsafe.components.sensors import Sensor
+from otsafe.detections.windows import (
+    Deviation, DurationAbove, RateOfChange, WhileUnchanged, WindowEngine, load_windows, parse_windows
+)
+from otsafe.exceptions.exceptions import ImpossibleCondition, UnsafeCondition
+from otsafe.utils.clock import Simulation
+from otsafe.utils.decoder import ModbusDecoder
+
+DEFINITIONS = os.path.join(os.path.dirname(__file__), "..", "otsafe", "definitions")
+
+
+class TestWindows(unittest.TestCase):
+
+    def setUp(self):
+        self.sensor = Sensor(name="TT-101", value=20)
+        self.burner = Burner(name="B-1", flame=False, temperature=20)
+
+    def feed(self, engine, updates):
+        results = []
+        for timestamp, component, attribute, value in updates:
+            results += engine.update(component, attribute, value, timestamp)
+        return results
+
+    def test_rate_of_change(self):
+        engine = WindowEngine([RateOfChange("fast-heat", "TT-101", limit=2)])
+        results = self.feed(engine, [(t, self.sensor, "value", v) for t, v in [(0, 20), (1, 21), (2, 25), (3, 30), (4, 31), (5, 40)]])
+        self.assertEqual([r.timestamp for r in results], [2, 5])
+        self.assertIsInstance(results[0], UnsafeCondition)
+        self.assertEqual(results[0].message, "TT-101 changing at 4/s, limit 2")
+
+    def test_rate_of_change_is_smoothed(self):
+        detection = RateOfChange("fast-heat", ["TT-101"], limit=2, window=10)
+        engine = WindowEngine([detection])
+        self.assertEqual(self.feed(engine, [(0, self.sensor, "value", 20), (1, self.sensor, "value", 25), (2, self.sensor, "value", 20)]), [])
+
+    def test_duration_above(self):
+        engine = WindowEngine([DurationAbove("hot", ["TT-101"], threshold=100, duration=10)])
+        updates = [(0, 90), (1, 110), (5, 120), (10, 105), (11, 106), (12, 90), (13, 101), (30, 102)]
+        results = self.feed(engine, [(t, self.sensor, "value", v) for t, v in updates])
+        self.assertEqual([r.timestamp for r in results], [11, 30])
+
+        engine.reset()
+        self.feed(engine, [(0, self.sensor, "value", 110)])
+        self.assertEqual(engine.tick(5), [])
+        self.assertEqual([r.timestamp for r in engine.tick(10)], [10])
+        self.assertEqual(engine.tick(20), [])
+
+    def test_duration_below(self):
+        engine = WindowEngine([DurationAbove("cold", "TT-101", threshold=5, duration=2, below=True)])
+        results = self.feed(engine, [(0, self.sensor, "value", 4), (3, self.sensor, "value", 3)])
+        self.assertEqual(len(results), 1)
+
+    def test_while_unchanged(self):
+        detection = WhileUnchanged(
+            "flame-without-heat", condition="B-1.flame", unchanged="TT-101.value", duration=60, tolerance=1,
+            result=ImpossibleCondition,
+        )
+        engine = WindowEngine([detection])
+        results = self.feed(engine, [
+            (0, self.sensor, "value", 20),
+            (10, self.burner, "flame", True),
+            (40, self.sensor, "value", 20.5),
+            (50, self.sensor, "value", 25),       # heat arrives, the window restarts
+            (100, self.sensor, "value", 25.2),
+            (109, self.sensor, "value", 25.4),
+            (110, self.sensor, "value", 25.5),
+            (120, self.sensor, "value", 25.5),
+        ])
+        self.assertEqual([r.timestamp for r in results], [110])
+        self.assertIsInstance(results[0], ImpossibleCondition)
+        self.assertIs(results[0].component, self.burner)
+        self.assertEqual(results[0].message, "B-1.flame for 60s with no change in TT-101.value")
+
+        self.feed(engine, [(130, self.burner, "flame", False), (131, self.burner, "flame", True)])
+        self.assertEqual(engine.tick(190), [])
+        self.assertEqual(len(engine.tick(191)), 1)
+
+    def test_while_unchanged_with_operator_test(self):
+        detection = WhileUnchanged("full-fire", condition="B-1.firing_rate", test={"ge": 100}, unchanged="TT-101.value", duration=5)
+        engine = WindowEngine([detection])
+        results = self.feed(engine, [(0, self.burner, "firing_rate", 50), (1, self.burner, "firing_rate", 100), (6, self.sensor, "value", 20)])
+        self.assertEqual(len(results), 1)
+
+    def test_deviation(self):
+        a, b = Sensor(name="PT-101A", value=100), Sensor(name="PT-101B", value=100)
+        engine = WindowEngine([Deviation("disagree", "PT-101A.value", "PT-101B.value", limit=0.05, relative=True, duration=10)])
+        results = self.feed(engine, [
+            (0, a, "value", 100), (0, b, "value", 100), (1, b, "value", 110), (5, a, "value", 100),
+            (6, b, "value", 101), (7, b, "value", 120), (17, a, "value", 100), (18, a, "value", 100),
+        ])
+        self.assertEqual([r.timestamp for r in results], [17])
+        self.assertEqual(results[0].message, "PT-101A.value and PT-101B.value deviate by 0.167, limit 0.05")
+
+    def test_dispatch_and_state_are_bounded(self):
+        engine = WindowEngine([RateOfChange("fast", ["TT-1", "TT-2"], limit=1)])
+        other = Sensor(name="TT-3", value=0)
+        for t in range(1000):
+            engine.update(other, "value", t, t)
+        self.assertEqual(engine.detections[0]._state, {})
+
+    def test_watch_uses_the_clock(self):
+        engine = WindowEngine([DurationAbove("hot", "TT-101", threshold=100, duration=10)])
+        seen = []
+        with Simulation() as sim:
+            engine.watch(self.sensor, seen.append)
+            self.sensor.value = 110
+            sim.sleep(10)
+            self.sensor.value = 111
+            engine.unwatch(self.sensor)
+        self.assertEqual(len(seen), 1)
+
+    def test_non_numeric_values_skipped(self):
+        engine = WindowEngine([
+            RateOfChange("fast", "TT-101", limit=1),
+            Deviation("disagree", "TT-101.value", "TT-102.value", limit=1),
+        ])
+        other = Sensor(name="TT-102", value=20)
+        seen = []
+        engine.watch(self.sensor, seen.append)
+        self.sensor.value = "BAD"
+        results = self.feed(engine, [(2, other, "value", 20), (3, self.sensor, "value", 20), (4, self.sensor, "value", 30)])
+        engine.unwatch(self.sensor)
+        self.assertEqual(seen, [])
+        self.assertEqual([r.rule.id for r in results], ["fast", "disagree"])
+
+    def test_remove_unknown_id(self):
+        engine = WindowEngine([RateOfChange("fast", "TT-101", limit=1)])
+        with self.assertRaises(KeyError) as raised:
+            engine.remove("slow")
+        self.assertEqual(raised.exception.args, ("slow",))
+        engine.remove("fast")
+        self.assertEqual(engine.detections, [])
+
+    def test_watch_requires_published_values(self):
+        engine = WindowEngine(load_windows(DEFINITIONS))
+        with self.assertRaises(TypeError):
+            engine.watch(self.burner, print)
+
+    def test_flame_window_driven_by_decoder(self):
+        engine = WindowEngine(load_windows(DEFINITIONS))
+        self.burner.ip = self.sensor.ip = "10.0.0.3"
+        results = []
+        decoder = ModbusDecoder(on_update=lambda *update: results.extend(engine.update(*update[1:], update[0])))
+        decoder.bind(self.burner, coil=0, attribute="flame")
+        decoder.bind(self.sensor, register=5)
+
+        client, server = ("10.0.0.9", 3082), ("10.0.0.3", 502)
+        for second in range(90):
+            for transaction, function, request, response in (
+                (2 * second, 1, struct.pack(">HH", 0, 1), bytes([1, 1])),
+                (2 * second + 1, 3, struct.pack(">HH", 5, 1), bytes([2]) + struct.pack(">H", 20)),
+            ):
+                for payload, flow in ((request, (*client, *server)), (response, (*server, *client))):
+                    decoder.decode(*flow, struct.pack(">HHHBB", transaction, 0, len(payload) + 2, 1, function) + payload, second)
+
+        self.assertEqual([(r.rule.id, r.timestamp) for r in results], [("burner-on-without-temperature-rise", 60)])
+        self.assertIsInstance(results[0], ImpossibleCondition)
+
+    def test_detection_and_pickling(self):
+        engine = pickle.loads(pickle.dumps(WindowEngine([DurationAbove("hot", "TT-101", threshold=100, duration=0)])))
+        self.assertEqual(engine(0.0, self.sensor, "value", 101), "TT-101 beyond 100 for 0s")
+
+    def test_yaml(self):
+        detections = parse_windows("""
+windows:
+  - id: hot
+    kind: duration_above
+    components: [TT-101]
+    threshold: 100
+    duration: 5
+""")
+        self.assertIsInstance(detections[0], DurationAbove)
+        for source in ("windows: [{id: x, kind: sideways}]", "windows: [{id: x, kind: deviation, a: A.value}]",
+                       "windows: [{id: x, kind: deviation, a: A, b: B.value, limit: 1}]"):
+            with self.assertRaises(ValueError):
+                parse_windows(source)
+
+    def test_definitions(self):
+        detections = load_windows(DEFINITIONS)
+        self.assertEqual([type(d) for d in detections], [WhileUnchanged, Deviation])
+        self.assertIs(detections[0].result, ImpossibleCondition)
+
+if __name__ == '__main__':
+    unittest.main()